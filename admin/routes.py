@@ -1,61 +1,54 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, current_app, Response
 from flask_login import login_required, current_user
 from admin import admin_bp
 from models import db, User, Distribuidora, Producto, Pedido, Rol, EstadoPedido
 from forms import RegistroForm, DistribuidoraForm, ProductoForm
 from decorators import administrador_requerido
+from estadisticas import obtener_estadisticas
+from lectura import solo_lectura
+from paginacion import paginar_por_cursor
+import busqueda
+import proyecciones
+import instrumentacion
+import metricas
+import hmac
 
 @admin_bp.route('/dashboard')
 @login_required
 @administrador_requerido
+@solo_lectura
 def dashboard():
     # Estadísticas completas
-    total_usuarios = User.query.count()
-    total_distribuidoras = Distribuidora.query.count()
-    total_productos = Producto.query.count()
-    total_pedidos = Pedido.query.count()
+    estadisticas = obtener_estadisticas()
     
-    # Usuarios por rol
-    admin_count = User.query.filter_by(rol=Rol.ADMINISTRADOR).count()
-    vendedor_count = User.query.filter_by(rol=Rol.VENDEDOR).count()
-    
-    # Pedidos por estado
-    pedidos_por_estado = {}
-    for estado in EstadoPedido:
-        pedidos_por_estado[estado.value] = Pedido.query.filter_by(estado=estado).count()
-    
-    # Usuarios recientes
-    usuarios_recientes = User.query.order_by(User.fecha_creacion.desc()).limit(5).all()
-    
-    # Pedidos recientes
-    pedidos_recientes = Pedido.query.order_by(Pedido.fecha_creacion.desc()).limit(5).all()
+    # Usuarios recientes; la plantilla ejecuta la consulta solo si el fragmento no está en cache
+    usuarios_recientes = proyecciones.usuarios().order_by(User.fecha_creacion.desc()).limit(5)
     
     return render_template('admin/dashboard.html',
-                         total_usuarios=total_usuarios,
-                         total_distribuidoras=total_distribuidoras,
-                         total_productos=total_productos,
-                         total_pedidos=total_pedidos,
-                         admin_count=admin_count,
-                         vendedor_count=vendedor_count,
-                         pedidos_por_estado=pedidos_por_estado,
-                         usuarios_recientes=usuarios_recientes,
-                         pedidos_recientes=pedidos_recientes)
+                         total_usuarios=estadisticas['total_usuarios'],
+                         total_distribuidoras=estadisticas['total_distribuidoras'],
+                         total_productos=estadisticas['total_productos'],
+                         total_pedidos=estadisticas['total_pedidos'],
+                         admin_count=estadisticas['usuarios_por_rol'][Rol.ADMINISTRADOR.value],
+                         vendedor_count=estadisticas['usuarios_por_rol'][Rol.VENDEDOR.value],
+                         pedidos_por_estado=estadisticas['pedidos_por_estado'],
+                         usuarios_recientes=usuarios_recientes)
 
 @admin_bp.route('/usuarios')
 @login_required
 @administrador_requerido
+@solo_lectura
 def usuarios():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '', type=str)
     search = request.args.get('search', '', type=str)
     
-    query = User.query
+    query = proyecciones.usuarios()
     
     if search:
-        query = query.filter(User.username.contains(search) | 
-                           User.nombre.contains(search) |
-                           User.email.contains(search))
+        query = busqueda.filtrar(query, User, search)
     
-    usuarios = query.order_by(User.fecha_creacion.desc()).paginate(page=page, per_page=10, error_out=False)
+    usuarios = paginar_por_cursor(query, User.fecha_creacion, User.id, cursor,
+                                  current_app.config['ITEMS_PER_PAGE'])
     
     return render_template('admin/usuarios.html', usuarios=usuarios, search=search)
 
@@ -82,4 +75,19 @@ def toggle_usuario_activo(id):
 @administrador_requerido
 def sistema():
     # Información del sistema
-    return render_template('admin/sistema.html')
\ No newline at end of file
+    return render_template('admin/sistema.html',
+                         solicitudes=instrumentacion.solicitudes_recientes(),
+                         umbral_lento=current_app.config['SQL_LENTO_UMBRAL_MS'])
+
+@admin_bp.route('/metrics')
+def metrics():
+    # Acceso con sesión de administrador o con el token de scraping
+    token = current_app.config['METRICAS_TOKEN']
+    autorizacion = request.headers.get('Authorization', '')
+    # compare_digest solo admite str ASCII; con bytes una cabecera con otros caracteres no falla
+    if not (token and hmac.compare_digest(autorizacion.encode(), f'Bearer {token}'.encode())):
+        if not current_user.is_authenticated or not current_user.is_administrador():
+            return Response('No autorizado\n', status=401, mimetype='text/plain')
+    
+    contenido, tipo = metricas.exponer()
+    return Response(contenido, content_type=tipo)
@@ -1,7 +1,7 @@
 from flask import Flask
 from flask_login import LoginManager
 from config import config
-from models import db, User, Rol
+from models import db
 import os
 
 def create_app(config_name=None):
@@ -14,6 +14,23 @@ def create_app(config_name=None):
     # Inicializar extensiones
     db.init_app(app)
     
+    import basedatos
+    import fragmentos
+    import identidad
+    import instrumentacion
+    import lectura
+    import metricas
+    import seguridad
+    import versiones
+    basedatos.init_app(app)
+    lectura.init_app(app)
+    seguridad.init_app(app)
+    identidad.init_app(app)
+    versiones.init_app(app)
+    fragmentos.init_app(app)
+    instrumentacion.init_app(app)
+    metricas.init_app(app)
+    
     # Configurar Login Manager
     login_manager = LoginManager()
     login_manager.init_app(app)
@@ -23,7 +40,7 @@ def create_app(config_name=None):
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return identidad.cargar_usuario(int(user_id))
     
     # Registrar blueprints
     from auth import auth_bp
@@ -34,23 +51,8 @@ def create_app(config_name=None):
     app.register_blueprint(main_bp)
     app.register_blueprint(admin_bp)
     
-    # Crear tablas de la base de datos
-    with app.app_context():
-        db.create_all()
-        
-        # Crear usuario administrador por defecto si no existe
-        admin_user = User.query.filter_by(username='admin').first()
-        if not admin_user:
-            admin_user = User(
-                username='admin',
-                email='admin@sistema.com',
-                nombre='Administrador del Sistema',
-                rol=Rol.ADMINISTRADOR
-            )
-            admin_user.set_password('admin123')
-            db.session.add(admin_user)
-            db.session.commit()
-            print("Usuario administrador creado: admin / admin123")
+    from commands import register_commands
+    register_commands(app)
     
     return app
 
@@ -58,6 +60,6 @@ if __name__ == '__main__':
     app = create_app()
     print("🚀 Iniciando aplicación Flask...")
     print("📡 El servidor estará disponible en: http://localhost:5000")
-    print("👤 Usuario admin: admin / admin123")
+    print("🗄️  Base de datos nueva: flask --app app migrar && flask --app app seed")
     print("="*50)
     app.run(debug=True, host='127.0.0.1', port=5000, threaded=True)
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""Archivo de pedidos cerrados.
+
+Los pedidos RECIBIDO o CANCELADO más antiguos que ``ARCHIVO_ANTIGUEDAD_DIAS`` se
+mueven con sus items a ``pedidos_archivo`` e ``items_pedido_archivo``. Cada lote
+es un rango de ids que se copia y se borra en una transacción corta, así que el
+bloqueo de escritura dura lo que tarda un lote y no todo el proceso.
+
+Listados, dashboards y búsquedas leen solo la tabla caliente; el archivo se
+incluye cuando el usuario pide el histórico (``?historico=1``).
+"""
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, insert, select
+from models import Pedido, ItemPedido, PedidoArchivado, ItemPedidoArchivado, EstadoPedido
+
+ESTADOS_CERRADOS = (EstadoPedido.RECIBIDO, EstadoPedido.CANCELADO)
+
+
+def _copiar(conn, origen, destino, condicion):
+    columnas = [c.name for c in origen.__table__.columns]
+    conn.execute(insert(destino.__table__).from_select(
+        columnas, select(*(origen.__table__.c[c] for c in columnas)).where(condicion)))
+
+
+def archivar_pedidos(conn, antiguedad_dias, lote=1000, confirmar_lotes=False, pausa=0, ahora=None):
+    """Mueve al archivo los pedidos cerrados anteriores al corte y devuelve cuántos."""
+    pedidos = Pedido.__table__
+    corte = (ahora or datetime.utcnow()) - timedelta(days=antiguedad_dias)
+    archivable = and_(pedidos.c.estado.in_(ESTADOS_CERRADOS), pedidos.c.fecha_creacion < corte)
+    
+    archivados = 0
+    desde = 0
+    while True:
+        ids = conn.execute(select(pedidos.c.id).where(archivable, pedidos.c.id > desde)
+                           .order_by(pedidos.c.id).limit(lote)).scalars().all()
+        if not ids:
+            break
+        # El rango de ids evita listas IN enormes; la condición se repite porque
+        # dentro del rango puede haber pedidos abiertos
+        en_lote = and_(archivable, pedidos.c.id.between(ids[0], ids[-1]))
+        de_pedidos_en_lote = ItemPedido.__table__.c.pedido_id.in_(select(pedidos.c.id).where(en_lote))
+        
+        _copiar(conn, Pedido, PedidoArchivado, en_lote)
+        _copiar(conn, ItemPedido, ItemPedidoArchivado, de_pedidos_en_lote)
+        conn.execute(delete(ItemPedido.__table__).where(de_pedidos_en_lote))
+        conn.execute(delete(pedidos).where(en_lote))
+        
+        archivados += len(ids)
+        desde = ids[-1]
+        if confirmar_lotes:
+            conn.commit()
+            if pausa:
+                time.sleep(pausa)
+    return archivados
@@ -4,6 +4,7 @@ from auth import auth_bp
 from models import db, User, Rol
 from forms import LoginForm, RegistroForm
 from decorators import administrador_requerido
+from seguridad import SistemaSaturado
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
@@ -13,7 +14,16 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
-        if user and user.check_password(form.password.data) and user.activo:
+        try:
+            valido = user and user.check_password(form.password.data) and user.activo
+            # Hash con parámetros antiguos: se regenera con la configuración actual
+            if valido and user.password_necesita_rehash():
+                user.set_password(form.password.data)
+        except SistemaSaturado:
+            flash('El sistema está ocupado, intenta de nuevo en unos segundos', 'warning')
+            return render_template('auth/login.html', form=form), 503
+        
+        if valido:
             login_user(user, remember=form.remember_me.data)
             from datetime import datetime
             user.ultimo_login = datetime.utcnow()
@@ -0,0 +1,28 @@
+"""Ajustes del motor SQLite por conexión y detección de bloqueos transitorios."""
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from models import db
+
+MENSAJES_BLOQUEO = ('database is locked', 'database is busy', 'database table is locked')
+
+
+def es_bloqueo(error):
+    return isinstance(error, OperationalError) and any(m in str(error.orig).lower() for m in MENSAJES_BLOQUEO)
+
+
+def _registrar_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def aplicar_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nombre, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nombre}={valor}')
+        cursor.close()
+
+
+def init_app(app):
+    pragmas = app.config['SQLITE_PRAGMAS']
+    with app.app_context():
+        # También la réplica de lectura: necesita busy_timeout mientras refrescar-replica la sobrescribe
+        for engine in db.engines.values():
+            if pragmas and engine.dialect.name == 'sqlite':
+                _registrar_pragmas(engine, pragmas)
@@ -0,0 +1,53 @@
+"""Tiempo de arranque en frío del punto de entrada WSGI (import de wsgi.py,
+que incluye create_app), medido en procesos nuevos como un worker recién creado.
+
+Termina con código 1 si la mediana supera el objetivo.
+
+Uso: python benchmarks/arranque.py [--procesos 10] [--objetivo-ms 1000]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARRANQUE_OBJETIVO_MS = 1000
+
+MEDIR = '''
+import time
+inicio = time.perf_counter()
+import wsgi
+print((time.perf_counter() - inicio) * 1000)
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--procesos', type=int, default=10)
+    parser.add_argument('--objetivo-ms', type=float, default=ARRANQUE_OBJETIVO_MS)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_db = os.path.join(directorio, 'arranque.db')
+        entorno = dict(os.environ, FLASK_ENV='production', DATABASE_URL=f'sqlite:///{ruta_db}',
+                       SQL_LENTO_LOG=os.path.join(directorio, 'sql_lento.log'))
+        tiempos = []
+        for _ in range(args.procesos):
+            salida = subprocess.run([sys.executable, '-c', MEDIR], cwd=RAIZ, env=entorno,
+                                    capture_output=True, text=True, check=True)
+            tiempos.append(float(salida.stdout.strip().splitlines()[-1]))
+        toco_bd = os.path.exists(ruta_db)
+    
+    tiempos.sort()
+    mediana = statistics.median(tiempos)
+    print(f'Arranque en frío ({args.procesos} procesos): mediana {mediana:.0f} ms, '
+          f'máximo {tiempos[-1]:.0f} ms, objetivo {args.objetivo_ms:.0f} ms')
+    print(f'Base de datos abierta durante el arranque: {"sí" if toco_bd else "no"}')
+    if mediana > args.objetivo_ms or toco_bd:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""Prueba de carga del flujo de pedidos sobre un conjunto de datos generado.
+
+Arranca create_app('testing') contra una base SQLite temporal poblada con
+datos_sinteticos y reparte entre N hilos o procesos una mezcla de escenarios:
+login, dashboard, listados con filtros, crear pedido, agregar items y cambiar
+estado. Cada trabajador usa su propio vendedor y la misma semilla reproduce la
+misma secuencia de peticiones.
+
+El resultado es JSON con latencias p50/p95/p99, rendimiento y consultas SQL por
+petición (leídas de la cabecera Server-Timing) para cada escenario. Con
+--comparar se muestra la variación respecto a un resultado anterior.
+
+Uso: python benchmarks/carga.py [--pedidos 20000] [--trabajadores 4] [--modo hilos|procesos]
+                                [--peticiones 200] [--salida resultado.json] [--comparar base.json]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app import create_app
+from config import config, TestingConfig
+from migraciones import aplicar_migraciones
+from models import db, User, Pedido, Distribuidora, Producto, EstadoPedido
+import datos_sinteticos
+
+CONSULTAS = re.compile(r'desc="(\d+) consultas"')
+ESTADOS = [e.value for e in EstadoPedido]
+
+# (escenario, peso) de la mezcla de peticiones
+MEZCLA = (
+    ('dashboard', 15),
+    ('pedidos', 15),
+    ('pedidos_filtrados', 10),
+    ('productos_busqueda', 10),
+    ('distribuidoras', 5),
+    ('detalle_pedido', 15),
+    ('crear_pedido', 8),
+    ('agregar_item', 12),
+    ('cambiar_estado', 7),
+    ('login', 3),
+)
+
+
+def crear_app(ruta_db):
+    class ConfigCarga(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{ruta_db}'
+        WTF_CSRF_ENABLED = False
+        METRICAS_HABILITADAS = False
+        SQL_INSTRUMENTACION = True
+        SQLITE_PRAGMAS = {'journal_mode': 'WAL', 'busy_timeout': 5000, 'synchronous': 'NORMAL'}
+    
+    config['carga'] = ConfigCarga
+    return create_app('carga')
+
+
+def poblar(app, args):
+    with app.app_context():
+        db.create_all()
+        aplicar_migraciones()
+        with db.engine.connect() as conn:
+            datos_sinteticos.generar(conn, usuarios=max(args.trabajadores, 20), distribuidoras=200,
+                                     productos=2000, pedidos=args.pedidos, semilla=args.semilla,
+                                     confirmar_lotes=True)
+        vendedores = db.session.execute(select(User.username, User.id)
+                                        .where(User.activo.is_(True)).order_by(User.id)).all()
+        distribuidoras = db.session.execute(select(Distribuidora.id)
+                                            .where(Distribuidora.activa.is_(True))).scalars().all()
+        productos = db.session.execute(select(Producto.id, Producto.precio)
+                                       .where(Producto.activo.is_(True))).all()
+        return {
+            'vendedores': [tuple(v) for v in vendedores],
+            'distribuidoras': list(distribuidoras),
+            'productos': [(p.id, str(p.precio)) for p in productos],
+        }
+
+
+def _pedidos_de(app, usuario_id):
+    with app.app_context():
+        return db.session.execute(select(Pedido.id).where(Pedido.usuario_id == usuario_id)
+                                  .order_by(Pedido.id.desc()).limit(200)).scalars().all()
+
+
+class Escenarios:
+    """Peticiones de un vendedor; cada método devuelve la respuesta a medir."""
+    
+    def __init__(self, client, aleatorio, username, ids_pedidos, datos):
+        self.client = client
+        self.aleatorio = aleatorio
+        self.username = username
+        self.ids_pedidos = list(ids_pedidos)
+        self.datos = datos
+    
+    def _pedido(self):
+        return self.aleatorio.choice(self.ids_pedidos)
+    
+    def login(self):
+        self.client.get('/auth/logout')
+        return self.client.post('/auth/login', data={'username': self.username, 'password': 'vendedor123'})
+    
+    def dashboard(self):
+        return self.client.get('/dashboard')
+    
+    def pedidos(self):
+        return self.client.get('/pedidos')
+    
+    def pedidos_filtrados(self):
+        distribuidora = self.aleatorio.choice(self.datos['distribuidoras'])
+        return self.client.get('/pedidos', query_string={'estado': self.aleatorio.choice(ESTADOS),
+                                                          'distribuidora': f'Distribuidora {distribuidora}'})
+    
+    def productos_busqueda(self):
+        producto_id, _ = self.aleatorio.choice(self.datos['productos'])
+        return self.client.get('/productos', query_string={'search': f'Producto {producto_id}'})
+    
+    def distribuidoras(self):
+        return self.client.get('/distribuidoras')
+    
+    def detalle_pedido(self):
+        return self.client.get(f'/pedidos/{self._pedido()}')
+    
+    def crear_pedido(self):
+        respuesta = self.client.post('/pedidos/nuevo', data={
+            'distribuidora_id': self.aleatorio.choice(self.datos['distribuidoras']),
+            'observaciones': 'Prueba de carga'})
+        if respuesta.status_code == 302:
+            self.ids_pedidos.append(int(respuesta.headers['Location'].rstrip('/').rsplit('/', 1)[-1]))
+        return respuesta
+    
+    def agregar_item(self):
+        producto_id, precio = self.aleatorio.choice(self.datos['productos'])
+        return self.client.post(f'/pedidos/{self._pedido()}/agregar-item', data={
+            'producto_id': producto_id, 'cantidad': self.aleatorio.randint(1, 10), 'precio_unitario': precio})
+    
+    def cambiar_estado(self):
+        return self.client.post(f'/pedidos/{self._pedido()}/cambiar-estado',
+                                data={'estado': self.aleatorio.choice(ESTADOS)})
+
+
+def ejecutar(app, n, args, datos):
+    """Lanza las peticiones de un trabajador; devuelve (escenario, ms, consultas, estado) por petición."""
+    username, usuario_id = datos['vendedores'][n % len(datos['vendedores'])]
+    aleatorio = random.Random(args.semilla * 1000 + n)
+    client = app.test_client()
+    escenarios = Escenarios(client, aleatorio, username, _pedidos_de(app, usuario_id), datos)
+    escenarios.login()
+    if not escenarios.ids_pedidos:
+        escenarios.crear_pedido()
+    
+    nombres = [nombre for nombre, _ in MEZCLA]
+    pesos = [peso for _, peso in MEZCLA]
+    muestras = []
+    for nombre in aleatorio.choices(nombres, pesos, k=args.peticiones):
+        inicio = time.perf_counter()
+        respuesta = getattr(escenarios, nombre)()
+        duracion = (time.perf_counter() - inicio) * 1000
+        coincidencia = CONSULTAS.search(respuesta.headers.get('Server-Timing', ''))
+        muestras.append((nombre, duracion, int(coincidencia.group(1)) if coincidencia else None,
+                         respuesta.status_code))
+    return muestras
+
+
+def _trabajador_proceso(n, args, datos, ruta_db):
+    return ejecutar(crear_app(ruta_db), n, args, datos)
+
+
+def _percentil(valores, p):
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method='inclusive')[p - 1]
+
+
+def resumir(muestras, duracion):
+    def resumen(grupo):
+        latencias = [m[1] for m in grupo]
+        consultas = [m[2] for m in grupo if m[2] is not None]
+        return {
+            'peticiones': len(grupo),
+            'errores': sum(1 for m in grupo if m[3] >= 400),
+            'p50_ms': round(_percentil(latencias, 50), 2),
+            'p95_ms': round(_percentil(latencias, 95), 2),
+            'p99_ms': round(_percentil(latencias, 99), 2),
+            'consultas_por_peticion': round(statistics.mean(consultas), 2) if consultas else None,
+        }
+    
+    total = resumen(muestras)
+    total['peticiones_por_segundo'] = round(len(muestras) / duracion, 1)
+    escenarios = {}
+    for nombre, _ in MEZCLA:
+        grupo = [m for m in muestras if m[0] == nombre]
+        if grupo:
+            escenarios[nombre] = resumen(grupo)
+    return total, escenarios
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def comparar(actual, anterior):
+    """Variación porcentual de las métricas comparables respecto a un resultado anterior."""
+    def variacion(a, b):
+        return f'{(a - b) / b * 100:+.1f}%' if a is not None and b else None
+    
+    filas = {'total': (actual['total'], anterior['total'])}
+    for nombre, metricas in actual['escenarios'].items():
+        if nombre in anterior['escenarios']:
+            filas[nombre] = (metricas, anterior['escenarios'][nombre])
+    return {nombre: {clave: variacion(a.get(clave), b.get(clave))
+                     for clave in ('p50_ms', 'p95_ms', 'p99_ms', 'consultas_por_peticion', 'peticiones_por_segundo')
+                     if clave in a}
+            for nombre, (a, b) in filas.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pedidos', type=int, default=20000, help='Pedidos del conjunto de datos.')
+    parser.add_argument('--trabajadores', type=int, default=4)
+    parser.add_argument('--modo', choices=('hilos', 'procesos'), default='hilos')
+    parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por trabajador.')
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--salida', help='Escribe el resultado JSON en este archivo.')
+    parser.add_argument('--comparar', help='Resultado JSON anterior con el que comparar.')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_db = os.path.join(directorio, 'carga.db')
+        app = crear_app(ruta_db)
+        inicio = time.perf_counter()
+        datos = poblar(app, args)
+        print(f'Datos generados en {time.perf_counter() - inicio:.1f}s', file=sys.stderr)
+    
+        inicio = time.perf_counter()
+        if args.modo == 'hilos':
+            with ThreadPoolExecutor(args.trabajadores) as ejecutor:
+                tareas = [ejecutor.submit(ejecutar, app, n, args, datos) for n in range(args.trabajadores)]
+        else:
+            with app.app_context():
+                db.engine.dispose()
+            with ProcessPoolExecutor(args.trabajadores) as ejecutor:
+                tareas = [ejecutor.submit(_trabajador_proceso, n, args, datos, ruta_db)
+                          for n in range(args.trabajadores)]
+        muestras = [m for tarea in tareas for m in tarea.result()]
+        duracion = time.perf_counter() - inicio
+    
+    total, escenarios = resumir(muestras, duracion)
+    resultado = {
+        'commit': _commit(),
+        'parametros': {'pedidos': args.pedidos, 'trabajadores': args.trabajadores, 'modo': args.modo,
+                       'peticiones': args.peticiones, 'semilla': args.semilla},
+        'total': total,
+        'escenarios': escenarios,
+    }
+    if args.comparar:
+        with open(args.comparar) as archivo:
+            resultado['comparacion'] = comparar(resultado, json.load(archivo))
+    
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w') as archivo:
+            archivo.write(texto + '\n')
+    print(texto)
+
+
+if __name__ == '__main__':
+    main()
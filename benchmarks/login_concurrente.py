@@ -0,0 +1,104 @@
+"""Mide el rendimiento del login bajo concurrencia con los parámetros de hash
+de producción: peticiones por segundo, latencias p50/p95 y logins rechazados
+con 503 cuando el pool de hash está saturado.
+
+Compara el hash en el hilo de la petición (sin pool) con el pool acotado.
+
+Uso: python benchmarks/login_concurrente.py [--hilos 16] [--logins 200] [--hilos-hash 2]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import config, Config, TestingConfig
+from models import db, User, Rol
+from seguridad import HasherContrasenas
+
+
+def crear_app(ruta_db):
+    class ConfigBenchmark(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{ruta_db}'
+        PASSWORD_HASH_METODO = Config.PASSWORD_HASH_METODO
+        WTF_CSRF_ENABLED = False
+        METRICAS_HABILITADAS = False
+    
+    config['benchmark'] = ConfigBenchmark
+    app = create_app('benchmark')
+    with app.app_context():
+        db.create_all()
+        for i in range(20):
+            usuario = User(username=f'vendedor{i}', email=f'vendedor{i}@ejemplo.com',
+                           nombre=f'Vendedor {i}', rol=Rol.VENDEDOR)
+            usuario.set_password('clave-segura')
+            db.session.add(usuario)
+        db.session.commit()
+    return app
+
+
+def medir(app, hilos, logins):
+    latencias = []
+    estados = {}
+    bloqueo = threading.Lock()
+    por_hilo = logins // hilos
+    
+    def trabajador(n):
+        client = app.test_client()
+        for i in range(por_hilo):
+            inicio = time.perf_counter()
+            respuesta = client.post('/auth/login', data={'username': f'vendedor{(n + i) % 20}',
+                                                         'password': 'clave-segura'})
+            duracion = time.perf_counter() - inicio
+            client.get('/auth/logout')
+            with bloqueo:
+                latencias.append(duracion * 1000)
+                estados[respuesta.status_code] = estados.get(respuesta.status_code, 0) + 1
+    
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajador, args=(n,)) for n in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    total = time.perf_counter() - inicio
+    
+    latencias.sort()
+    return {
+        'logins/s': len(latencias) / total,
+        'p50 ms': statistics.median(latencias),
+        'p95 ms': latencias[int(len(latencias) * 0.95) - 1],
+        'estados': estados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hilos', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--hilos-hash', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--en-espera', type=int, default=32)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        app = crear_app(os.path.join(directorio, 'benchmark.db'))
+        metodo = app.config['PASSWORD_HASH_METODO']
+        print(f'Método: {metodo} · {args.hilos} hilos de petición · {args.logins} logins')
+        
+        pool = app.extensions.pop('contrasenas')
+        print('En el hilo de la petición:', medir(app, args.hilos, args.logins))
+        
+        pool.cerrar()
+        app.extensions['contrasenas'] = HasherContrasenas(metodo, hilos=args.hilos_hash,
+                                                          en_espera=args.en_espera)
+        print(f'Pool ({args.hilos_hash} hilos, {args.en_espera} en espera):',
+              medir(app, args.hilos, args.logins))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Compara planes de ejecución y tiempos de las consultas de los listados
+antes y después de crear los índices declarados en models.py (migración 0002).
+
+Uso: python benchmarks/planes_consulta.py [--pedidos 100000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select, text
+
+from models import db, User, Distribuidora, Producto, Pedido, ItemPedido, EstadoPedido, Rol
+
+
+def consultas():
+    reciente = (Pedido.fecha_creacion.desc(), Pedido.id.desc())
+    return {
+        'pedidos de un vendedor': select(Pedido).where(Pedido.usuario_id == 3).order_by(*reciente).limit(11),
+        'pedidos por estado': select(Pedido).where(Pedido.estado == EstadoPedido.ENVIADO).order_by(*reciente).limit(11),
+        'pedidos de una distribuidora': select(Pedido).where(Pedido.distribuidora_id == 7).order_by(*reciente).limit(11),
+        'pedidos recientes (dashboard)': select(Pedido).order_by(*reciente).limit(5),
+        'items de un pedido': select(ItemPedido).where(ItemPedido.pedido_id == 4242),
+        'productos activos': select(Producto).where(Producto.activo == True)
+                             .order_by(Producto.fecha_creacion.desc(), Producto.id.desc()).limit(11),
+        'distribuidoras activas': select(Distribuidora).where(Distribuidora.activa == True)
+                                  .order_by(Distribuidora.fecha_creacion.desc(), Distribuidora.id.desc()).limit(11),
+    }
+
+
+def poblar(engine, n_pedidos):
+    aleatorio = random.Random(7)
+    inicio = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': '-',
+             'rol': Rol.VENDEDOR, 'nombre': f'Usuario {i}', 'activo': True,
+             'fecha_creacion': inicio + timedelta(days=i)} for i in range(1, 51)])
+        conn.execute(insert(Distribuidora), [
+            {'nombre': f'Distribuidora {i}', 'codigo': f'D{i:04d}', 'contacto': '-', 'telefono': '-',
+             'email': '-', 'activa': i % 5 != 0, 'fecha_creacion': inicio + timedelta(hours=i)}
+            for i in range(1, 201)])
+        conn.execute(insert(Producto), [
+            {'nombre': f'Producto {i}', 'codigo': f'P{i:06d}', 'precio': 10, 'stock': 5,
+             'activo': i % 4 != 0, 'fecha_creacion': inicio + timedelta(minutes=i)}
+            for i in range(1, 5001)])
+        estados = list(EstadoPedido)
+        for desde in range(1, n_pedidos + 1, 10000):
+            ids = range(desde, min(desde + 10000, n_pedidos + 1))
+            conn.execute(insert(Pedido), [
+                {'id': i, 'id_pedido': f'PED-{i:08d}', 'distribuidora_id': aleatorio.randint(1, 200),
+                 'usuario_id': aleatorio.randint(1, 50), 'estado': aleatorio.choice(estados),
+                 'fecha_creacion': inicio + timedelta(minutes=i)} for i in ids])
+            conn.execute(insert(ItemPedido), [
+                {'pedido_id': i, 'producto_id': aleatorio.randint(1, 5000), 'cantidad': 1,
+                 'precio_unitario': 10} for i in ids for _ in range(3)])
+
+
+def medir(engine, nombre, consulta, repeticiones=20):
+    sql = str(consulta.compile(engine, compile_kwargs={'literal_binds': True}))
+    with engine.connect() as conn:
+        plan = [fila[-1] for fila in conn.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            conn.execute(text(sql)).fetchall()
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    return plan, statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pedidos', type=int, default=100000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        engine = create_engine(f"sqlite:///{os.path.join(directorio, 'bench.db')}")
+        db.metadata.create_all(engine)
+        with engine.begin() as conn:
+            for tabla in db.metadata.sorted_tables:
+                for indice in tabla.indexes:
+                    indice.drop(conn)
+        poblar(engine, args.pedidos)
+        
+        antes = {nombre: medir(engine, nombre, consulta) for nombre, consulta in consultas().items()}
+        with engine.begin() as conn:
+            for tabla in db.metadata.sorted_tables:
+                for indice in tabla.indexes:
+                    indice.create(conn)
+            conn.execute(text('ANALYZE'))
+        despues = {nombre: medir(engine, nombre, consulta) for nombre, consulta in consultas().items()}
+        engine.dispose()
+    
+    for nombre in antes:
+        plan_antes, ms_antes = antes[nombre]
+        plan_despues, ms_despues = despues[nombre]
+        print(f'== {nombre}: {ms_antes:.2f} ms -> {ms_despues:.2f} ms')
+        print('   antes:   ' + ' | '.join(plan_antes))
+        print('   después: ' + ' | '.join(plan_despues))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""CPU por petición del listado de productos de app_final.py antes y después de
+usar plantillas precompiladas con streaming.
+
+"Antes" reproduce la versión anterior: concatenación de f-strings en un bucle y
+render_template_string de BASE_TEMPLATE en cada petición. La versión anterior
+nunca mostraba ``content`` (la plantilla solo tenía un bloque vacío); aquí se
+inserta con ``|safe`` para comparar respuestas del mismo tamaño.
+
+Uso: python benchmarks/plantillas_standalone.py [--productos 100 1000 5000] [--repeticiones 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+directorio = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(directorio, "standalone.db")}'
+
+from flask import render_template_string
+from flask_login import login_required
+from sqlalchemy import delete, insert
+
+from app_final import app, db, BASE_TEMPLATE, Producto, User, Rol
+
+PLANTILLA_ANTES = BASE_TEMPLATE.replace('{% block content %}{% endblock %}', '{{ content|safe }}')
+
+
+@app.route('/_antes/productos')
+@login_required
+def productos_antes():
+    content = '''
+    <div class="card"><div class="card-body"><table class="table table-hover"><tbody>
+    '''
+    for p in Producto.query.all():
+        stock_color = 'success' if p.stock > 10 else 'warning' if p.stock > 0 else 'danger'
+        content += f'''
+            <tr>
+                <td><strong>{p.codigo}</strong></td>
+                <td>{p.nombre}</td>
+                <td>${float(p.precio):.2f}</td>
+                <td>
+                    <span class="badge bg-{stock_color}">
+                        {p.stock} unidades
+                    </span>
+                </td>
+                <td>
+                    <span class="badge bg-{'success' if p.activo else 'secondary'}">
+                        {'Activo' if p.activo else 'Inactivo'}
+                    </span>
+                </td>
+            </tr>
+        '''
+    content += '''
+    </tbody></table></div></div>
+    '''
+    return render_template_string(PLANTILLA_ANTES, title='Productos', content=content)
+
+
+def cpu_por_peticion(client, url, repeticiones):
+    client.get(url).get_data()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.process_time()
+        client.get(url).get_data()
+        tiempos.append((time.process_time() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--productos', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--repeticiones', type=int, default=20)
+    args = parser.parse_args()
+    
+    with app.app_context():
+        db.create_all()
+        usuario = User(username='admin', email='admin@sistema.com', nombre='Admin',
+                       rol=Rol.ADMINISTRADOR, password_hash='sin-password')
+        db.session.add(usuario)
+        db.session.commit()
+        user_id = usuario.id
+    
+    client = app.test_client()
+    with client.session_transaction() as sesion:
+        sesion['_user_id'] = str(user_id)
+    
+    print(f'{"productos":>10} {"antes ms":>10} {"después ms":>11} {"mejora":>7}')
+    for n in args.productos:
+        with app.app_context():
+            db.session.execute(delete(Producto))
+            db.session.execute(insert(Producto), [
+                {'nombre': f'Producto {i}', 'codigo': f'P{i:06d}', 'precio': 9.99, 'stock': i % 20}
+                for i in range(n)])
+            db.session.commit()
+        antes = cpu_por_peticion(client, '/_antes/productos', args.repeticiones)
+        despues = cpu_por_peticion(client, '/productos', args.repeticiones)
+        print(f'{n:>10} {antes:>10.2f} {despues:>11.2f} {antes / despues:>6.1f}x')
+
+
+if __name__ == '__main__':
+    main()
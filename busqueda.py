@@ -0,0 +1,154 @@
+import re
+import weakref
+from sqlalchemy import literal_column, or_, select, text
+from sqlalchemy.exc import OperationalError
+from models import db, User, Distribuidora, Producto
+
+# Tabla FTS5 por modelo y columnas indexadas; la primera columna pesa más en el ranking
+INDICES = {
+    Producto: ('productos_fts', ('codigo', 'nombre')),
+    Distribuidora: ('distribuidoras_fts', ('codigo', 'nombre')),
+    User: ('users_fts', ('username', 'nombre', 'email')),
+}
+
+# engine -> {tabla FTS: existe}
+_fts_disponible = weakref.WeakKeyDictionary()
+
+
+def fts5_compilado(conn):
+    if conn.dialect.name != 'sqlite':
+        return False
+    try:
+        conn.execute(text("CREATE VIRTUAL TABLE IF NOT EXISTS temp._prueba_fts5 USING fts5(x)"))
+        conn.execute(text("DROP TABLE temp._prueba_fts5"))
+    except OperationalError:
+        return False
+    return True
+
+
+def crear_indices_prefijo(conn):
+    """Índices NOCASE para que el LIKE 'término%' de la alternativa sin FTS5 use índice en SQLite."""
+    for modelo, (_, columnas) in INDICES.items():
+        tabla = modelo.__tablename__
+        for columna in columnas:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{tabla}_{columna}_nocase "
+                              f"ON {tabla} ({columna} COLLATE NOCASE)"))
+
+
+def crear_indices_busqueda(conn):
+    """Crea las tablas FTS5 y los triggers que las mantienen sincronizadas."""
+    if not fts5_compilado(conn):
+        if conn.dialect.name == 'sqlite':
+            crear_indices_prefijo(conn)
+        return False
+    
+    for modelo, (fts, columnas) in INDICES.items():
+        tabla = modelo.__tablename__
+        lista = ', '.join(columnas)
+        nuevos = ', '.join(f'new.{c}' for c in columnas)
+        viejos = ', '.join(f'old.{c}' for c in columnas)
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({lista}, content='{tabla}', "
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabla} BEGIN "
+            f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabla} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); END"))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {lista} ON {tabla} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); "
+            f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END"))
+    reconstruir_indices_busqueda(conn)
+    return True
+
+
+def reconstruir_indices_busqueda(conn):
+    for fts, _ in INDICES.values():
+        conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+def _usa_fts(modelo):
+    engine = db.engine
+    fts = INDICES[modelo][0]
+    disponibles = _fts_disponible.setdefault(engine, {})
+    if fts not in disponibles:
+        disponible = False
+        if engine.dialect.name == 'sqlite':
+            with engine.connect() as conn:
+                disponible = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nombre"),
+                    {'nombre': fts}).first() is not None
+        disponibles[fts] = disponible
+    return disponibles[fts]
+
+
+def _terminos(busqueda):
+    return re.findall(r'\w+', busqueda.lower())
+
+
+def _consulta_fts(terminos):
+    # Cada término se busca como prefijo y todos deben aparecer
+    return ' '.join(f'"{t}"*' for t in terminos)
+
+
+def _patron_prefijo(termino):
+    # \w incluye '_', que en LIKE es comodín
+    return re.sub(r'([\\%_])', r'\\\1', termino) + '%'
+
+
+def _prefijo(modelo, terminos):
+    # Alternativa sin FTS5: LIKE 'término%' sin distinguir mayúsculas. En SQLite usa
+    # los índices NOCASE de crear_indices_prefijo; en otros motores recorre la tabla
+    _, columnas = INDICES[modelo]
+    condiciones = []
+    for termino in terminos:
+        patron = _patron_prefijo(termino)
+        condiciones.append(or_(*(getattr(modelo, c).like(patron, escape='\\') for c in columnas)))
+    return condiciones
+
+
+def coincide(modelo, busqueda, columna_id=None):
+    """Condición SQL: ``columna_id`` (por defecto ``modelo.id``) pertenece a una fila que coincide."""
+    columna_id = columna_id if columna_id is not None else modelo.id
+    terminos = _terminos(busqueda)
+    if not _usa_fts(modelo):
+        ids = select(modelo.id).where(*_prefijo(modelo, terminos))
+    else:
+        fts = INDICES[modelo][0]
+        ids = (select(literal_column('rowid'))
+               .select_from(text(fts))
+               .where(text(f'{fts} MATCH :consulta').bindparams(consulta=_consulta_fts(terminos))))
+    return columna_id.in_(ids)
+
+
+def filtrar(query, modelo, busqueda, columna_id=None):
+    """Restringe ``query`` a las filas que coinciden con ``busqueda`` en ``modelo``."""
+    if not _terminos(busqueda):
+        return query
+    return query.filter(coincide(modelo, busqueda, columna_id))
+
+
+def buscar(modelo, busqueda, limite=20, query=None, desde=0):
+    """Devuelve hasta ``limite`` filas de ``modelo`` ordenadas por relevancia, saltando ``desde``."""
+    terminos = _terminos(busqueda)
+    query = query if query is not None else modelo.query
+    if not terminos:
+        return []
+    if not _usa_fts(modelo):
+        return (query.filter(*_prefijo(modelo, terminos)).order_by(modelo.id)
+                .offset(desde).limit(limite).all())
+    
+    fts, columnas = INDICES[modelo]
+    pesos = ', '.join(str(10.0 / (i + 1)) for i in range(len(columnas)))
+    ranking = (select(literal_column('rowid').label('id'),
+                      literal_column(f'bm25({fts}, {pesos})').label('rango'))
+               .select_from(text(fts))
+               .where(text(f'{fts} MATCH :consulta').bindparams(consulta=_consulta_fts(terminos)))
+               .subquery())
+    return (query.join(ranking, modelo.id == ranking.c.id)
+            .order_by(ranking.c.rango, modelo.id)
+            .offset(desde)
+            .limit(limite)
+            .all())
@@ -0,0 +1,65 @@
+import threading
+import time
+
+# Funciones (nombre_cache, acierto) avisadas en cada consulta, p. ej. para métricas
+observadores = []
+
+
+class CacheTTL:
+    """Cache en memoria compartida por todos los hilos del proceso.
+
+    Cuando una clave expira, solo un hilo ejecuta ``calcular``; el resto espera
+    y reutiliza el valor recién calculado.
+    """
+    
+    def __init__(self, nombre='general', reloj=time.monotonic):
+        self.nombre = nombre
+        self._reloj = reloj
+        self._valores = {}
+        self._bloqueos = {}
+        self._bloqueo = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def _vigente(self, clave):
+        entrada = self._valores.get(clave)
+        if entrada is not None and entrada[0] > self._reloj():
+            return entrada
+        return None
+    
+    def obtener(self, clave, calcular, ttl):
+        entrada = self._vigente(clave)
+        if entrada is not None:
+            self._contar(True)
+            return entrada[1]
+        
+        with self._bloqueo:
+            bloqueo_clave = self._bloqueos.setdefault(clave, threading.Lock())
+        
+        with bloqueo_clave:
+            entrada = self._vigente(clave)
+            if entrada is not None:
+                self._contar(True)
+                return entrada[1]
+            
+            self._contar(False)
+            valor = calcular()
+            self._valores[clave] = (self._reloj() + ttl, valor)
+            return valor
+    
+    def _contar(self, acierto):
+        if acierto:
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+        for observador in observadores:
+            observador(self.nombre, acierto)
+    
+    def invalidar(self, clave=None):
+        if clave is None:
+            self._valores.clear()
+        else:
+            self._valores.pop(clave, None)
+
+
+cache = CacheTTL('estadisticas')
@@ -0,0 +1,112 @@
+import time
+import click
+from flask import current_app
+from models import db, User, Rol, recalcular_totales_pedidos
+from migraciones import aplicar_migraciones
+from busqueda import reconstruir_indices_busqueda
+from lectura import BIND_LECTURA, refrescar_replica_sqlite
+from versiones import TABLAS
+import datos_sinteticos
+import archivo
+
+
+def crear_administrador():
+    """Crea el usuario admin / admin123 si no existe y lo devuelve; None si ya existía."""
+    if User.query.filter_by(username='admin').first():
+        return None
+    admin = User(username='admin', email='admin@sistema.com',
+                 nombre='Administrador del Sistema', rol=Rol.ADMINISTRADOR)
+    admin.set_password('admin123')
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+def register_commands(app):
+    @app.cli.command('migrar')
+    def migrar():
+        """Crea las tablas que falten y aplica las migraciones pendientes del esquema."""
+        db.create_all()
+        aplicadas = aplicar_migraciones()
+        if aplicadas:
+            for nombre in aplicadas:
+                click.echo(f'Migración aplicada: {nombre}')
+        else:
+            click.echo('El esquema está al día')
+    
+    @app.cli.command('seed')
+    def seed():
+        """Crea los datos iniciales (usuario administrador)."""
+        if crear_administrador():
+            click.echo('Usuario administrador creado: admin / admin123')
+        else:
+            click.echo('El usuario administrador ya existe')
+    
+    @app.cli.command('recalcular-totales')
+    @click.option('--lote', default=1000, show_default=True, help='Pedidos por transacción.')
+    def recalcular_totales(lote):
+        """Recalcula total y total_items de todos los pedidos desde sus items."""
+        with db.engine.connect() as conn:
+            actualizados = recalcular_totales_pedidos(conn, lote=lote, confirmar_lotes=True)
+        click.echo(f'{actualizados} pedidos recalculados')
+    
+    @app.cli.command('reindexar-busqueda')
+    def reindexar_busqueda():
+        """Reconstruye los índices de búsqueda de texto completo."""
+        with db.engine.begin() as conn:
+            reconstruir_indices_busqueda(conn)
+        click.echo('Índices de búsqueda reconstruidos')
+    
+    @app.cli.command('generar-datos')
+    @click.option('--usuarios', default=50, show_default=True)
+    @click.option('--distribuidoras', default=200, show_default=True)
+    @click.option('--productos', default=5000, show_default=True)
+    @click.option('--pedidos', default=100000, show_default=True)
+    @click.option('--semilla', default=1, show_default=True, help='Misma semilla, mismos datos.')
+    @click.option('--lote', default=20000, show_default=True, help='Pedidos por INSERT y transacción.')
+    def generar_datos(usuarios, distribuidoras, productos, pedidos, semilla, lote):
+        """Genera datos sintéticos con distribución realista para pruebas de volumen."""
+        inicio = time.perf_counter()
+        
+        def progreso(generados):
+            click.echo(f'{generados}/{pedidos} pedidos ({time.perf_counter() - inicio:.1f}s)')
+        
+        with db.engine.connect() as conn:
+            creadas = datos_sinteticos.generar(conn, usuarios, distribuidoras, productos, pedidos,
+                                               semilla=semilla, lote=lote, confirmar_lotes=True,
+                                               progreso=progreso)
+        # Las filas no pasan por la sesión; se invalidan a mano ETags y fragmentos
+        for tabla in TABLAS:
+            current_app.extensions['versiones_tablas'].cambiar(tabla)
+        resumen = ', '.join(f'{n} {tabla}' for tabla, n in creadas.items())
+        click.echo(f'Generados {resumen} en {time.perf_counter() - inicio:.1f}s')
+    
+    @app.cli.command('archivar-pedidos')
+    @click.option('--dias', type=int, help='Antigüedad mínima (por defecto ARCHIVO_ANTIGUEDAD_DIAS).')
+    @click.option('--lote', type=int, help='Pedidos por transacción (por defecto ARCHIVO_LOTE).')
+    def archivar_pedidos(dias, lote):
+        """Mueve los pedidos recibidos o cancelados antiguos a las tablas de archivo."""
+        dias = dias if dias is not None else current_app.config['ARCHIVO_ANTIGUEDAD_DIAS']
+        inicio = time.perf_counter()
+        with db.engine.connect() as conn:
+            archivados = archivo.archivar_pedidos(conn, dias, lote=lote or current_app.config['ARCHIVO_LOTE'],
+                                                   confirmar_lotes=True, pausa=current_app.config['ARCHIVO_PAUSA'])
+        if archivados:
+            for tabla in ('pedidos', 'items_pedido', 'pedidos_archivo', 'items_pedido_archivo'):
+                current_app.extensions['versiones_tablas'].cambiar(tabla)
+        click.echo(f'{archivados} pedidos archivados en {time.perf_counter() - inicio:.1f}s')
+    
+    @app.cli.command('refrescar-replica')
+    @click.option('--intervalo', type=float, help='Repite la copia cada N segundos.')
+    def refrescar_replica(intervalo):
+        """Copia la base principal SQLite sobre la réplica de lectura."""
+        replica = db.engines.get(BIND_LECTURA)
+        if replica is None or replica.dialect.name != 'sqlite' or db.engine.dialect.name != 'sqlite':
+            raise click.ClickException('LECTURA_DATABASE_URL debe apuntar a una base SQLite')
+        while True:
+            inicio = time.perf_counter()
+            refrescar_replica_sqlite(db.engine, replica)
+            click.echo(f'Réplica actualizada en {time.perf_counter() - inicio:.2f}s')
+            if not intervalo:
+                break
+            time.sleep(intervalo)
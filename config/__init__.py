@@ -6,6 +6,21 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///sistema_pedidos.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Réplica opcional para las vistas de solo lectura. Con SQLite puede ser una
+    # copia que se refresca con `flask refrescar-replica`
+    LECTURA_DATABASE_URL = os.environ.get('LECTURA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {'lectura': LECTURA_DATABASE_URL} if LECTURA_DATABASE_URL else {}
+    # Segundos que un usuario lee de la base principal después de escribir
+    LECTURA_VENTANA_ESCRITURA = 10
+    
+    # PRAGMAs aplicados a cada conexión SQLite nueva
+    # Sin foreign_keys SQLite no aplica ON DELETE CASCADE
+    SQLITE_PRAGMAS = {'foreign_keys': 'ON'}
+    
+    # Reintentos de las escrituras que fallan con "database is locked"
+    SQLITE_REINTENTOS = 3
+    SQLITE_REINTENTO_ESPERA = 0.05
+    
     # Configuración de sesión
     PERMANENT_SESSION_LIFETIME = timedelta(hours=2)
     
@@ -15,18 +30,86 @@ class Config:
     
     # Configuración de paginación
     ITEMS_PER_PAGE = 10
+    
+    # Líneas aceptadas por petición en la carga masiva de items
+    MAX_ITEMS_POR_LOTE = 1000
+    
+    # Instrumentación SQL por petición y log de consultas lentas (relativo a instance/)
+    SQL_INSTRUMENTACION = True
+    SQL_LENTO_UMBRAL_MS = float(os.environ.get('SQL_LENTO_UMBRAL_MS', 200))
+    SQL_LENTO_LOG = os.environ.get('SQL_LENTO_LOG', 'logs/sql_lento.log')
+    SQL_LENTO_LOG_BYTES = 5 * 1024 * 1024
+    SQL_LENTO_LOG_COPIAS = 5
+    SQL_CONSULTAS_LENTAS_POR_PETICION = 3
+    
+    # Hash de contraseñas: método de Werkzeug completo (p. ej. 'pbkdf2:sha256:600000' o
+    # 'scrypt:32768:8:1'); los hashes con otro método se regeneran al iniciar sesión
+    PASSWORD_HASH_METODO = os.environ.get('PASSWORD_HASH_METODO', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_LONGITUD_SAL = 16
+    PASSWORD_HASH_HILOS = int(os.environ.get('PASSWORD_HASH_HILOS', 0)) or None
+    PASSWORD_HASH_EN_ESPERA = int(os.environ.get('PASSWORD_HASH_EN_ESPERA', 32))
+    PASSWORD_HASH_TIMEOUT = 10
+    
+    # Cache de usuarios autenticados; el archivo de versiones (relativo a instance/)
+    # lo comparten los procesos del servidor para invalidar entre ellos
+    IDENTIDAD_CACHE_TTL = 300
+    IDENTIDAD_CACHE_MAX = 10000
+    IDENTIDAD_VERSIONES_ARCHIVO = 'identidades.versiones'
+    
+    # ETag de listados y detalle: versiones por tabla compartidas entre procesos y
+    # semilla opcional (p. ej. la versión desplegada) para compartir ETags entre workers
+    TABLAS_VERSIONES_ARCHIVO = 'tablas.versiones'
+    ETAG_SEMILLA = os.environ.get('ETAG_SEMILLA')
+    
+    # Métricas de Prometheus en /admin/metrics; el token permite el scraping sin sesión
+    METRICAS_HABILITADAS = True
+    METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN')
+    
+    # Cache de fragmentos de plantilla ({% cache %}): 'memoria' (LRU por proceso),
+    # 'archivos' (directorio local compartido por los workers) o None
+    FRAGMENTOS_CACHE = os.environ.get('FRAGMENTOS_CACHE', 'memoria')
+    FRAGMENTOS_CACHE_MAX = 1000
+    FRAGMENTOS_CACHE_DIR = 'fragmentos'
+    
+    # Segundos que se reutilizan las estadísticas de los dashboards
+    ESTADISTICAS_CACHE_TTL = int(os.environ.get('ESTADISTICAS_CACHE_TTL', 30))
+    
+    # flask archivar-pedidos: pedidos cerrados con más de N días pasan al archivo, por
+    # lotes de ARCHIVO_LOTE pedidos con ARCHIVO_PAUSA segundos entre lotes
+    ARCHIVO_ANTIGUEDAD_DIAS = int(os.environ.get('ARCHIVO_ANTIGUEDAD_DIAS', 365))
+    ARCHIVO_LOTE = 1000
+    ARCHIVO_PAUSA = 0.05
 
 class DevelopmentConfig(Config):
     DEBUG = True
-    SQLALCHEMY_ECHO = True
+    SQLALCHEMY_ECHO = os.environ.get('SQLALCHEMY_ECHO') == '1'
 
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_ECHO = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_POOL_OVERFLOW', 5)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+    }
+    # WAL: los lectores no esperan al escritor; busy_timeout en ms, mmap_size en
+    # bytes y cache_size negativo en KiB
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'foreign_keys': 'ON',
+    }
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQL_LENTO_LOG = None
+    IDENTIDAD_VERSIONES_ARCHIVO = None
+    TABLAS_VERSIONES_ARCHIVO = None
+    PASSWORD_HASH_METODO = 'pbkdf2:sha256:1000'
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,149 @@
+"""Generador de datos sintéticos para pruebas de volumen.
+
+Las filas se insertan con INSERT de Core en lotes y con ids explícitos, así que
+los items se enlazan a sus pedidos sin leer nada de vuelta. La distribución
+imita el uso real:
+
+- popularidad de productos, distribuidoras y vendedores con ley de Zipf;
+- fechas con estacionalidad (picos en noviembre-diciembre, menos pedidos en fin
+  de semana);
+- estado según la antigüedad: los pedidos recientes siguen pendientes o
+  enviados y los antiguos están casi todos recibidos.
+
+La misma semilla genera siempre los mismos datos.
+"""
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func, insert, select
+from models import (User, Distribuidora, Producto, Pedido, ItemPedido, PedidoArchivado, ItemPedidoArchivado,
+                    EstadoPedido, Rol)
+from seguridad import generar_hash
+
+# Peso relativo de cada mes (enero = índice 0) y de cada día de la semana (lunes = 0)
+PESO_MES = (0.8, 0.8, 0.9, 0.9, 1.0, 0.9, 0.8, 0.9, 1.0, 1.1, 1.4, 1.6)
+PESO_DIA = (1.0, 1.0, 1.0, 1.0, 1.1, 0.5, 0.3)
+ITEMS_POR_PEDIDO = (1, 2, 3, 4, 5, 6, 8, 10)
+PESO_ITEMS = (20, 25, 20, 12, 9, 7, 4, 3)
+CENTAVO = Decimal('0.01')
+
+
+def _zipf(n, exponente):
+    """Pesos acumulados de una ley de Zipf sobre n elementos, para random.choices."""
+    return list(itertools.accumulate(1 / (rango ** exponente) for rango in range(1, n + 1)))
+
+
+def _siguiente_id(conn, *modelos):
+    # Pedidos e items archivados conservan su id: el siguiente debe superar también al archivo
+    return max(conn.execute(select(func.max(modelo.id))).scalar() or 0 for modelo in modelos) + 1
+
+
+def _fechas(aleatorio, desde, hasta, n):
+    """n fechas ordenadas entre desde y hasta siguiendo PESO_MES y PESO_DIA."""
+    segundos = (hasta - desde).total_seconds()
+    maximo = max(PESO_MES) * max(PESO_DIA)
+    fechas = []
+    while len(fechas) < n:
+        fecha = desde + timedelta(seconds=aleatorio.random() * segundos)
+        if aleatorio.random() * maximo <= PESO_MES[fecha.month - 1] * PESO_DIA[fecha.weekday()]:
+            fechas.append(fecha)
+    fechas.sort()
+    return fechas
+
+
+def _estado(aleatorio, antiguedad):
+    if antiguedad < timedelta(days=3):
+        opciones, pesos = ('PENDIENTE', 'ENVIADO', 'CANCELADO'), (70, 25, 5)
+    elif antiguedad < timedelta(days=15):
+        opciones, pesos = ('PENDIENTE', 'ENVIADO', 'RECIBIDO', 'CANCELADO'), (15, 45, 32, 8)
+    else:
+        opciones, pesos = ('PENDIENTE', 'ENVIADO', 'RECIBIDO', 'CANCELADO'), (1, 3, 86, 10)
+    return EstadoPedido[aleatorio.choices(opciones, pesos)[0]]
+
+
+def generar(conn, usuarios=50, distribuidoras=200, productos=5000, pedidos=100000,
+            semilla=1, lote=20000, dias=730, hasta=None, confirmar_lotes=False, progreso=None):
+    """Inserta los datos en ``conn`` y devuelve las filas creadas por tabla.
+    
+    ``progreso(pedidos_generados)`` se llama después de cada lote de pedidos.
+    """
+    aleatorio = random.Random(semilla)
+    hasta = hasta or datetime(2024, 12, 31)
+    desde = hasta - timedelta(days=dias)
+    
+    primer_usuario = _siguiente_id(conn, User)
+    password_hash = generar_hash('vendedor123')
+    ids_usuarios = list(range(primer_usuario, primer_usuario + usuarios))
+    conn.execute(insert(User.__table__), [
+        {'id': i, 'username': f'vendedor{i}', 'email': f'vendedor{i}@ejemplo.com',
+         'password_hash': password_hash, 'rol': Rol.VENDEDOR, 'nombre': f'Vendedor {i}',
+         'activo': aleatorio.random() > 0.05, 'fecha_creacion': desde + timedelta(days=aleatorio.randrange(dias))}
+        for i in ids_usuarios])
+    
+    primera_distribuidora = _siguiente_id(conn, Distribuidora)
+    ids_distribuidoras = list(range(primera_distribuidora, primera_distribuidora + distribuidoras))
+    conn.execute(insert(Distribuidora.__table__), [
+        {'id': i, 'nombre': f'Distribuidora {i}', 'codigo': f'SD{i:06d}', 'contacto': f'Contacto {i}',
+         'telefono': f'555-{i % 10000:04d}', 'email': f'distribuidora{i}@ejemplo.com',
+         'activa': aleatorio.random() > 0.1, 'fecha_creacion': desde + timedelta(days=aleatorio.randrange(dias))}
+        for i in ids_distribuidoras])
+    
+    primer_producto = _siguiente_id(conn, Producto)
+    ids_productos = list(range(primer_producto, primer_producto + productos))
+    precios = [Decimal(str(round(aleatorio.lognormvariate(3, 0.9), 2))).quantize(CENTAVO) + CENTAVO
+               for _ in ids_productos]
+    for desde_fila in range(0, productos, lote):
+        conn.execute(insert(Producto.__table__), [
+            {'id': ids_productos[j], 'nombre': f'Producto {ids_productos[j]}', 'codigo': f'SP{ids_productos[j]:07d}',
+             'precio': precios[j], 'stock': aleatorio.randrange(500), 'activo': aleatorio.random() > 0.15,
+             'fecha_creacion': desde + timedelta(days=aleatorio.randrange(dias))}
+            for j in range(desde_fila, min(desde_fila + lote, productos))])
+    if confirmar_lotes:
+        conn.commit()
+    
+    # Los primeros ids de cada lista son los más populares
+    zipf_usuarios = _zipf(usuarios, 0.8)
+    zipf_distribuidoras = _zipf(distribuidoras, 1.0)
+    zipf_productos = _zipf(productos, 1.1)
+    posiciones_productos = range(productos)
+    
+    primer_pedido = _siguiente_id(conn, Pedido, PedidoArchivado)
+    primer_item = _siguiente_id(conn, ItemPedido, ItemPedidoArchivado)
+    siguiente_item = primer_item
+    fechas = _fechas(aleatorio, desde, hasta, pedidos)
+    for desde_fila in range(0, pedidos, lote):
+        n = min(lote, pedidos - desde_fila)
+        filas_pedidos, filas_items = [], []
+        usuarios_lote = aleatorio.choices(ids_usuarios, cum_weights=zipf_usuarios, k=n)
+        distribuidoras_lote = aleatorio.choices(ids_distribuidoras, cum_weights=zipf_distribuidoras, k=n)
+        for j in range(n):
+            pedido_id = primer_pedido + desde_fila + j
+            fecha = fechas[desde_fila + j]
+            estado = _estado(aleatorio, hasta - fecha)
+            total, total_items = Decimal('0.00'), 0
+            cantidad_items = aleatorio.choices(ITEMS_POR_PEDIDO, PESO_ITEMS)[0]
+            for posicion in aleatorio.choices(posiciones_productos, cum_weights=zipf_productos, k=cantidad_items):
+                cantidad = aleatorio.choices((1, 2, 3, 5, 10, 20), (40, 25, 12, 10, 8, 5))[0]
+                filas_items.append({'id': siguiente_item, 'pedido_id': pedido_id,
+                                    'producto_id': ids_productos[posicion],
+                                    'cantidad': cantidad, 'precio_unitario': precios[posicion]})
+                siguiente_item += 1
+                total += cantidad * precios[posicion]
+                total_items += cantidad
+            filas_pedidos.append({
+                'id': pedido_id, 'id_pedido': f'SIN-{pedido_id:09d}',
+                'distribuidora_id': distribuidoras_lote[j], 'usuario_id': usuarios_lote[j],
+                'fecha_creacion': fecha, 'estado': estado,
+                'fecha_entrega': fecha + timedelta(days=aleatorio.randint(1, 10)) if estado == EstadoPedido.RECIBIDO else None,
+                'total': total, 'total_items': total_items})
+        conn.execute(insert(Pedido.__table__), filas_pedidos)
+        conn.execute(insert(ItemPedido.__table__), filas_items)
+        if confirmar_lotes:
+            conn.commit()
+        if progreso:
+            progreso(desde_fila + n)
+    
+    return {'users': usuarios, 'distribuidoras': distribuidoras, 'productos': productos,
+            'pedidos': pedidos, 'items_pedido': siguiente_item - primer_item}
@@ -1,6 +1,11 @@
+import random
+import time
 from functools import wraps
-from flask import flash, redirect, url_for
+from flask import flash, redirect, url_for, current_app
 from flask_login import current_user
+from sqlalchemy.exc import OperationalError
+from basedatos import es_bloqueo
+from models import db
 
 def rol_requerido(rol):
     def decorator(f):
@@ -38,4 +43,20 @@ def rol_permitido(*roles):
             
             return f(*args, **kwargs)
         return decorated_function
-    return decorator
\ No newline at end of file
+    return decorator
+
+def reintentar_si_bloqueada(f):
+    """Repite la vista con espera exponencial si SQLite devuelve un bloqueo transitorio."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        reintentos = current_app.config['SQLITE_REINTENTOS']
+        espera = current_app.config['SQLITE_REINTENTO_ESPERA']
+        for intento in range(reintentos + 1):
+            try:
+                return f(*args, **kwargs)
+            except OperationalError as e:
+                db.session.rollback()
+                if intento == reintentos or not es_bloqueo(e):
+                    raise
+                time.sleep(espera * 2 ** intento * random.uniform(0.5, 1.5))
+    return decorated_function
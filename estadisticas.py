@@ -0,0 +1,37 @@
+from flask import current_app
+from sqlalchemy import func, case
+from models import db, User, Distribuidora, Producto, Pedido, Rol, EstadoPedido
+from cache import cache
+
+CLAVE_ESTADISTICAS = 'estadisticas'
+
+
+def _total_y_activos(columna_activo):
+    return (func.count(),
+            func.coalesce(func.sum(case((columna_activo.is_(True), 1), else_=0)), 0))
+
+
+def calcular_estadisticas():
+    # Una consulta agregada por tabla
+    usuarios_por_rol = dict(db.session.query(User.rol, func.count()).group_by(User.rol).all())
+    pedidos_por_estado = dict(db.session.query(Pedido.estado, func.count()).group_by(Pedido.estado).all())
+    total_distribuidoras, distribuidoras_activas = db.session.query(
+        *_total_y_activos(Distribuidora.activa)).one()
+    total_productos, productos_activos = db.session.query(
+        *_total_y_activos(Producto.activo)).one()
+    
+    return {
+        'total_usuarios': sum(usuarios_por_rol.values()),
+        'usuarios_por_rol': {rol.value: usuarios_por_rol.get(rol, 0) for rol in Rol},
+        'total_distribuidoras': total_distribuidoras,
+        'distribuidoras_activas': distribuidoras_activas,
+        'total_productos': total_productos,
+        'productos_activos': productos_activos,
+        'total_pedidos': sum(pedidos_por_estado.values()),
+        'pedidos_por_estado': {estado.value: pedidos_por_estado.get(estado, 0) for estado in EstadoPedido},
+    }
+
+
+def obtener_estadisticas():
+    return cache.obtener(CLAVE_ESTADISTICAS, calcular_estadisticas,
+                         current_app.config['ESTADISTICAS_CACHE_TTL'])
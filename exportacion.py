@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+import zlib
+from sqlalchemy import select
+from models import db, User, Distribuidora, Producto, Pedido, ItemPedido, PedidoArchivado, ItemPedidoArchivado
+
+COLUMNAS = ('id_pedido', 'fecha_creacion', 'fecha_entrega', 'estado', 'distribuidora_codigo',
+            'distribuidora_nombre', 'usuario', 'producto_codigo', 'producto_nombre',
+            'cantidad', 'precio_unitario', 'subtotal')
+
+FILAS_POR_LOTE = 1000
+
+
+def consulta_exportacion(pedido=Pedido):
+    """Una fila por item (o por pedido sin items), sin cargar entidades ORM.
+    
+    ``pedido`` es Pedido o PedidoArchivado; los items se leen de la tabla correspondiente.
+    """
+    item = ItemPedidoArchivado if pedido is PedidoArchivado else ItemPedido
+    return (select(pedido.id_pedido, pedido.fecha_creacion, pedido.fecha_entrega, pedido.estado,
+                   Distribuidora.codigo, Distribuidora.nombre, User.username,
+                   Producto.codigo, Producto.nombre, item.cantidad, item.precio_unitario)
+            .join(Distribuidora, pedido.distribuidora_id == Distribuidora.id)
+            .join(User, pedido.usuario_id == User.id)
+            .outerjoin(item, item.pedido_id == pedido.id)
+            .outerjoin(Producto, item.producto_id == Producto.id)
+            .order_by(pedido.id, item.id))
+
+
+def _filas(consultas):
+    for consulta in consultas:
+        resultado = db.session.execute(consulta.execution_options(yield_per=FILAS_POR_LOTE))
+        for lote in resultado.partitions():
+            yield [_a_registro(fila) for fila in lote]
+
+
+def _a_registro(fila):
+    (id_pedido, fecha_creacion, fecha_entrega, estado, distribuidora_codigo, distribuidora_nombre,
+     usuario, producto_codigo, producto_nombre, cantidad, precio_unitario) = fila
+    subtotal = cantidad * precio_unitario if cantidad is not None else None
+    return (id_pedido,
+            fecha_creacion.isoformat() if fecha_creacion else None,
+            fecha_entrega.isoformat() if fecha_entrega else None,
+            estado.value if estado else None,
+            distribuidora_codigo, distribuidora_nombre, usuario, producto_codigo, producto_nombre,
+            cantidad,
+            str(precio_unitario) if precio_unitario is not None else None,
+            str(subtotal) if subtotal is not None else None)
+
+
+def generar_csv(*consultas):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(COLUMNAS)
+    for lote in _filas(consultas):
+        escritor.writerows(lote)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def generar_ndjson(*consultas):
+    for lote in _filas(consultas):
+        yield ''.join(json.dumps(dict(zip(COLUMNAS, registro)), ensure_ascii=False) + '\n'
+                      for registro in lote)
+
+
+def comprimir(fragmentos):
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for fragmento in fragmentos:
+        datos = compresor.compress(fragmento.encode('utf-8'))
+        if datos:
+            yield datos
+    yield compresor.flush()
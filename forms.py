@@ -1,5 +1,6 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SelectField, TextAreaField, IntegerField, DecimalField, BooleanField, SubmitField, DateField
+from wtforms.widgets import HiddenInput
 from wtforms.validators import DataRequired, Email, EqualTo, Length, NumberRange, Optional
 from models import Rol, EstadoPedido
 
@@ -43,7 +44,7 @@ class PedidoForm(FlaskForm):
     submit = SubmitField('Crear Pedido')
 
 class ItemPedidoForm(FlaskForm):
-    producto_id = SelectField('Producto', coerce=int, validators=[DataRequired()])
+    producto_id = IntegerField('Producto', widget=HiddenInput(), validators=[DataRequired()])
     cantidad = IntegerField('Cantidad', validators=[DataRequired(), NumberRange(min=1)])
     precio_unitario = DecimalField('Precio Unitario', validators=[DataRequired(), NumberRange(min=0)], places=2)
     submit = SubmitField('Agregar Item')
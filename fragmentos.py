@@ -0,0 +1,161 @@
+"""Cache de fragmentos de plantilla.
+
+    {% cache ('recientes', current_user.id), 300, 'pedidos', 'distribuidoras' %}
+        ...
+    {% endcache %}
+
+El primer argumento es la clave, el segundo el TTL en segundos y el resto las
+tablas de las que depende el fragmento: su versión (ver ``versiones``) forma
+parte de la clave, así que cualquier cambio en ellas lo vuelve a renderizar.
+"""
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+import cache
+
+
+class AlmacenLRU:
+    """Fragmentos en memoria del proceso, con TTL y un máximo de entradas."""
+    
+    def __init__(self, maximo=1000, reloj=time.monotonic):
+        self.maximo = maximo
+        self._reloj = reloj
+        self._entradas = OrderedDict()
+        self._bloqueo = threading.Lock()
+    
+    def obtener(self, clave):
+        with self._bloqueo:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            if entrada[0] <= self._reloj():
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return entrada[1]
+    
+    def guardar(self, clave, valor, ttl):
+        with self._bloqueo:
+            self._entradas[clave] = (self._reloj() + ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+    
+    def limpiar(self):
+        with self._bloqueo:
+            self._entradas.clear()
+
+
+class AlmacenArchivos:
+    """Fragmentos en un directorio local compartido por los procesos del servidor.
+    
+    Cada fragmento es un archivo cuya primera línea es el instante de caducidad.
+    """
+    
+    def __init__(self, directorio, reloj=time.time):
+        self.directorio = directorio
+        self._reloj = reloj
+        os.makedirs(directorio, exist_ok=True)
+    
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave)
+    
+    def obtener(self, clave):
+        try:
+            with open(self._ruta(clave), encoding='utf-8') as archivo:
+                caducidad = float(archivo.readline())
+                if caducidad > self._reloj():
+                    return archivo.read()
+        except (OSError, ValueError):
+            return None
+        return None
+    
+    def guardar(self, clave, valor, ttl):
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as archivo:
+            archivo.write(f'{self._reloj() + ttl}\n{valor}')
+        os.replace(temporal, self._ruta(clave))
+        # Las claves con versiones antiguas no se vuelven a leer; se purgan de vez en cuando
+        if random.random() < 0.01:
+            self.purgar()
+    
+    def purgar(self):
+        ahora = self._reloj()
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith('.tmp'):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                with open(ruta, encoding='utf-8') as archivo:
+                    caducada = float(archivo.readline()) <= ahora
+                if caducada:
+                    os.remove(ruta)
+            except (OSError, ValueError):
+                pass
+    
+    def limpiar(self):
+        for nombre in os.listdir(self.directorio):
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except OSError:
+                pass
+
+
+class CacheFragmentos:
+    def __init__(self, almacen, versiones):
+        self.almacen = almacen
+        self.versiones = versiones
+    
+    def obtener(self, clave, ttl, tablas, renderizar):
+        estado = [self.versiones.semilla, *(self.versiones.version(t) for t in tablas)]
+        clave = hashlib.sha1(repr((clave, estado)).encode()).hexdigest()
+        valor = self.almacen.obtener(clave)
+        for observador in cache.observadores:
+            observador('fragmentos', valor is not None)
+        if valor is None:
+            valor = str(renderizar())
+            self.almacen.guardar(clave, valor, ttl)
+        return valor
+
+
+class FragmentosExtension(Extension):
+    tags = {'cache'}
+    
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        argumentos = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            argumentos.append(parser.parse_expression())
+        cuerpo = parser.parse_statements(('name:endcache',), drop_needle=True)
+        llamada = self.call_method('_renderizar', [nodes.List(argumentos)])
+        return nodes.CallBlock(llamada, [], [], cuerpo).set_lineno(lineno)
+    
+    def _renderizar(self, argumentos, caller):
+        clave, ttl, *tablas = argumentos
+        fragmentos = current_app.extensions.get('fragmentos')
+        if fragmentos is None:
+            return caller()
+        return Markup(fragmentos.obtener(clave, ttl, tablas, caller))
+
+
+def init_app(app):
+    app.jinja_env.add_extension(FragmentosExtension)
+    tipo = app.config['FRAGMENTOS_CACHE']
+    if tipo == 'memoria':
+        almacen = AlmacenLRU(app.config['FRAGMENTOS_CACHE_MAX'])
+    elif tipo == 'archivos':
+        directorio = app.config['FRAGMENTOS_CACHE_DIR']
+        if not os.path.isabs(directorio):
+            directorio = os.path.join(app.instance_path, directorio)
+        almacen = AlmacenArchivos(directorio)
+    else:
+        return
+    app.extensions['fragmentos'] = CacheFragmentos(almacen, app.extensions['versiones_tablas'])
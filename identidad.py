@@ -0,0 +1,150 @@
+"""Cache de usuarios autenticados para el user_loader de Flask-Login.
+
+Cada proceso guarda una copia ligera del usuario (``Identidad``) con TTL. Las
+modificaciones de un usuario cambian su versión en un archivo mmap compartido por
+todos los procesos del servidor, de modo que el resto descarta su copia en la
+siguiente petición sin consultar la base de datos.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import cache
+from models import db, User, Rol
+
+_FORMATO = '<Q'
+_TAMANO = struct.calcsize(_FORMATO)
+
+
+class Identidad(UserMixin):
+    """Copia de solo lectura de los datos del usuario que usan vistas y plantillas."""
+    
+    __slots__ = ('id', 'username', 'email', 'nombre', 'rol', 'activo')
+    
+    def __init__(self, usuario):
+        self.id = usuario.id
+        self.username = usuario.username
+        self.email = usuario.email
+        self.nombre = usuario.nombre
+        self.rol = usuario.rol
+        self.activo = usuario.activo
+    
+    def is_administrador(self):
+        return self.rol == Rol.ADMINISTRADOR
+    
+    def is_vendedor(self):
+        return self.rol == Rol.VENDEDOR
+    
+    def __repr__(self):
+        return f'<Identidad {self.username}>'
+
+
+class VersionesCompartidas:
+    """Versión por clave entera en ranuras de 8 bytes de un archivo mmap.
+
+    Dos claves pueden compartir ranura; eso solo provoca recargas extra.
+    Sin archivo, las versiones viven en memoria del proceso.
+    """
+    
+    def __init__(self, ruta=None, ranuras=4096):
+        self._ranuras = ranuras
+        if ruta is None:
+            self._mapa = bytearray(ranuras * _TAMANO)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        with open(ruta, 'a+b') as archivo:
+            if os.path.getsize(ruta) < ranuras * _TAMANO:
+                archivo.truncate(ranuras * _TAMANO)
+        with open(ruta, 'r+b') as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), ranuras * _TAMANO)
+    
+    def version(self, clave):
+        return struct.unpack_from(_FORMATO, self._mapa, (clave % self._ranuras) * _TAMANO)[0]
+    
+    def cambiar(self, clave):
+        # Cualquier valor distinto invalida; no hace falta un contador atómico entre
+        # procesos. Se guarda el instante del cambio en nanosegundos
+        nueva = max(time.time_ns(), self.version(clave) + 1)
+        struct.pack_into(_FORMATO, self._mapa, (clave % self._ranuras) * _TAMANO, nueva)
+
+
+class CacheIdentidades:
+    def __init__(self, maximo, ttl, versiones, reloj=time.monotonic):
+        self.maximo = maximo
+        self.ttl = ttl
+        self.versiones = versiones
+        self._reloj = reloj
+        self._entradas = OrderedDict()
+        self._bloqueo = threading.Lock()
+    
+    def obtener(self, user_id, cargar):
+        version = self.versiones.version(user_id)
+        with self._bloqueo:
+            entrada = self._entradas.get(user_id)
+            acierto = entrada is not None and entrada[0] > self._reloj() and entrada[1] == version
+            if acierto:
+                self._entradas.move_to_end(user_id)
+        for observador in cache.observadores:
+            observador('identidades', acierto)
+        if acierto:
+            return entrada[2]
+        
+        identidad = cargar(user_id)
+        if identidad is not None:
+            with self._bloqueo:
+                self._entradas[user_id] = (self._reloj() + self.ttl, version, identidad)
+                self._entradas.move_to_end(user_id)
+                while len(self._entradas) > self.maximo:
+                    self._entradas.popitem(last=False)
+        return identidad
+    
+    def invalidar(self, user_id):
+        self.versiones.cambiar(user_id)
+        with self._bloqueo:
+            self._entradas.pop(user_id, None)
+
+
+def _cargar(user_id):
+    usuario = db.session.get(User, user_id)
+    return Identidad(usuario) if usuario is not None else None
+
+
+def cargar_usuario(user_id):
+    return current_app.extensions['identidades'].obtener(user_id, _cargar)
+
+
+@event.listens_for(Session, 'after_flush')
+def _anotar_usuarios_modificados(session, contexto):
+    ids = session.info.setdefault('usuarios_modificados', set())
+    for objeto in (*session.dirty, *session.deleted):
+        if isinstance(objeto, User) and objeto.id is not None:
+            ids.add(objeto.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_usuarios_modificados(session):
+    # Se invalida tras el commit para que nadie recargue la versión anterior
+    ids = session.info.pop('usuarios_modificados', None)
+    if ids and has_app_context() and 'identidades' in current_app.extensions:
+        for user_id in ids:
+            current_app.extensions['identidades'].invalidar(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_usuarios_modificados(session):
+    session.info.pop('usuarios_modificados', None)
+
+
+def init_app(app):
+    ruta = app.config['IDENTIDAD_VERSIONES_ARCHIVO']
+    if ruta and not os.path.isabs(ruta):
+        ruta = os.path.join(app.instance_path, ruta)
+    app.extensions['identidades'] = CacheIdentidades(app.config['IDENTIDAD_CACHE_MAX'],
+                                                     app.config['IDENTIDAD_CACHE_TTL'],
+                                                     VersionesCompartidas(ruta))
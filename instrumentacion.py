@@ -0,0 +1,92 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from models import db
+
+logger_sql_lento = logging.getLogger('sistema_pedidos.sql_lento')
+
+# Resumen de las últimas peticiones del proceso, para la página de sistema
+_recientes = deque(maxlen=50)
+_bloqueo = threading.Lock()
+
+
+def solicitudes_recientes():
+    with _bloqueo:
+        return list(reversed(_recientes))
+
+
+def _plan_consulta(cursor, statement, parameters):
+    try:
+        plan = cursor.connection.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ()).fetchall()
+        return ' | '.join(str(fila[-1]) for fila in plan)
+    except Exception as error:  # el plan es informativo; nunca debe romper la petición
+        return f'(sin plan: {error})'
+
+
+def _registrar_eventos(app, engine):
+    @event.listens_for(engine, 'before_cursor_execute')
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_inicio_consulta', []).append(time.perf_counter())
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def despues(conn, cursor, statement, parameters, context, executemany):
+        duracion = time.perf_counter() - conn.info['_inicio_consulta'].pop()
+        
+        if has_request_context():
+            g.sql_consultas = g.get('sql_consultas', 0) + 1
+            g.sql_tiempo = g.get('sql_tiempo', 0.0) + duracion
+            lentas = g.setdefault('sql_lentas', [])
+            lentas.append((duracion, statement))
+            lentas.sort(key=lambda x: x[0], reverse=True)
+            del lentas[app.config['SQL_CONSULTAS_LENTAS_POR_PETICION']:]
+        
+        if duracion * 1000 >= app.config['SQL_LENTO_UMBRAL_MS']:
+            plan = None
+            if engine.dialect.name == 'sqlite' and not executemany and statement.lstrip().upper().startswith('SELECT'):
+                plan = _plan_consulta(cursor, statement, parameters)
+            logger_sql_lento.warning('%.1f ms | %s | %s | %r | plan: %s',
+                                     duracion * 1000,
+                                     request.endpoint if has_request_context() else '-',
+                                     ' '.join(statement.split()), parameters, plan)
+
+
+def init_app(app):
+    if not app.config['SQL_INSTRUMENTACION']:
+        return
+    
+    ruta_log = app.config['SQL_LENTO_LOG']
+    if ruta_log and not os.path.isabs(ruta_log):
+        ruta_log = os.path.join(app.instance_path, ruta_log)
+    if ruta_log and not any(getattr(h, 'baseFilename', None) == ruta_log for h in logger_sql_lento.handlers):
+        os.makedirs(os.path.dirname(ruta_log), exist_ok=True)
+        manejador = RotatingFileHandler(ruta_log, maxBytes=app.config['SQL_LENTO_LOG_BYTES'],
+                                        backupCount=app.config['SQL_LENTO_LOG_COPIAS'])
+        manejador.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        logger_sql_lento.addHandler(manejador)
+        logger_sql_lento.setLevel(logging.WARNING)
+    
+    with app.app_context():
+        for engine in db.engines.values():
+            _registrar_eventos(app, engine)
+    
+    @app.after_request
+    def cabecera_server_timing(response):
+        consultas = g.get('sql_consultas', 0)
+        tiempo_ms = g.get('sql_tiempo', 0.0) * 1000
+        response.headers.add('Server-Timing', f'db;dur={tiempo_ms:.2f};desc="{consultas} consultas"')
+        
+        with _bloqueo:
+            _recientes.append({
+                'endpoint': request.endpoint,
+                'metodo': request.method,
+                'estado': response.status_code,
+                'consultas': consultas,
+                'tiempo_ms': tiempo_ms,
+                'lentas': [(d * 1000, ' '.join(s.split())[:200]) for d, s in g.get('sql_lentas', [])],
+            })
+        return response
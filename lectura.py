@@ -0,0 +1,75 @@
+"""Separación de lecturas y escrituras.
+
+Las vistas marcadas con ``solo_lectura`` consultan el bind ``lectura``
+(``SQLALCHEMY_BINDS``) cuando existe. Tras una petición de escritura, el usuario
+sigue leyendo de la base principal durante ``LECTURA_VENTANA_ESCRITURA``
+segundos para ver sus propios cambios aunque la réplica aún no los tenga.
+"""
+import sqlite3
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+
+BIND_LECTURA = 'lectura'
+CLAVE_SESION = '_primaria_hasta'
+METODOS_LECTURA = ('GET', 'HEAD', 'OPTIONS')
+
+
+class SesionEnrutada(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and has_request_context() and g.get('solo_lectura')
+                and not self._flushing and not getattr(clause, 'is_dml', False)):
+            replica = self._db.engines.get(BIND_LECTURA)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _ventana_primaria():
+    return session.get(CLAVE_SESION, 0) > time.time()
+
+
+def lee_de_replica():
+    """Si una vista ``solo_lectura`` de esta petición consultaría la réplica."""
+    return BIND_LECTURA in current_app.extensions['sqlalchemy'].engines and not _ventana_primaria()
+
+
+def solo_lectura(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if _ventana_primaria():
+            return f(*args, **kwargs)
+        g.solo_lectura = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g.solo_lectura = False
+    return decorated_function
+
+
+def refrescar_replica_sqlite(origen, destino):
+    """Copia la base principal sobre la réplica con la API de backup de SQLite.
+    
+    La copia se hace en un solo paso, así que los lectores de la réplica ven la
+    instantánea anterior o la nueva completa.
+    """
+    ruta = make_url(str(destino.url)).database
+    with origen.connect() as conn:
+        copia = sqlite3.connect(ruta)
+        try:
+            conn.connection.driver_connection.backup(copia)
+        finally:
+            copia.close()
+
+
+def init_app(app):
+    ventana = app.config['LECTURA_VENTANA_ESCRITURA']
+    
+    @app.after_request
+    def fijar_lectura_primaria(response):
+        if request.method not in METODOS_LECTURA and response.status_code < 400:
+            session[CLAVE_SESION] = time.time() + ventana
+        return response
@@ -1,9 +1,20 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import render_template, redirect, url_for, flash, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from main import main_bp
-from models import db, Distribuidora, Producto, Pedido, ItemPedido, EstadoPedido
+from models import (db, User, Distribuidora, Producto, Pedido, ItemPedido, PedidoArchivado, ItemPedidoArchivado,
+                    EstadoPedido)
 from forms import DistribuidoraForm, ProductoForm, PedidoForm, ItemPedidoForm, CambiarEstadoPedidoForm, BusquedaForm
-from decorators import vendedor_requerido, rol_permitido
+from decorators import vendedor_requerido, rol_permitido, reintentar_si_bloqueada
+from estadisticas import obtener_estadisticas
+from lectura import solo_lectura
+from versiones import con_etag
+from paginacion import paginar_por_cursor
+import busqueda
+import exportacion
+import proyecciones
+from sqlalchemy import insert, or_
+from sqlalchemy.orm import joinedload, selectinload
+from decimal import Decimal, InvalidOperation
 from datetime import datetime
 import uuid
 
@@ -15,44 +26,39 @@ def index():
 
 @main_bp.route('/dashboard')
 @login_required
+@solo_lectura
 def dashboard():
-    # Estadísticas básicas
-    total_distribuidoras = Distribuidora.query.filter_by(activa=True).count()
-    total_productos = Producto.query.filter_by(activo=True).count()
-    total_pedidos = Pedido.query.count()
+    estadisticas = obtener_estadisticas()
+    pedidos_por_estado = estadisticas['pedidos_por_estado']
     
-    # Pedidos por estado
-    pedidos_pendientes = Pedido.query.filter_by(estado=EstadoPedido.PENDIENTE).count()
-    pedidos_enviados = Pedido.query.filter_by(estado=EstadoPedido.ENVIADO).count()
-    pedidos_recibidos = Pedido.query.filter_by(estado=EstadoPedido.RECIBIDO).count()
-    
-    # Pedidos recientes
-    pedidos_recientes = Pedido.query.order_by(Pedido.fecha_creacion.desc()).limit(5).all()
+    # Pedidos recientes; la plantilla ejecuta la consulta solo si el fragmento no está en cache
+    pedidos_recientes = proyecciones.pedidos().order_by(Pedido.fecha_creacion.desc()).limit(5)
     
     return render_template('main/dashboard.html',
-                         total_distribuidoras=total_distribuidoras,
-                         total_productos=total_productos,
-                         total_pedidos=total_pedidos,
-                         pedidos_pendientes=pedidos_pendientes,
-                         pedidos_enviados=pedidos_enviados,
-                         pedidos_recibidos=pedidos_recibidos,
+                         total_distribuidoras=estadisticas['distribuidoras_activas'],
+                         total_productos=estadisticas['productos_activos'],
+                         total_pedidos=estadisticas['total_pedidos'],
+                         pedidos_pendientes=pedidos_por_estado[EstadoPedido.PENDIENTE.value],
+                         pedidos_enviados=pedidos_por_estado[EstadoPedido.ENVIADO.value],
+                         pedidos_recibidos=pedidos_por_estado[EstadoPedido.RECIBIDO.value],
                          pedidos_recientes=pedidos_recientes)
 
 # DISTRIBUIDORAS
 @main_bp.route('/distribuidoras')
 @login_required
 @vendedor_requerido
+@solo_lectura
 def distribuidoras():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '', type=str)
     search = request.args.get('search', '', type=str)
     
-    query = Distribuidora.query.filter_by(activa=True)
+    query = proyecciones.distribuidoras().filter_by(activa=True)
     
     if search:
-        query = query.filter(Distribuidora.nombre.contains(search) | 
-                           Distribuidora.codigo.contains(search))
+        query = busqueda.filtrar(query, Distribuidora, search)
     
-    distribuidoras = query.paginate(page=page, per_page=10, error_out=False)
+    distribuidoras = paginar_por_cursor(query, Distribuidora.fecha_creacion, Distribuidora.id, cursor,
+                                current_app.config['ITEMS_PER_PAGE'])
     
     return render_template('distribuidoras/lista.html', 
                          distribuidoras=distribuidoras, 
@@ -115,17 +121,19 @@ def editar_distribuidora(id):
 @main_bp.route('/productos')
 @login_required
 @vendedor_requerido
+@con_etag(Producto)
+@solo_lectura
 def productos():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '', type=str)
     search = request.args.get('search', '', type=str)
     
-    query = Producto.query.filter_by(activo=True)
+    query = proyecciones.productos().filter_by(activo=True)
     
     if search:
-        query = query.filter(Producto.nombre.contains(search) | 
-                           Producto.codigo.contains(search))
+        query = busqueda.filtrar(query, Producto, search)
     
-    productos = query.paginate(page=page, per_page=10, error_out=False)
+    productos = paginar_por_cursor(query, Producto.fecha_creacion, Producto.id, cursor,
+                                current_app.config['ITEMS_PER_PAGE'])
     
     return render_template('productos/lista.html', 
                          productos=productos, 
@@ -184,37 +192,82 @@ def editar_producto(id):
     return render_template('productos/formulario.html', form=form, producto=producto)
 
 # PEDIDOS
+def filtrar_pedidos(query, estado_filter, distribuidora_filter, modelo=Pedido):
+    # Filtros compartidos por el listado y la exportación; modelo es Pedido o PedidoArchivado
+    if estado_filter in {e.value for e in EstadoPedido}:
+        query = query.filter(modelo.estado == EstadoPedido(estado_filter))
+    
+    if distribuidora_filter:
+        query = busqueda.filtrar(query, Distribuidora, distribuidora_filter, modelo.distribuidora_id)
+    
+    # Si es vendedor, solo ver sus pedidos
+    if current_user.is_vendedor():
+        query = query.filter(modelo.usuario_id == current_user.id)
+    
+    return query
+
+def pedir_historico():
+    return request.args.get('historico', '', type=str) == '1'
+
+def modelos_pedido(historico):
+    # El archivo de pedidos cerrados solo se consulta si se pide el histórico
+    return (Pedido, PedidoArchivado) if historico else (Pedido,)
+
 @main_bp.route('/pedidos')
 @login_required
 @vendedor_requerido
+@con_etag(Pedido, ItemPedido, Distribuidora, User, PedidoArchivado)
+@solo_lectura
 def pedidos():
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '', type=str)
     estado_filter = request.args.get('estado', '', type=str)
     distribuidora_filter = request.args.get('distribuidora', '', type=str)
+    historico = pedir_historico()
     
-    query = Pedido.query
+    consultas = [filtrar_pedidos(proyecciones.pedidos(modelo), estado_filter, distribuidora_filter, modelo)
+                 for modelo in modelos_pedido(historico)]
+    query = consultas[0].union_all(*consultas[1:]) if len(consultas) > 1 else consultas[0]
     
-    if estado_filter:
-        query = query.filter(Pedido.estado == EstadoPedido(estado_filter))
-    
-    if distribuidora_filter:
-        query = query.join(Distribuidora).filter(Distribuidora.nombre.contains(distribuidora_filter))
-    
-    # Si es vendedor, solo ver sus pedidos
-    if current_user.is_vendedor():
-        query = query.filter(Pedido.usuario_id == current_user.id)
-    
-    pedidos = query.order_by(Pedido.fecha_creacion.desc()).paginate(page=page, per_page=10, error_out=False)
+    pedidos = paginar_por_cursor(query, Pedido.fecha_creacion, Pedido.id, cursor,
+                                 current_app.config['ITEMS_PER_PAGE'])
     
     return render_template('pedidos/lista.html', 
                          pedidos=pedidos,
                          estado_filter=estado_filter,
                          distribuidora_filter=distribuidora_filter,
+                         historico=historico,
                          estados=EstadoPedido)
 
+@main_bp.route('/pedidos/exportar')
+@login_required
+@vendedor_requerido
+def exportar_pedidos():
+    formato = request.args.get('formato', 'csv', type=str)
+    comprimido = request.args.get('gzip', '', type=str) in ('1', 'true')
+    if formato not in ('csv', 'ndjson'):
+        flash('Formato de exportación no soportado', 'danger')
+        return redirect(url_for('main.pedidos'))
+    
+    consultas = [filtrar_pedidos(exportacion.consulta_exportacion(modelo),
+                                 request.args.get('estado', '', type=str),
+                                 request.args.get('distribuidora', '', type=str), modelo)
+                 for modelo in modelos_pedido(pedir_historico())]
+    
+    if formato == 'csv':
+        contenido, mimetype = exportacion.generar_csv(*consultas), 'text/csv'
+    else:
+        contenido, mimetype = exportacion.generar_ndjson(*consultas), 'application/x-ndjson'
+    nombre = f'pedidos.{formato}'
+    if comprimido:
+        contenido, mimetype, nombre = exportacion.comprimir(contenido), 'application/gzip', nombre + '.gz'
+    
+    return Response(stream_with_context(contenido), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={nombre}'})
+
 @main_bp.route('/pedidos/nuevo', methods=['GET', 'POST'])
 @login_required
 @vendedor_requerido
+@reintentar_si_bloqueada
 def nuevo_pedido():
     form = PedidoForm()
     form.distribuidora_id.choices = [(d.id, f"{d.nombre} ({d.codigo})") 
@@ -244,28 +297,40 @@ def nuevo_pedido():
 @main_bp.route('/pedidos/<int:id>')
 @login_required
 @vendedor_requerido
+@con_etag(Pedido, ItemPedido, Producto, Distribuidora, User, PedidoArchivado, ItemPedidoArchivado)
+@solo_lectura
 def detalle_pedido(id):
-    pedido = Pedido.query.get_or_404(id)
+    pedido = db.session.get(Pedido, id, options=(
+        joinedload(Pedido.distribuidora), joinedload(Pedido.usuario),
+        selectinload(Pedido.items).joinedload(ItemPedido.producto)))
+    
+    # Un pedido archivado se muestra en solo lectura
+    archivado = pedido is None
+    if archivado:
+        pedido = (PedidoArchivado.query
+                  .options(joinedload(PedidoArchivado.distribuidora), joinedload(PedidoArchivado.usuario),
+                           selectinload(PedidoArchivado.items).joinedload(ItemPedidoArchivado.producto))
+                  .get_or_404(id))
     
     # Verificar permisos
     if current_user.is_vendedor() and pedido.usuario_id != current_user.id:
         flash('No tienes permisos para ver este pedido', 'danger')
         return redirect(url_for('main.pedidos'))
     
+    # El producto se elige con el buscador de /api/productos
     form_item = ItemPedidoForm()
-    form_item.producto_id.choices = [(p.id, f"{p.nombre} ({p.codigo}) - ${p.precio}") 
-                                    for p in Producto.query.filter_by(activo=True).all()]
-    
     form_estado = CambiarEstadoPedidoForm()
     
     return render_template('pedidos/detalle.html', 
                          pedido=pedido, 
+                         archivado=archivado,
                          form_item=form_item,
                          form_estado=form_estado)
 
 @main_bp.route('/pedidos/<int:id>/agregar-item', methods=['POST'])
 @login_required
 @vendedor_requerido
+@reintentar_si_bloqueada
 def agregar_item_pedido(id):
     pedido = Pedido.query.get_or_404(id)
     
@@ -275,20 +340,22 @@ def agregar_item_pedido(id):
         return redirect(url_for('main.pedidos'))
     
     form = ItemPedidoForm()
-    form.producto_id.choices = [(p.id, f"{p.nombre} ({p.codigo})") 
-                               for p in Producto.query.filter_by(activo=True).all()]
     
     if form.validate_on_submit():
-        producto = Producto.query.get(form.producto_id.data)
+        producto = db.session.get(Producto, form.producto_id.data)
+        if not producto or not producto.activo:
+            flash('El producto seleccionado no existe o no está activo', 'danger')
+            return redirect(url_for('main.detalle_pedido', id=id))
         
         item = ItemPedido(
             pedido_id=pedido.id,
             producto_id=producto.id,
             cantidad=form.cantidad.data,
-            precio_unitario=float(form.precio_unitario.data)
+            precio_unitario=form.precio_unitario.data
         )
         
         db.session.add(item)
+        pedido.ajustar_totales(item.subtotal, item.cantidad)
         db.session.commit()
         
         flash('Item agregado exitosamente', 'success')
@@ -298,6 +365,7 @@ def agregar_item_pedido(id):
 @main_bp.route('/pedidos/<int:id>/cambiar-estado', methods=['POST'])
 @login_required
 @vendedor_requerido
+@reintentar_si_bloqueada
 def cambiar_estado_pedido(id):
     pedido = Pedido.query.get_or_404(id)
     
@@ -323,6 +391,7 @@ def cambiar_estado_pedido(id):
 @main_bp.route('/pedidos/<int:id>/eliminar-item/<int:item_id>', methods=['POST'])
 @login_required
 @vendedor_requerido
+@reintentar_si_bloqueada
 def eliminar_item_pedido(id, item_id):
     pedido = Pedido.query.get_or_404(id)
     item = ItemPedido.query.get_or_404(item_id)
@@ -336,8 +405,103 @@ def eliminar_item_pedido(id, item_id):
         flash('Item no pertenece a este pedido', 'danger')
         return redirect(url_for('main.detalle_pedido', id=id))
     
+    pedido.ajustar_totales(-item.subtotal, -item.cantidad)
     db.session.delete(item)
     db.session.commit()
     
     flash('Item eliminado exitosamente', 'success')
-    return redirect(url_for('main.detalle_pedido', id=id))
\ No newline at end of file
+    return redirect(url_for('main.detalle_pedido', id=id))
+
+# API
+@main_bp.route('/api/productos')
+@login_required
+@vendedor_requerido
+@solo_lectura
+def api_productos():
+    termino = request.args.get('q', '', type=str)
+    limite = min(max(request.args.get('limite', 20, type=int), 1), 50)
+    desde = max(request.args.get('desde', 0, type=int), 0)
+    
+    # Se pide una fila extra para saber si hay más resultados
+    productos = busqueda.buscar(Producto, termino, limite + 1,
+                                proyecciones.productos().filter_by(activo=True), desde)
+    
+    return jsonify({
+        'resultados': [{'id': p.id, 'codigo': p.codigo, 'nombre': p.nombre, 'precio': str(p.precio)}
+                       for p in productos[:limite]],
+        'siguiente': desde + limite if len(productos) > limite else None
+    })
+
+PRECIO_MAXIMO = Decimal(10) ** 8
+
+def _validar_linea(linea, productos_por_id, productos_por_codigo):
+    if not isinstance(linea, dict):
+        return None, 'La línea debe ser un objeto'
+    
+    # Mismas comprobaciones de tipo que al reunir ids y códigos: una lista o un objeto no se pueden buscar
+    producto_id, codigo = linea.get('producto_id'), linea.get('codigo')
+    if producto_id is not None:
+        producto = productos_por_id.get(producto_id) if isinstance(producto_id, int) else None
+    else:
+        producto = productos_por_codigo.get(codigo) if isinstance(codigo, str) else None
+    if producto is None or not producto.activo:
+        return None, 'Producto inexistente o inactivo'
+    
+    cantidad = linea.get('cantidad')
+    if not isinstance(cantidad, int) or isinstance(cantidad, bool) or cantidad < 1:
+        return None, 'La cantidad debe ser un entero mayor que cero'
+    
+    try:
+        precio = Decimal(str(linea['precio_unitario'])) if linea.get('precio_unitario') is not None else producto.precio
+        # Numeric(10, 2) admite como máximo 8 dígitos enteros
+        if not precio.is_finite() or precio < 0 or precio >= PRECIO_MAXIMO:
+            return None, 'Precio unitario inválido'
+        precio = precio.quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None, 'Precio unitario inválido'
+    
+    return {'producto_id': producto.id, 'cantidad': cantidad, 'precio_unitario': precio}, None
+
+@main_bp.route('/api/pedidos/<int:id>/items', methods=['POST'])
+@login_required
+@vendedor_requerido
+@reintentar_si_bloqueada
+def api_agregar_items_pedido(id):
+    pedido = Pedido.query.get_or_404(id)
+    
+    if current_user.is_vendedor() and pedido.usuario_id != current_user.id:
+        return jsonify({'error': 'No tienes permisos para modificar este pedido'}), 403
+    
+    datos = request.get_json(silent=True)
+    lineas = datos.get('items') if isinstance(datos, dict) else None
+    if not isinstance(lineas, list) or not lineas:
+        return jsonify({'error': 'Se esperaba una lista "items" con al menos una línea'}), 400
+    if len(lineas) > current_app.config['MAX_ITEMS_POR_LOTE']:
+        return jsonify({'error': f"Máximo {current_app.config['MAX_ITEMS_POR_LOTE']} líneas por petición"}), 400
+    
+    # Todos los productos referenciados se resuelven en una sola consulta
+    ids = {l.get('producto_id') for l in lineas if isinstance(l, dict) and isinstance(l.get('producto_id'), int)}
+    codigos = {l.get('codigo') for l in lineas if isinstance(l, dict) and isinstance(l.get('codigo'), str)}
+    productos = Producto.query.filter(or_(Producto.id.in_(ids), Producto.codigo.in_(codigos))).all() if ids or codigos else []
+    productos_por_id = {p.id: p for p in productos}
+    productos_por_codigo = {p.codigo: p for p in productos}
+    
+    filas, errores = [], []
+    for numero, linea in enumerate(lineas, start=1):
+        fila, error = _validar_linea(linea, productos_por_id, productos_por_codigo)
+        if error:
+            errores.append({'linea': numero, 'error': error})
+        else:
+            filas.append(dict(fila, pedido_id=pedido.id))
+    
+    # Si alguna línea falla no se inserta ninguna
+    if errores:
+        return jsonify({'insertados': 0, 'errores': errores}), 422
+    
+    db.session.execute(insert(ItemPedido), filas)
+    pedido.ajustar_totales(sum(f['cantidad'] * f['precio_unitario'] for f in filas),
+                           sum(f['cantidad'] for f in filas))
+    db.session.commit()
+    
+    return jsonify({'insertados': len(filas), 'errores': [],
+                    'total': str(pedido.total), 'total_items': pedido.total_items}), 201
@@ -0,0 +1,92 @@
+"""Métricas en formato de exposición de Prometheus.
+
+Con varios procesos (p. ej. gunicorn con varios workers) hay que definir la variable
+de entorno PROMETHEUS_MULTIPROC_DIR antes de arrancar: cada proceso escribe sus
+valores en archivos mmap de ese directorio y /admin/metrics los agrega.
+"""
+import os
+import time
+from flask import g, request
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+                               CONTENT_TYPE_LATEST, generate_latest, multiprocess)
+from sqlalchemy import event
+import cache
+from models import db
+
+DURACION_PETICION = Histogram(
+    'sistema_pedidos_http_request_duration_seconds', 'Duración de las peticiones HTTP',
+    ['endpoint', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+PETICIONES_EN_CURSO = Gauge(
+    'sistema_pedidos_http_requests_in_flight', 'Peticiones HTTP en curso',
+    multiprocess_mode='livesum')
+CHECKOUTS_POOL = Counter(
+    'sistema_pedidos_db_pool_checkouts', 'Conexiones entregadas por el pool de la base de datos', ['bind'])
+CONEXIONES_EN_USO = Gauge(
+    'sistema_pedidos_db_pool_checked_out', 'Conexiones del pool en uso', ['bind'],
+    multiprocess_mode='livesum')
+OVERFLOW_POOL = Gauge(
+    'sistema_pedidos_db_pool_overflow', 'Conexiones abiertas por encima del tamaño del pool', ['bind'],
+    multiprocess_mode='livesum')
+CONSULTAS_CACHE = Counter(
+    'sistema_pedidos_cache_requests', 'Consultas a caches en memoria', ['cache', 'resultado'])
+
+
+def exponer():
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    else:
+        registro = REGISTRY
+    return generate_latest(registro), CONTENT_TYPE_LATEST
+
+
+def _contar_cache(nombre, acierto):
+    CONSULTAS_CACHE.labels(nombre, 'acierto' if acierto else 'fallo').inc()
+
+
+def _registrar_pool(engine, bind):
+    pool = engine.pool
+    
+    def _actualizar():
+        if hasattr(pool, 'checkedout'):
+            CONEXIONES_EN_USO.labels(bind).set(pool.checkedout())
+        if hasattr(pool, 'overflow'):
+            OVERFLOW_POOL.labels(bind).set(max(pool.overflow(), 0))
+    
+    @event.listens_for(engine, 'checkout')
+    def al_entregar(dbapi_connection, connection_record, connection_proxy):
+        CHECKOUTS_POOL.labels(bind).inc()
+        _actualizar()
+    
+    @event.listens_for(engine, 'checkin')
+    def al_devolver(dbapi_connection, connection_record):
+        _actualizar()
+
+
+def init_app(app):
+    if not app.config['METRICAS_HABILITADAS']:
+        return
+    
+    if _contar_cache not in cache.observadores:
+        cache.observadores.append(_contar_cache)
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            _registrar_pool(engine, bind or 'principal')
+    
+    @app.before_request
+    def iniciar_medicion():
+        g.metricas_inicio = time.perf_counter()
+        PETICIONES_EN_CURSO.inc()
+    
+    @app.after_request
+    def registrar_duracion(response):
+        if 'metricas_inicio' in g:
+            DURACION_PETICION.labels(request.endpoint or 'desconocido', response.status_code).observe(
+                time.perf_counter() - g.metricas_inicio)
+        return response
+    
+    @app.teardown_request
+    def finalizar_medicion(error=None):
+        if g.pop('metricas_inicio', None) is not None:
+            PETICIONES_EN_CURSO.dec()
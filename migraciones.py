@@ -0,0 +1,151 @@
+from datetime import datetime
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateTable
+from models import (db, recalcular_totales_pedidos, User, Distribuidora, Producto, Pedido, ItemPedido,
+                    PedidoArchivado, ItemPedidoArchivado)
+from busqueda import crear_indices_busqueda, crear_indices_prefijo, fts5_compilado
+
+
+def _columnas(conn, tabla):
+    return {columna['name'] for columna in inspect(conn).get_columns(tabla)}
+
+
+def _0001_totales_pedido(conn):
+    columnas = _columnas(conn, 'pedidos')
+    if 'total' not in columnas:
+        conn.execute(text("ALTER TABLE pedidos ADD COLUMN total NUMERIC(12, 2) NOT NULL DEFAULT 0"))
+    if 'total_items' not in columnas:
+        conn.execute(text("ALTER TABLE pedidos ADD COLUMN total_items INTEGER NOT NULL DEFAULT 0"))
+    # Sin este índice el recálculo recorre items_pedido completo por cada pedido
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_items_pedido_pedido ON items_pedido (pedido_id)"))
+    recalcular_totales_pedidos(conn)
+
+
+def _0002_indices_consultas(conn):
+    for modelo in (User, Distribuidora, Producto, Pedido, ItemPedido):
+        for indice in modelo.__table__.indexes:
+            indice.create(conn, checkfirst=True)
+    if conn.dialect.name == 'sqlite':
+        conn.execute(text("ANALYZE"))
+
+
+def _0003_busqueda_texto(conn):
+    crear_indices_busqueda(conn)
+
+
+def _fk_en_cascada(conn, tabla, columna):
+    for fk in inspect(conn).get_foreign_keys(tabla):
+        if fk['constrained_columns'] == [columna]:
+            return (fk['options'].get('ondelete') or '').upper() == 'CASCADE', fk['name']
+    return False, None
+
+
+def _0004_borrado_en_cascada(conn):
+    pendientes = [(tabla, columna) for tabla, columna in (('pedidos', 'distribuidora_id'), ('items_pedido', 'pedido_id'))
+                  if not _fk_en_cascada(conn, tabla, columna)[0]]
+    if not pendientes:
+        return
+    
+    if conn.dialect.name != 'sqlite':
+        for tabla, columna in pendientes:
+            nombre = _fk_en_cascada(conn, tabla, columna)[1]
+            fk = next(fk for fk in db.metadata.tables[tabla].foreign_keys if fk.parent.name == columna)
+            conn.execute(text(f"ALTER TABLE {tabla} DROP CONSTRAINT {nombre}"))
+            conn.execute(text(f"ALTER TABLE {tabla} ADD CONSTRAINT {nombre} FOREIGN KEY ({columna}) "
+                              f"REFERENCES {fk.column.table.name} (id) ON DELETE CASCADE"))
+        return
+    
+    _reconstruir_pedidos(conn)
+
+
+def _reconstruir_pedidos(conn):
+    # SQLite no modifica claves foráneas ni AUTOINCREMENT: se reconstruyen las dos
+    # tablas con la definición actual del modelo. items_pedido nuevo apunta a
+    # pedidos__nuevo y el RENAME final corrige la referencia, así que nunca hay
+    # filas hijas apuntando a la tabla que se borra
+    for modelo, referencias in ((Pedido, ()), (ItemPedido, (('REFERENCES pedidos ', 'REFERENCES pedidos__nuevo '),))):
+        tabla = modelo.__tablename__
+        ddl = str(CreateTable(modelo.__table__).compile(conn)).replace(f'CREATE TABLE {tabla} ', f'CREATE TABLE {tabla}__nuevo ', 1)
+        for viejo, nuevo in referencias:
+            ddl = ddl.replace(viejo, nuevo)
+        columnas = ', '.join(c.name for c in modelo.__table__.columns)
+        conn.execute(text(ddl))
+        conn.execute(text(f"INSERT INTO {tabla}__nuevo ({columnas}) SELECT {columnas} FROM {tabla}"))
+    conn.execute(text("DROP TABLE items_pedido"))
+    conn.execute(text("DROP TABLE pedidos"))
+    conn.execute(text("ALTER TABLE pedidos__nuevo RENAME TO pedidos"))
+    conn.execute(text("ALTER TABLE items_pedido__nuevo RENAME TO items_pedido"))
+    for modelo in (Pedido, ItemPedido):
+        for indice in modelo.__table__.indexes:
+            indice.create(conn, checkfirst=True)
+
+
+def _0005_archivo_pedidos(conn):
+    for modelo in (PedidoArchivado, ItemPedidoArchivado):
+        modelo.__table__.create(conn, checkfirst=True)
+
+
+def _0006_indices_prefijo(conn):
+    # Bases creadas sin FTS5: la búsqueda por prefijo necesita índices NOCASE
+    if conn.dialect.name == 'sqlite' and not fts5_compilado(conn):
+        crear_indices_prefijo(conn)
+
+
+def _sin_autoincrement(conn, tabla):
+    ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :tabla"),
+                       {'tabla': tabla}).scalar()
+    return 'AUTOINCREMENT' not in ddl.upper()
+
+
+def _0007_ids_sin_reutilizar(conn):
+    # Sin AUTOINCREMENT, SQLite asigna max(id) + 1 de la tabla caliente y reutiliza
+    # los ids de los pedidos archivados más recientes
+    if conn.dialect.name != 'sqlite':
+        return
+    if any(_sin_autoincrement(conn, tabla) for tabla in ('pedidos', 'items_pedido')):
+        _reconstruir_pedidos(conn)
+    
+    for caliente, archivo in ((Pedido, PedidoArchivado), (ItemPedido, ItemPedidoArchivado)):
+        tabla = caliente.__tablename__
+        maximo = max(conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {modelo.__tablename__}")).scalar()
+                     for modelo in (caliente, archivo))
+        actual = conn.execute(text("SELECT seq FROM sqlite_sequence WHERE name = :tabla"),
+                              {'tabla': tabla}).scalar()
+        if actual is None:
+            conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES (:tabla, :seq)"),
+                         {'tabla': tabla, 'seq': maximo})
+        elif actual < maximo:
+            conn.execute(text("UPDATE sqlite_sequence SET seq = :seq WHERE name = :tabla"),
+                         {'tabla': tabla, 'seq': maximo})
+
+
+# Migraciones en orden de aplicación; el nombre queda registrado en schema_migraciones
+MIGRACIONES = [
+    ('0001_totales_pedido', _0001_totales_pedido),
+    ('0002_indices_consultas', _0002_indices_consultas),
+    ('0003_busqueda_texto', _0003_busqueda_texto),
+    ('0004_borrado_en_cascada', _0004_borrado_en_cascada),
+    ('0005_archivo_pedidos', _0005_archivo_pedidos),
+    ('0006_indices_prefijo', _0006_indices_prefijo),
+    ('0007_ids_sin_reutilizar', _0007_ids_sin_reutilizar),
+]
+
+
+def aplicar_migraciones(engine=None):
+    engine = engine or db.engine
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migraciones ("
+            "nombre VARCHAR(100) PRIMARY KEY, aplicada_en DATETIME NOT NULL)"))
+        hechas = set(conn.execute(text("SELECT nombre FROM schema_migraciones")).scalars())
+    
+    aplicadas = []
+    for nombre, migracion in MIGRACIONES:
+        if nombre in hechas:
+            continue
+        with engine.begin() as conn:
+            migracion(conn)
+            conn.execute(text("INSERT INTO schema_migraciones (nombre, aplicada_en) VALUES (:nombre, :fecha)"),
+                         {'nombre': nombre, 'fecha': datetime.utcnow()})
+        aplicadas.append(nombre)
+    return aplicadas
@@ -1,10 +1,13 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from lectura import SesionEnrutada
+from seguridad import generar_hash, verificar_hash, necesita_rehash
+from sqlalchemy import delete, func, select, update
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SesionEnrutada})
 
 class Rol(Enum):
     ADMINISTRADOR = "administrador"
@@ -12,6 +15,9 @@ class Rol(Enum):
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_fecha_creacion', 'fecha_creacion', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -24,10 +30,13 @@ class User(UserMixin, db.Model):
     ultimo_login = db.Column(db.DateTime)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = generar_hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verificar_hash(self.password_hash, password)
+    
+    def password_necesita_rehash(self):
+        return necesita_rehash(self.password_hash)
     
     def is_administrador(self):
         return self.rol == Rol.ADMINISTRADOR
@@ -46,6 +55,10 @@ class EstadoPedido(Enum):
 
 class Distribuidora(db.Model):
     __tablename__ = 'distribuidoras'
+    __table_args__ = (
+        db.Index('ix_distribuidoras_activas_fecha', 'fecha_creacion', 'id',
+                 sqlite_where=db.text('activa = 1'), postgresql_where=db.text('activa')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(100), nullable=False)
@@ -57,13 +70,20 @@ class Distribuidora(db.Model):
     activa = db.Column(db.Boolean, default=True)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     
-    pedidos = db.relationship('Pedido', backref='distribuidora', lazy=True, cascade='all, delete-orphan')
+    # passive_deletes: los pedidos e items los borra la base de datos (ON DELETE CASCADE)
+    # sin cargarlos en la sesión
+    pedidos = db.relationship('Pedido', backref='distribuidora', lazy=True, cascade='all, delete-orphan',
+                              passive_deletes=True)
     
     def __repr__(self):
         return f'<Distribuidora {self.nombre}>'
 
 class Producto(db.Model):
     __tablename__ = 'productos'
+    __table_args__ = (
+        db.Index('ix_productos_activos_fecha', 'fecha_creacion', 'id',
+                 sqlite_where=db.text('activo = 1'), postgresql_where=db.text('activo')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(100), nullable=False)
@@ -81,42 +101,148 @@ class Producto(db.Model):
 
 class Pedido(db.Model):
     __tablename__ = 'pedidos'
+    __table_args__ = (
+        db.Index('ix_pedidos_fecha_creacion', 'fecha_creacion', 'id'),
+        db.Index('ix_pedidos_usuario_fecha', 'usuario_id', 'fecha_creacion', 'id'),
+        db.Index('ix_pedidos_estado_fecha', 'estado', 'fecha_creacion', 'id'),
+        db.Index('ix_pedidos_distribuidora_fecha', 'distribuidora_id', 'fecha_creacion'),
+        # AUTOINCREMENT: SQLite no reasigna ids de pedidos ya archivados
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     id_pedido = db.Column(db.String(50), unique=True, nullable=False)
-    distribuidora_id = db.Column(db.Integer, db.ForeignKey('distribuidoras.id'), nullable=False)
+    distribuidora_id = db.Column(db.Integer, db.ForeignKey('distribuidoras.id', ondelete='CASCADE'), nullable=False)
     usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     fecha_entrega = db.Column(db.DateTime)
     estado = db.Column(db.Enum(EstadoPedido), default=EstadoPedido.PENDIENTE)
     observaciones = db.Column(db.Text)
+    total = db.Column(db.Numeric(12, 2), nullable=False, default=Decimal('0.00'), server_default='0')
+    total_items = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
-    items = db.relationship('ItemPedido', backref='pedido', lazy=True, cascade='all, delete-orphan')
+    items = db.relationship('ItemPedido', backref='pedido', lazy=True, cascade='all, delete-orphan',
+                            passive_deletes=True)
     usuario = db.relationship('User', backref='pedidos_creados')
     
-    @property
-    def total(self):
-        return sum(item.subtotal for item in self.items)
-    
-    @property
-    def total_items(self):
-        return sum(item.cantidad for item in self.items)
+    def ajustar_totales(self, importe, cantidad):
+        # El incremento se hace en SQL dentro de la transacción actual para no
+        # pisar cambios concurrentes sobre el mismo pedido
+        db.session.execute(
+            update(Pedido)
+            .where(Pedido.id == self.id)
+            .values(total=Pedido.total + importe,
+                    total_items=Pedido.total_items + cantidad)
+            .execution_options(synchronize_session=False))
+        db.session.expire(self, ['total', 'total_items'])
     
     def __repr__(self):
         return f'<Pedido {self.id_pedido}>'
 
 class ItemPedido(db.Model):
     __tablename__ = 'items_pedido'
+    __table_args__ = (
+        db.Index('ix_items_pedido_pedido', 'pedido_id'),
+        db.Index('ix_items_pedido_producto', 'producto_id'),
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id'), nullable=False)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id', ondelete='CASCADE'), nullable=False)
     producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), nullable=False)
     cantidad = db.Column(db.Integer, nullable=False)
     precio_unitario = db.Column(db.Numeric(10, 2), nullable=False)
     
     @property
     def subtotal(self):
-        return float(self.cantidad * self.precio_unitario)
+        return self.cantidad * Decimal(self.precio_unitario)
+    
+    def __repr__(self):
+        return f'<ItemPedido {self.producto.nombre} x{self.cantidad}>'
+
+class PedidoArchivado(db.Model):
+    """Pedido cerrado movido fuera de la tabla caliente por ``flask archivar-pedidos``."""
+    __tablename__ = 'pedidos_archivo'
+    __table_args__ = (
+        db.Index('ix_pedidos_archivo_fecha_creacion', 'fecha_creacion', 'id'),
+        db.Index('ix_pedidos_archivo_usuario_fecha', 'usuario_id', 'fecha_creacion', 'id'),
+        db.Index('ix_pedidos_archivo_distribuidora', 'distribuidora_id'),
+    )
+    
+    # Conserva el id original: un pedido está en pedidos o en pedidos_archivo, nunca en ambas,
+    # porque pedidos e items_pedido usan AUTOINCREMENT y no reutilizan ids
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id_pedido = db.Column(db.String(50), unique=True, nullable=False)
+    distribuidora_id = db.Column(db.Integer, db.ForeignKey('distribuidoras.id', ondelete='CASCADE'), nullable=False)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    fecha_creacion = db.Column(db.DateTime)
+    fecha_entrega = db.Column(db.DateTime)
+    estado = db.Column(db.Enum(EstadoPedido))
+    observaciones = db.Column(db.Text)
+    total = db.Column(db.Numeric(12, 2), nullable=False, server_default='0')
+    total_items = db.Column(db.Integer, nullable=False, server_default='0')
+    
+    items = db.relationship('ItemPedidoArchivado', backref='pedido', lazy=True, passive_deletes=True)
+    distribuidora = db.relationship('Distribuidora')
+    usuario = db.relationship('User')
     
     def __repr__(self):
-        return f'<ItemPedido {self.producto.nombre} x{self.cantidad}>'
\ No newline at end of file
+        return f'<PedidoArchivado {self.id_pedido}>'
+
+class ItemPedidoArchivado(db.Model):
+    __tablename__ = 'items_pedido_archivo'
+    __table_args__ = (
+        db.Index('ix_items_pedido_archivo_pedido', 'pedido_id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos_archivo.id', ondelete='CASCADE'), nullable=False)
+    producto_id = db.Column(db.Integer, db.ForeignKey('productos.id'), nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False)
+    precio_unitario = db.Column(db.Numeric(10, 2), nullable=False)
+    
+    producto = db.relationship('Producto')
+    
+    @property
+    def subtotal(self):
+        return self.cantidad * Decimal(self.precio_unitario)
+
+def recalcular_totales_pedidos(conn, lote=1000, confirmar_lotes=False):
+    """Recalcula pedidos.total y pedidos.total_items desde items_pedido por rangos de id."""
+    pedidos = Pedido.__table__
+    items = ItemPedido.__table__
+    total = (select(func.coalesce(func.sum(items.c.cantidad * items.c.precio_unitario), 0))
+             .where(items.c.pedido_id == pedidos.c.id)
+             .scalar_subquery())
+    total_items = (select(func.coalesce(func.sum(items.c.cantidad), 0))
+                   .where(items.c.pedido_id == pedidos.c.id)
+                   .scalar_subquery())
+    
+    max_id = conn.execute(select(func.max(pedidos.c.id))).scalar() or 0
+    actualizados = 0
+    for inicio in range(1, max_id + 1, lote):
+        resultado = conn.execute(
+            update(pedidos)
+            .where(pedidos.c.id.between(inicio, inicio + lote - 1))
+            .values(total=total, total_items=total_items))
+        actualizados += resultado.rowcount
+        if confirmar_lotes:
+            conn.commit()
+    return actualizados
+
+def eliminar_en_bloque(modelo, *condiciones):
+    """Borra las filas con un único DELETE y devuelve cuántas.
+    
+    Pedidos e items dependientes los borra la base de datos (ON DELETE CASCADE);
+    los objetos ya cargados en la sesión no se sincronizan.
+    """
+    resultado = db.session.execute(delete(modelo).where(*condiciones)
+                                   .execution_options(synchronize_session=False))
+    return resultado.rowcount
+
+def desactivar_en_bloque(modelo, *condiciones):
+    """Baja lógica con un único UPDATE; conserva el historial de pedidos."""
+    columna = modelo.activa if modelo is Distribuidora else modelo.activo
+    resultado = db.session.execute(update(modelo).where(*condiciones).values({columna: False})
+                                   .execution_options(synchronize_session=False))
+    return resultado.rowcount
@@ -0,0 +1,72 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+
+def codificar_cursor(fecha, id, direccion):
+    datos = {'f': fecha.isoformat() if fecha else None, 'i': id, 'd': direccion}
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        fecha = datetime.fromisoformat(datos['f']) if datos['f'] else None
+        if datos['d'] not in ('sig', 'ant'):
+            return None
+        return fecha, int(datos['i']), datos['d']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+
+
+class PaginaCursor:
+    """Página obtenida por búsqueda de clave (fecha_creacion, id) en orden descendente.
+
+    No necesita OFFSET ni COUNT(*): cada página se resuelve con un rango sobre el índice.
+    """
+    
+    def __init__(self, items, has_prev, has_next, columna_fecha):
+        self.items = items
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self._columna_fecha = columna_fecha
+    
+    def _cursor(self, item, direccion):
+        return codificar_cursor(getattr(item, self._columna_fecha.key), item.id, direccion)
+    
+    @property
+    def next_cursor(self):
+        return self._cursor(self.items[-1], 'sig') if self.has_next else None
+    
+    @property
+    def prev_cursor(self):
+        return self._cursor(self.items[0], 'ant') if self.has_prev else None
+
+
+def paginar_por_cursor(query, columna_fecha, columna_id, cursor=None, por_pagina=10):
+    clave = decodificar_cursor(cursor) if cursor else None
+    
+    if clave is None:
+        items = (query.order_by(columna_fecha.desc(), columna_id.desc())
+                 .limit(por_pagina + 1).all())
+        return PaginaCursor(items[:por_pagina], False, len(items) > por_pagina, columna_fecha)
+    
+    fecha, id, direccion = clave
+    if direccion == 'sig':
+        condicion = or_(columna_fecha < fecha, and_(columna_fecha == fecha, columna_id < id))
+        orden = (columna_fecha.desc(), columna_id.desc())
+    else:
+        condicion = or_(columna_fecha > fecha, and_(columna_fecha == fecha, columna_id > id))
+        orden = (columna_fecha.asc(), columna_id.asc())
+    
+    items = query.filter(condicion).order_by(*orden).limit(por_pagina + 1).all()
+    hay_mas = len(items) > por_pagina
+    items = items[:por_pagina]
+    
+    if direccion == 'sig':
+        return PaginaCursor(items, True, hay_mas, columna_fecha)
+    items.reverse()
+    return PaginaCursor(items, hay_mas, True, columna_fecha)
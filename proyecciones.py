@@ -0,0 +1,39 @@
+"""Columnas que muestran los listados.
+
+Los listados consultan solo estas columnas y reciben filas (``Row``, una tupla
+con acceso por nombre) en lugar de entidades: no leen las columnas Text que no
+se muestran (descripción, dirección, observaciones) ni pasan por el identity map
+de la sesión. Los formularios de detalle y edición siguen usando las entidades.
+Cada proyección incluye ``id`` y ``fecha_creacion`` para la paginación por cursor.
+"""
+from models import db, User, Distribuidora, Producto, Pedido
+
+PRODUCTO = (Producto.id, Producto.codigo, Producto.nombre, Producto.precio, Producto.stock,
+            Producto.activo, Producto.fecha_creacion)
+
+DISTRIBUIDORA = (Distribuidora.id, Distribuidora.codigo, Distribuidora.nombre, Distribuidora.contacto,
+                 Distribuidora.telefono, Distribuidora.email, Distribuidora.activa,
+                 Distribuidora.fecha_creacion)
+
+USUARIO = (User.id, User.username, User.nombre, User.email, User.rol, User.activo,
+           User.fecha_creacion, User.ultimo_login)
+
+
+def productos():
+    return db.session.query(*PRODUCTO)
+
+
+def distribuidoras():
+    return db.session.query(*DISTRIBUIDORA)
+
+
+def pedidos(modelo=Pedido):
+    """``modelo`` es Pedido o PedidoArchivado: las dos tablas tienen las mismas columnas."""
+    return (db.session.query(modelo.id, modelo.id_pedido, modelo.estado, modelo.total, modelo.total_items,
+                             modelo.fecha_creacion, Distribuidora.nombre.label('distribuidora_nombre'),
+                             User.nombre.label('usuario_nombre'))
+            .select_from(modelo).join(modelo.distribuidora).join(modelo.usuario))
+
+
+def usuarios():
+    return db.session.query(*USUARIO)
@@ -0,0 +1,80 @@
+"""Hash de contraseñas fuera de los hilos de petición.
+
+El cálculo (PBKDF2/scrypt) se ejecuta en un pool de hilos acotado. Si el pool y
+su cola están llenos, la petición se rechaza de inmediato con ``SistemaSaturado``
+en lugar de dejar todos los workers bloqueados.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class SistemaSaturado(Exception):
+    pass
+
+
+class HasherContrasenas:
+    def __init__(self, metodo, longitud_sal=16, hilos=None, en_espera=32, timeout=10):
+        self.metodo = metodo
+        self.longitud_sal = longitud_sal
+        self.timeout = timeout
+        hilos = hilos or os.cpu_count() or 1
+        self._ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='hash')
+        self._admision = threading.BoundedSemaphore(hilos + en_espera)
+    
+    def _ejecutar(self, funcion, *args):
+        if not self._admision.acquire(blocking=False):
+            raise SistemaSaturado()
+        try:
+            futuro = self._ejecutor.submit(funcion, *args)
+        except BaseException:
+            self._admision.release()
+            raise
+        futuro.add_done_callback(lambda _: self._admision.release())
+        try:
+            return futuro.result(timeout=self.timeout)
+        except TimeoutError:
+            raise SistemaSaturado()
+    
+    def generar(self, password):
+        return self._ejecutar(generate_password_hash, password, self.metodo, self.longitud_sal)
+    
+    def verificar(self, password_hash, password):
+        return self._ejecutar(check_password_hash, password_hash, password)
+    
+    def necesita_rehash(self, password_hash):
+        return password_hash.split('$', 1)[0] != self.metodo
+    
+    def cerrar(self):
+        self._ejecutor.shutdown(wait=False)
+
+
+def _hasher():
+    if has_app_context() and 'contrasenas' in current_app.extensions:
+        return current_app.extensions['contrasenas']
+    return None
+
+
+def generar_hash(password):
+    hasher = _hasher()
+    return hasher.generar(password) if hasher else generate_password_hash(password)
+
+
+def verificar_hash(password_hash, password):
+    hasher = _hasher()
+    return hasher.verificar(password_hash, password) if hasher else check_password_hash(password_hash, password)
+
+
+def necesita_rehash(password_hash):
+    hasher = _hasher()
+    return hasher.necesita_rehash(password_hash) if hasher else False
+
+
+def init_app(app):
+    app.extensions['contrasenas'] = HasherContrasenas(app.config['PASSWORD_HASH_METODO'],
+                                                      app.config['PASSWORD_HASH_LONGITUD_SAL'],
+                                                      app.config['PASSWORD_HASH_HILOS'],
+                                                      app.config['PASSWORD_HASH_EN_ESPERA'],
+                                                      app.config['PASSWORD_HASH_TIMEOUT'])
@@ -195,43 +195,45 @@ def productos():
     <p><a href="/">← Volver al inicio</a></p>
     '''
 
-if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-        
-        # Crear usuario administrador
-        admin = User.query.filter_by(username='admin').first()
-        if not admin:
-            admin = User(
-                username='admin',
-                email='admin@sistema.com',
-                nombre='Administrador del Sistema',
-                rol=Rol.ADMINISTRADOR
-            )
-            admin.set_password('admin123')
-            db.session.add(admin)
-            db.session.commit()
-            print("✅ Usuario administrador creado: admin / admin123")
-        
-        # Crear datos de ejemplo
-        if Distribuidora.query.count() == 0:
-            dist1 = Distribuidora(nombre='Distribuidora Central', codigo='DIST001', contacto='Juan Pérez', telefono='555-0123', email='juan@distcentral.com')
-            dist2 = Distribuidora(nombre='Productos del Norte', codigo='DIST002', contacto='María García', telefono='555-0456', email='maria@prodnorte.com')
-            db.session.add(dist1)
-            db.session.add(dist2)
-            db.session.commit()
-            print("✅ Distribuidoras de ejemplo creadas")
-        
-        if Producto.query.count() == 0:
-            prod1 = Producto(nombre='Laptop Pro 15"', codigo='LP001', precio=999.99, stock=25)
-            prod2 = Producto(nombre='Mouse Wireless', codigo='MS001', precio=29.99, stock=150)
-            prod3 = Producto(nombre='Teclado Mecánico', codigo='KB001', precio=79.99, stock=75)
-            db.session.add(prod1)
-            db.session.add(prod2)
-            db.session.add(prod3)
-            db.session.commit()
-            print("✅ Productos de ejemplo creados")
+# Tablas y datos iniciales: flask --app simple_app seed
+@app.cli.command('seed')
+def seed():
+    db.create_all()
+    
+    # Crear usuario administrador
+    admin = User.query.filter_by(username='admin').first()
+    if not admin:
+        admin = User(
+            username='admin',
+            email='admin@sistema.com',
+            nombre='Administrador del Sistema',
+            rol=Rol.ADMINISTRADOR
+        )
+        admin.set_password('admin123')
+        db.session.add(admin)
+        db.session.commit()
+        print("✅ Usuario administrador creado: admin / admin123")
+    
+    # Crear datos de ejemplo
+    if Distribuidora.query.count() == 0:
+        dist1 = Distribuidora(nombre='Distribuidora Central', codigo='DIST001', contacto='Juan Pérez', telefono='555-0123', email='juan@distcentral.com')
+        dist2 = Distribuidora(nombre='Productos del Norte', codigo='DIST002', contacto='María García', telefono='555-0456', email='maria@prodnorte.com')
+        db.session.add(dist1)
+        db.session.add(dist2)
+        db.session.commit()
+        print("✅ Distribuidoras de ejemplo creadas")
     
+    if Producto.query.count() == 0:
+        prod1 = Producto(nombre='Laptop Pro 15"', codigo='LP001', precio=999.99, stock=25)
+        prod2 = Producto(nombre='Mouse Wireless', codigo='MS001', precio=29.99, stock=150)
+        prod3 = Producto(nombre='Teclado Mecánico', codigo='KB001', precio=79.99, stock=75)
+        db.session.add(prod1)
+        db.session.add(prod2)
+        db.session.add(prod3)
+        db.session.commit()
+        print("✅ Productos de ejemplo creados")
+
+if __name__ == '__main__':
     print("🚀 Iniciando aplicación Flask...")
     print("📡 URL: http://localhost:5000")
     print("👤 Usuario: admin / admin123")
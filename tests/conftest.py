@@ -0,0 +1,156 @@
+import gc
+import os
+import sys
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+import pytest
+from flask import g
+from flask.testing import FlaskClient
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from cache import cache
+from commands import crear_administrador
+import datos_sinteticos
+from migraciones import aplicar_migraciones
+from models import (db, User, Rol, Distribuidora, Producto, Pedido, ItemPedido, EstadoPedido,
+                    recalcular_totales_pedidos)
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config.update(WTF_CSRF_ENABLED=False)
+    cache.invalidar()
+    with app.app_context():
+        db.create_all()
+        aplicar_migraciones()
+        crear_administrador()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class ClientePruebas(FlaskClient):
+    # Las peticiones comparten el contexto de aplicación del fixture; se descarta
+    # el usuario de la petición anterior para que cada una lo cargue como en producción
+    def open(self, *args, **kwargs):
+        g.pop('_login_user', None)
+        return super().open(*args, **kwargs)
+
+
+@pytest.fixture
+def client(app):
+    app.test_client_class = ClientePruebas
+    return app.test_client()
+
+
+@pytest.fixture
+def vendedor(app):
+    user = User(username='vendedor', email='vendedor@sistema.com',
+                nombre='Vendedor de Prueba', rol=Rol.VENDEDOR)
+    user.password_hash = 'sin-password'
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def admin(app):
+    return User.query.filter_by(username='admin').first()
+
+
+def iniciar_sesion(client, user):
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
+
+
+@pytest.fixture
+def pedidos_con_items(app, vendedor):
+    distribuidora = Distribuidora(nombre='Distribuidora Norte', codigo='DN01',
+                                  contacto='Ana', telefono='555-0101',
+                                  email='norte@example.com')
+    productos = [Producto(nombre=f'Producto {i}', codigo=f'P{i:03d}',
+                          precio=Decimal('10.50'), stock=100) for i in range(3)]
+    db.session.add(distribuidora)
+    db.session.add_all(productos)
+    db.session.flush()
+
+    pedidos = []
+    for i in range(25):
+        pedido = Pedido(id_pedido=f'PED-{i:04d}', distribuidora_id=distribuidora.id,
+                        usuario_id=vendedor.id, estado=list(EstadoPedido)[i % 4])
+        pedido.items = [ItemPedido(producto_id=p.id, cantidad=j + 1,
+                                   precio_unitario=Decimal('2.25'))
+                        for j, p in enumerate(productos)]
+        pedidos.append(pedido)
+    db.session.add_all(pedidos)
+    db.session.flush()
+    recalcular_totales_pedidos(db.session.connection())
+    db.session.commit()
+    return pedidos
+
+
+class ContadorConsultas:
+    def __init__(self, engine):
+        self.engine = engine
+        self.sentencias = []
+
+    def _registrar(self, conn, cursor, statement, parameters, context, executemany):
+        self.sentencias.append(statement)
+
+    @property
+    def total(self):
+        return len(self.sentencias)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._registrar)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._registrar)
+
+
+@pytest.fixture
+def contar_consultas(app):
+    def _contar():
+        # Cada petición real empieza con una sesión vacía
+        db.session.expunge_all()
+        return ContadorConsultas(db.engine)
+    return _contar
+
+
+@pytest.fixture
+def datos_volumen(app):
+    """Conjunto de datos sintético reproducible y el vendedor con más pedidos."""
+    with db.engine.begin() as conn:
+        datos_sinteticos.generar(conn, usuarios=10, distribuidoras=30, productos=200, pedidos=500, semilla=7)
+    vendedor = (User.query.join(Pedido, Pedido.usuario_id == User.id)
+                .filter(User.activo.is_(True))
+                .group_by(User.id).order_by(db.func.count(Pedido.id).desc()).first())
+    pedido = (Pedido.query.filter_by(usuario_id=vendedor.id)
+              .order_by(Pedido.total_items.desc()).first())
+    return {'vendedor': vendedor, 'pedido': pedido}
+
+
+@pytest.fixture
+def presupuesto(contar_consultas):
+    """Falla si el bloque ejecuta más consultas o, con ``ms``, tarda más milisegundos de los permitidos."""
+    @contextmanager
+    def _presupuesto(consultas, ms=None, nombre=''):
+        # Una recolección pendiente de pruebas anteriores no debe caer dentro del bloque medido
+        gc.collect()
+        with contar_consultas() as contador:
+            inicio = time.perf_counter()
+            yield contador
+            duracion = (time.perf_counter() - inicio) * 1000
+        assert contador.total <= consultas, (
+            f'{nombre}: {contador.total} consultas, presupuesto {consultas}\n' + '\n'.join(contador.sentencias))
+        if ms is not None:
+            assert duracion <= ms, f'{nombre}: {duracion:.1f} ms, presupuesto {ms} ms'
+    return _presupuesto
@@ -0,0 +1,131 @@
+import csv
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from archivo import archivar_pedidos, ESTADOS_CERRADOS
+from conftest import iniciar_sesion
+from migraciones import aplicar_migraciones
+from models import db, Pedido, ItemPedido, PedidoArchivado, ItemPedidoArchivado, EstadoPedido
+from paginacion import paginar_por_cursor
+import proyecciones
+
+
+@pytest.fixture
+def archivados(app, pedidos_con_items):
+    # Un corte en el futuro hace "antiguos" a todos los pedidos del fixture
+    archivados = archivar_pedidos(db.session.connection(), 30, lote=5,
+                                  ahora=datetime.utcnow() + timedelta(days=31))
+    db.session.commit()
+    return archivados
+
+
+def test_archiva_pedidos_cerrados_con_sus_items(archivados):
+    assert archivados == 12
+    assert PedidoArchivado.query.count() == 12
+    assert ItemPedidoArchivado.query.count() == 12 * 3
+    assert {p.estado for p in PedidoArchivado.query} == set(ESTADOS_CERRADOS)
+    assert Pedido.query.filter(Pedido.estado.in_(ESTADOS_CERRADOS)).count() == 0
+    assert Pedido.query.count() == 13
+    assert ItemPedido.query.count() == 13 * 3
+
+
+def test_conserva_ids_y_totales(app, pedidos_con_items):
+    cerrado = next(p for p in pedidos_con_items if p.estado in ESTADOS_CERRADOS)
+    pedido_id, total, items = cerrado.id, cerrado.total, sorted(i.id for i in cerrado.items)
+    archivar_pedidos(db.session.connection(), 30, ahora=datetime.utcnow() + timedelta(days=31))
+    db.session.commit()
+    
+    archivado = db.session.get(PedidoArchivado, pedido_id)
+    assert archivado.total == total
+    assert sorted(i.id for i in archivado.items) == items
+
+
+def test_no_reutiliza_ids_de_pedidos_archivados(app, pedidos_con_items):
+    # El pedido con el id más alto se archiva
+    ultimo = pedidos_con_items[-1]
+    ultimo.estado = EstadoPedido.RECIBIDO
+    db.session.commit()
+    ultimo_id, datos = ultimo.id, {'distribuidora_id': ultimo.distribuidora_id, 'usuario_id': ultimo.usuario_id}
+    producto_id = ultimo.items[0].producto_id
+    futuro = datetime.utcnow() + timedelta(days=31)
+    archivar_pedidos(db.session.connection(), 30, ahora=futuro)
+    db.session.commit()
+    assert db.session.get(PedidoArchivado, ultimo_id) is not None
+    
+    nuevo = Pedido(id_pedido='PED-NUEVO', estado=EstadoPedido.CANCELADO, **datos,
+                   items=[ItemPedido(producto_id=producto_id, cantidad=1, precio_unitario=Decimal('1.00'))])
+    db.session.add(nuevo)
+    db.session.commit()
+    assert nuevo.id > db.session.query(db.func.max(PedidoArchivado.id)).scalar()
+    assert nuevo.items[0].id > db.session.query(db.func.max(ItemPedidoArchivado.id)).scalar()
+    
+    assert archivar_pedidos(db.session.connection(), 30, ahora=futuro) == 1
+    db.session.commit()
+    assert PedidoArchivado.query.count() == 14
+
+
+def test_no_archiva_pedidos_recientes(app, pedidos_con_items):
+    assert archivar_pedidos(db.session.connection(), 30) == 0
+    assert Pedido.query.count() == 25
+
+
+def test_listado_incluye_archivo_solo_con_historico(client, vendedor, archivados):
+    iniciar_sesion(client, vendedor)
+    archivado = PedidoArchivado.query.order_by(PedidoArchivado.id).first().id_pedido
+    
+    html = client.get('/pedidos').get_data(as_text=True)
+    assert archivado not in html and 'historico=1' not in html
+    html = client.get('/pedidos?historico=1&estado=recibido').get_data(as_text=True)
+    assert archivado in html
+    # El mismo indicador marca la casilla y se conserva en los enlaces de exportación
+    assert 'checked' in html and 'formato=csv' in html and html.count('historico=1') >= 2
+
+
+def test_paginacion_recorre_pedidos_y_archivo(archivados):
+    consulta = proyecciones.pedidos(Pedido).union_all(proyecciones.pedidos(PedidoArchivado))
+    paginas = [paginar_por_cursor(consulta, Pedido.fecha_creacion, Pedido.id, None, 4)]
+    while paginas[-1].has_next and len(paginas) < 10:
+        paginas.append(paginar_por_cursor(consulta, Pedido.fecha_creacion, Pedido.id,
+                                          paginas[-1].next_cursor, 4))
+    
+    ids = [p.id for pagina in paginas for p in pagina.items]
+    assert len(paginas) == 7
+    assert sorted(ids) == sorted(set(ids)) and len(ids) == 25
+
+
+def test_detalle_de_pedido_archivado_es_de_solo_lectura(client, vendedor, archivados):
+    iniciar_sesion(client, vendedor)
+    archivado = PedidoArchivado.query.first()
+    
+    respuesta = client.get(f'/pedidos/{archivado.id}')
+    
+    assert respuesta.status_code == 200
+    html = respuesta.get_data(as_text=True)
+    assert archivado.id_pedido in html
+    assert 'solo lectura' in html
+    assert 'agregar-item' not in html
+
+
+def test_exportacion_historica_incluye_archivo(client, vendedor, archivados):
+    iniciar_sesion(client, vendedor)
+    
+    filas = list(csv.DictReader(io.StringIO(client.get('/pedidos/exportar').get_data(as_text=True))))
+    historicas = list(csv.DictReader(io.StringIO(
+        client.get('/pedidos/exportar?historico=1').get_data(as_text=True))))
+    
+    assert len(filas) == 13 * 3
+    assert len(historicas) == 25 * 3
+
+
+def test_migracion_crea_tablas_de_archivo(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "nueva.db"}')
+    db.metadata.create_all(engine, tables=[t for t in db.metadata.sorted_tables
+                                           if not t.name.endswith('_archivo')])
+    
+    assert '0005_archivo_pedidos' in aplicar_migraciones(engine)
+    assert {'pedidos_archivo', 'items_pedido_archivo'} <= set(inspect(engine).get_table_names())
+    engine.dispose()
@@ -0,0 +1,22 @@
+from app import create_app
+from config import config, TestingConfig
+from models import db, User
+
+
+def test_create_app_no_abre_la_base_de_datos(tmp_path, monkeypatch):
+    ruta_db = tmp_path / 'arranque.db'
+    
+    class ConfigArranque(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{ruta_db}'
+    monkeypatch.setitem(config, 'arranque', ConfigArranque)
+    
+    app = create_app('arranque')
+    assert not ruta_db.exists()
+    
+    runner = app.test_cli_runner()
+    assert 'Migración aplicada' in runner.invoke(args=['migrar']).output
+    assert 'Usuario administrador creado' in runner.invoke(args=['seed']).output
+    assert 'ya existe' in runner.invoke(args=['seed']).output
+    with app.app_context():
+        assert User.query.filter_by(username='admin').count() == 1
+        db.engine.dispose()
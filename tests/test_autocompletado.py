@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+import pytest
+
+from conftest import iniciar_sesion
+from models import db, Producto, Pedido, ItemPedido
+
+
+@pytest.fixture
+def catalogo_grande(app):
+    productos = [Producto(nombre=f'Tornillo {i}', codigo=f'TOR-{i:04d}', precio=Decimal('0.25'))
+                 for i in range(60)]
+    productos.append(Producto(nombre='Tornillo Descatalogado', codigo='TOR-9999',
+                              precio=Decimal('0.25'), activo=False))
+    db.session.add_all(productos)
+    db.session.commit()
+    return productos
+
+
+def test_api_productos_paginada(client, vendedor, catalogo_grande):
+    iniciar_sesion(client, vendedor)
+    primera = client.get('/api/productos?q=tor&limite=25').get_json()
+    assert len(primera['resultados']) == 25
+    assert primera['siguiente'] == 25
+    
+    ultima = client.get('/api/productos?q=tor&limite=25&desde=50').get_json()
+    assert len(ultima['resultados']) == 10
+    assert ultima['siguiente'] is None
+    assert 'TOR-9999' not in {p['codigo'] for p in primera['resultados'] + ultima['resultados']}
+
+
+def test_api_productos_por_codigo(client, vendedor, catalogo_grande):
+    iniciar_sesion(client, vendedor)
+    datos = client.get('/api/productos?q=tor-0042').get_json()
+    assert [p['codigo'] for p in datos['resultados']] == ['TOR-0042']
+    assert datos['resultados'][0]['precio'] == '0.25'
+
+
+def test_detalle_no_carga_el_catalogo(client, vendedor, pedidos_con_items, catalogo_grande, contar_consultas):
+    url = f'/pedidos/{pedidos_con_items[0].id}'
+    iniciar_sesion(client, vendedor)
+    with contar_consultas() as consultas:
+        respuesta = client.get(url)
+    html = respuesta.get_data(as_text=True)
+    assert respuesta.status_code == 200
+    assert 'Tornillo' not in html
+    # usuario actual + pedido con relaciones + items con productos
+    assert consultas.total <= 3, consultas.sentencias
+
+
+def test_agregar_item_rechaza_producto_inactivo(client, vendedor, pedidos_con_items, catalogo_grande):
+    pedido = pedidos_con_items[0]
+    inactivo = catalogo_grande[-1]
+    iniciar_sesion(client, vendedor)
+    
+    client.post(f'/pedidos/{pedido.id}/agregar-item', data={
+        'producto_id': inactivo.id, 'cantidad': 1, 'precio_unitario': '0.25'})
+    
+    assert ItemPedido.query.filter_by(pedido_id=pedido.id, producto_id=inactivo.id).count() == 0
+    assert db.session.get(Pedido, pedido.id).total_items == 6
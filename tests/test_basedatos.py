@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from config import config, ProductionConfig
+from decorators import reintentar_si_bloqueada
+from models import db
+
+
+def test_perfil_produccion_aplica_pragmas(tmp_path, monkeypatch):
+    class ConfigPragmas(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "pedidos.db"}'
+        SQL_LENTO_LOG = None
+        IDENTIDAD_VERSIONES_ARCHIVO = None
+        METRICAS_HABILITADAS = False
+    monkeypatch.setitem(config, 'pragmas', ConfigPragmas)
+    
+    app = create_app('pragmas')
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert conn.execute(text('PRAGMA synchronous')).scalar() == 1
+            assert conn.execute(text('PRAGMA foreign_keys')).scalar() == 1
+            assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+        assert db.engine.pool.size() == ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS['pool_size']
+        db.engine.dispose()
+
+
+def _bloqueo():
+    return OperationalError('INSERT INTO pedidos ...', {}, Exception('database is locked'))
+
+
+def test_reintenta_escrituras_bloqueadas(app):
+    app.config['SQLITE_REINTENTO_ESPERA'] = 0
+    llamadas = []
+    
+    @reintentar_si_bloqueada
+    def vista():
+        llamadas.append(1)
+        if len(llamadas) < 3:
+            raise _bloqueo()
+        return 'ok'
+    
+    assert vista() == 'ok'
+    assert len(llamadas) == 3
+
+
+def test_agota_reintentos_y_no_reintenta_otros_errores(app):
+    app.config['SQLITE_REINTENTO_ESPERA'] = 0
+    llamadas = []
+    
+    @reintentar_si_bloqueada
+    def bloqueada():
+        llamadas.append(1)
+        raise _bloqueo()
+    
+    with pytest.raises(OperationalError):
+        bloqueada()
+    assert len(llamadas) == app.config['SQLITE_REINTENTOS'] + 1
+    
+    @reintentar_si_bloqueada
+    def rota():
+        llamadas.append(1)
+        raise OperationalError('SELECT', {}, Exception('no such table: pedidos'))
+    
+    llamadas.clear()
+    with pytest.raises(OperationalError):
+        rota()
+    assert len(llamadas) == 1
@@ -0,0 +1,44 @@
+from models import (db, Distribuidora, Pedido, ItemPedido, eliminar_en_bloque,
+                    desactivar_en_bloque)
+
+
+def test_eliminar_distribuidora_borra_pedidos_e_items_en_una_sentencia(app, pedidos_con_items, contar_consultas):
+    distribuidora_id = pedidos_con_items[0].distribuidora_id
+    
+    with contar_consultas() as consultas:
+        assert eliminar_en_bloque(Distribuidora, Distribuidora.id == distribuidora_id) == 1
+        db.session.commit()
+    
+    assert [s.split()[0] for s in consultas.sentencias] == ['DELETE']
+    assert Pedido.query.count() == 0
+    assert ItemPedido.query.count() == 0
+
+
+def test_borrar_pedido_desde_la_sesion_no_carga_sus_items(app, pedidos_con_items, contar_consultas):
+    pedido_id = pedidos_con_items[0].id
+    
+    with contar_consultas() as consultas:
+        db.session.delete(db.session.get(Pedido, pedido_id))
+        db.session.commit()
+    
+    assert not any('FROM items_pedido' in s for s in consultas.sentencias)
+    assert ItemPedido.query.filter_by(pedido_id=pedido_id).count() == 0
+    assert Pedido.query.count() == 24
+
+
+def test_desactivar_en_bloque_conserva_los_pedidos(app, pedidos_con_items):
+    assert desactivar_en_bloque(Distribuidora, Distribuidora.id == pedidos_con_items[0].distribuidora_id) == 1
+    db.session.commit()
+    
+    assert Distribuidora.query.filter_by(activa=True).count() == 0
+    assert Pedido.query.count() == 25
+
+
+def test_borrado_en_cascada_cambia_las_versiones_de_las_tablas_hijas(app, pedidos_con_items):
+    versiones = app.extensions['versiones_tablas']
+    antes = {tabla: versiones.version(tabla) for tabla in ('distribuidoras', 'pedidos', 'items_pedido')}
+    
+    eliminar_en_bloque(Distribuidora, Distribuidora.id == pedidos_con_items[0].distribuidora_id)
+    db.session.commit()
+    
+    assert all(versiones.version(tabla) != version for tabla, version in antes.items())
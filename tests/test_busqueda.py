@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, text
+
+import busqueda
+from conftest import iniciar_sesion
+from models import db, Producto, Distribuidora, User
+
+
+@pytest.fixture
+def catalogo(app):
+    productos = [
+        Producto(nombre='Aceite de Oliva', codigo='ACE-001', precio=Decimal('5')),
+        Producto(nombre='Aceitunas Negras', codigo='ACE-002', precio=Decimal('3')),
+        Producto(nombre='Arroz Integral', codigo='ARR-010', precio=Decimal('2')),
+        Producto(nombre='Azúcar Morena', codigo='AZU-001', precio=Decimal('1')),
+        Producto(nombre='Salsa Azul', codigo='SAL-001', precio=Decimal('4')),
+    ]
+    db.session.add_all(productos)
+    db.session.commit()
+    return productos
+
+
+def test_filtra_por_prefijo_de_nombre_y_codigo(catalogo):
+    assert {p.codigo for p in busqueda.filtrar(Producto.query, Producto, 'acei')} == {'ACE-001', 'ACE-002'}
+    assert {p.codigo for p in busqueda.filtrar(Producto.query, Producto, 'arr')} == {'ARR-010'}
+    assert {p.codigo for p in busqueda.filtrar(Producto.query, Producto, 'azucar')} == {'AZU-001'}
+    assert busqueda.filtrar(Producto.query, Producto, 'aceite oliva').count() == 1
+
+
+def test_busqueda_ordenada_por_relevancia(catalogo):
+    # AZU-001 coincide por código y nombre; SAL-001 solo por nombre
+    resultados = busqueda.buscar(Producto, 'azu', limite=10)
+    assert [p.codigo for p in resultados] == ['AZU-001', 'SAL-001']
+    assert [p.codigo for p in busqueda.buscar(Producto, 'azu', limite=1)] == ['AZU-001']
+    assert busqueda.buscar(Producto, '', limite=10) == []
+
+
+def test_indice_sigue_cambios_en_la_tabla(catalogo):
+    producto = catalogo[2]
+    producto.nombre = 'Fideos Largos'
+    db.session.commit()
+    assert busqueda.filtrar(Producto.query, Producto, 'arroz').count() == 0
+    assert busqueda.filtrar(Producto.query, Producto, 'fideos').one() is producto
+    
+    db.session.delete(producto)
+    db.session.commit()
+    assert busqueda.filtrar(Producto.query, Producto, 'fideos').count() == 0
+
+
+def test_terminos_con_comillas_no_rompen_la_consulta(catalogo):
+    assert busqueda.filtrar(Producto.query, Producto, '"ace*" OR').count() == 0
+
+
+def test_prefijo_sin_fts_escapa_comodines(catalogo, monkeypatch):
+    monkeypatch.setattr(busqueda, '_usa_fts', lambda modelo: False)
+    assert busqueda.filtrar(Producto.query, Producto, 'acei').count() == 2
+    # '_' no es comodín: 'ace_0' no debe coincidir con ACE-001
+    assert busqueda.filtrar(Producto.query, Producto, 'ace_0').count() == 0
+
+
+def test_prefijo_sin_fts_usa_indices_nocase(catalogo):
+    conn = db.session.connection()
+    busqueda.crear_indices_prefijo(conn)
+    consulta = select(Producto.id).where(*busqueda._prefijo(Producto, ['acei']))
+    sql = str(consulta.compile(conn, compile_kwargs={'literal_binds': True}))
+    
+    plan = ' '.join(fila[-1] for fila in conn.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+    assert 'ix_productos_nombre_nocase' in plan and 'ix_productos_codigo_nocase' in plan
+
+
+def test_disponibilidad_de_fts_por_tabla(catalogo):
+    conn = db.session.connection()
+    for trigger in ('ai', 'ad', 'au'):
+        conn.execute(text(f'DROP TRIGGER distribuidoras_fts_{trigger}'))
+    conn.execute(text('DROP TABLE distribuidoras_fts'))
+    db.session.commit()
+    
+    assert not busqueda._usa_fts(Distribuidora)
+    assert busqueda._usa_fts(Producto)
+    assert busqueda.filtrar(Producto.query, Producto, 'acei').count() == 2
+
+
+def test_busqueda_en_listas(client, admin, vendedor, catalogo):
+    iniciar_sesion(client, vendedor)
+    html = client.get('/productos?search=aceit').get_data(as_text=True)
+    assert 'Aceite de Oliva' in html and 'Arroz Integral' not in html
+    
+    iniciar_sesion(client, admin)
+    html = client.get('/admin/usuarios?search=vended').get_data(as_text=True)
+    assert 'vendedor@sistema.com' in html
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+from conftest import iniciar_sesion
+from models import db, ItemPedido, Producto, User, Rol
+
+
+def _pedido_y_productos(pedidos_con_items):
+    pedido = pedidos_con_items[0]
+    productos = Producto.query.order_by(Producto.id).all()
+    return pedido, productos
+
+
+def test_carga_masiva_en_una_transaccion(client, vendedor, pedidos_con_items, contar_consultas):
+    pedido, productos = _pedido_y_productos(pedidos_con_items)
+    url = f'/api/pedidos/{pedido.id}/items'
+    lineas = [{'producto_id': productos[i % 3].id, 'cantidad': 2, 'precio_unitario': '1.10'}
+              for i in range(200)]
+    lineas.append({'codigo': productos[0].codigo, 'cantidad': 1})
+    iniciar_sesion(client, vendedor)
+    
+    with contar_consultas() as consultas:
+        respuesta = client.post(url, json={'items': lineas})
+    
+    assert respuesta.status_code == 201
+    datos = respuesta.get_json()
+    assert datos['insertados'] == 201
+    # 13.50 previos + 200 * 2 * 1.10 + 10.50 del precio de catálogo
+    assert Decimal(datos['total']) == Decimal('464.00')
+    assert datos['total_items'] == 6 + 400 + 1
+    # usuario, pedido, productos, insert masivo, totales y su recarga
+    assert consultas.total <= 6, consultas.sentencias
+
+
+def test_errores_por_linea_no_insertan_nada(client, vendedor, pedidos_con_items):
+    pedido, productos = _pedido_y_productos(pedidos_con_items)
+    iniciar_sesion(client, vendedor)
+    
+    respuesta = client.post(f'/api/pedidos/{pedido.id}/items', json={'items': [
+        {'producto_id': productos[0].id, 'cantidad': 1},
+        {'codigo': 'NO-EXISTE', 'cantidad': 1},
+        {'producto_id': productos[1].id, 'cantidad': 0},
+        {'producto_id': productos[1].id, 'cantidad': 1, 'precio_unitario': 'abc'},
+    ]})
+    
+    assert respuesta.status_code == 422
+    assert [e['linea'] for e in respuesta.get_json()['errores']] == [2, 3, 4]
+    assert ItemPedido.query.filter_by(pedido_id=pedido.id).count() == 3
+
+
+def test_cuerpo_que_no_es_objeto(client, vendedor, pedidos_con_items):
+    pedido, _ = _pedido_y_productos(pedidos_con_items)
+    iniciar_sesion(client, vendedor)
+    
+    for cuerpo in ([1, 2], 'items', 3):
+        respuesta = client.post(f'/api/pedidos/{pedido.id}/items', json=cuerpo)
+        assert respuesta.status_code == 400
+        assert 'error' in respuesta.get_json()
+
+
+def test_lineas_mal_formadas_devuelven_error_por_linea(client, vendedor, pedidos_con_items):
+    pedido, productos = _pedido_y_productos(pedidos_con_items)
+    iniciar_sesion(client, vendedor)
+    
+    respuesta = client.post(f'/api/pedidos/{pedido.id}/items', json={'items': [
+        {'producto_id': [productos[0].id], 'cantidad': 1},
+        {'codigo': {'a': 1}, 'cantidad': 1},
+        {'producto_id': productos[0].id, 'cantidad': 1, 'precio_unitario': '1e30'},
+        {'producto_id': productos[0].id, 'cantidad': 1, 'precio_unitario': '100000000'},
+        {'producto_id': productos[0].id, 'cantidad': 1, 'precio_unitario': 'NaN'},
+        {'producto_id': productos[0].id, 'cantidad': 1, 'precio_unitario': '99999999.99'},
+    ]})
+    
+    assert respuesta.status_code == 422
+    assert respuesta.get_json()['errores'] == [
+        {'linea': 1, 'error': 'Producto inexistente o inactivo'},
+        {'linea': 2, 'error': 'Producto inexistente o inactivo'},
+        {'linea': 3, 'error': 'Precio unitario inválido'},
+        {'linea': 4, 'error': 'Precio unitario inválido'},
+        {'linea': 5, 'error': 'Precio unitario inválido'},
+    ]
+    assert ItemPedido.query.filter_by(pedido_id=pedido.id).count() == 3
+
+
+def test_carga_masiva_respeta_permisos(client, pedidos_con_items):
+    pedido, productos = _pedido_y_productos(pedidos_con_items)
+    otro = User(username='otro', email='otro@sistema.com', nombre='Otro',
+                rol=Rol.VENDEDOR, password_hash='-')
+    db.session.add(otro)
+    db.session.commit()
+    iniciar_sesion(client, otro)
+    
+    respuesta = client.post(f'/api/pedidos/{pedido.id}/items',
+                            json={'items': [{'producto_id': productos[0].id, 'cantidad': 1}]})
+    assert respuesta.status_code == 403
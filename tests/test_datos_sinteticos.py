@@ -0,0 +1,45 @@
+from datetime import datetime
+from sqlalchemy import func, select
+
+import datos_sinteticos
+from models import db, Pedido, ItemPedido, Producto, EstadoPedido
+
+
+def _pedidos(conn):
+    return conn.execute(select(Pedido.id_pedido, Pedido.estado, Pedido.total, Pedido.fecha_creacion)
+                        .order_by(Pedido.id)).all()
+
+
+def test_generar_crea_datos_coherentes(app):
+    with db.engine.begin() as conn:
+        creadas = datos_sinteticos.generar(conn, usuarios=5, distribuidoras=10, productos=50,
+                                           pedidos=600, lote=250, hasta=datetime(2024, 6, 30))
+        
+        assert creadas['pedidos'] == 600
+        assert conn.execute(select(func.count(ItemPedido.id))).scalar() == creadas['items_pedido']
+        # total y total_items precalculados coinciden con los items
+        descuadrados = conn.execute(
+            select(func.count()).select_from(Pedido)
+            .where(func.abs(Pedido.total - select(func.sum(ItemPedido.cantidad * ItemPedido.precio_unitario))
+                            .where(ItemPedido.pedido_id == Pedido.id).scalar_subquery()) > 0.005)).scalar()
+        assert descuadrados == 0
+        
+        # El producto más popular aparece mucho más que la media
+        conteos = conn.execute(select(func.count()).select_from(ItemPedido)
+                               .group_by(ItemPedido.producto_id)
+                               .order_by(func.count().desc())).scalars().all()
+        assert conteos[0] > 5 * creadas['items_pedido'] / len(conteos)
+        
+        estados = dict(conn.execute(select(Pedido.estado, func.count()).group_by(Pedido.estado)).all())
+        assert max(estados, key=estados.get) == EstadoPedido.RECIBIDO
+
+
+def test_generar_es_reproducible_y_acumulable(app):
+    with db.engine.begin() as conn:
+        datos_sinteticos.generar(conn, usuarios=3, distribuidoras=3, productos=10, pedidos=100, semilla=42)
+        primera = _pedidos(conn)
+        datos_sinteticos.generar(conn, usuarios=3, distribuidoras=3, productos=10, pedidos=100, semilla=42)
+        
+        segunda = _pedidos(conn)[100:]
+        assert [fila[1:] for fila in segunda] == [fila[1:] for fila in primera]
+        assert conn.execute(select(func.count(Producto.id))).scalar() == 20
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from conftest import iniciar_sesion
+from cache import CacheTTL
+from estadisticas import calcular_estadisticas
+
+
+def test_calcular_estadisticas(app, admin, vendedor, pedidos_con_items):
+    estadisticas = calcular_estadisticas()
+    assert estadisticas['total_usuarios'] == 2
+    assert estadisticas['usuarios_por_rol'] == {'administrador': 1, 'vendedor': 1}
+    assert estadisticas['total_pedidos'] == 25
+    assert estadisticas['pedidos_por_estado'] == {
+        'pendiente': 7, 'enviado': 6, 'recibido': 6, 'cancelado': 6}
+    assert estadisticas['distribuidoras_activas'] == 1
+    assert estadisticas['productos_activos'] == 3
+
+
+def test_dashboard_reutiliza_estadisticas(client, vendedor, pedidos_con_items, contar_consultas):
+    iniciar_sesion(client, vendedor)
+    with contar_consultas() as primera:
+        assert client.get('/dashboard').status_code == 200
+    with contar_consultas() as segunda:
+        assert client.get('/dashboard').status_code == 200
+    
+    # usuario actual + 4 agregados + pedidos recientes
+    assert primera.total <= 6, primera.sentencias
+    # usuario actual + pedidos recientes
+    assert segunda.total <= 2, segunda.sentencias
+
+
+def test_admin_dashboard_presupuesto_consultas(client, admin, pedidos_con_items, contar_consultas):
+    iniciar_sesion(client, admin)
+    with contar_consultas() as consultas:
+        respuesta = client.get('/admin/dashboard')
+    assert respuesta.status_code == 200
+    assert consultas.total <= 7, consultas.sentencias
+
+
+def test_cache_calcula_una_vez_con_accesos_concurrentes():
+    cache = CacheTTL()
+    llamadas = []
+    
+    def calcular():
+        llamadas.append(1)
+        time.sleep(0.05)
+        return 42
+    
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener('k', calcular, 60)))
+             for _ in range(50)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    
+    assert len(llamadas) == 1
+    assert resultados == [42] * 50
+
+
+def test_cache_expira_tras_ttl():
+    ahora = [0.0]
+    cache = CacheTTL(reloj=lambda: ahora[0])
+    valores = iter([1, 2])
+    
+    assert cache.obtener('k', lambda: next(valores), 10) == 1
+    ahora[0] = 5
+    assert cache.obtener('k', lambda: next(valores), 10) == 1
+    ahora[0] = 11
+    assert cache.obtener('k', lambda: next(valores), 10) == 2
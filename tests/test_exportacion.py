@@ -0,0 +1,41 @@
+import csv
+import gzip
+import io
+import json
+
+from conftest import iniciar_sesion
+from models import db, User, Rol
+
+
+def test_exporta_csv_una_fila_por_item(client, vendedor, pedidos_con_items):
+    iniciar_sesion(client, vendedor)
+    respuesta = client.get('/pedidos/exportar?formato=csv')
+    
+    assert respuesta.status_code == 200
+    assert respuesta.mimetype == 'text/csv'
+    filas = list(csv.DictReader(io.StringIO(respuesta.get_data(as_text=True))))
+    assert len(filas) == 25 * 3
+    assert filas[0]['id_pedido'] == 'PED-0000'
+    assert filas[2]['cantidad'] == '3' and filas[2]['subtotal'] == '6.75'
+
+
+def test_exporta_ndjson_comprimido_con_filtros(client, vendedor, pedidos_con_items):
+    iniciar_sesion(client, vendedor)
+    respuesta = client.get('/pedidos/exportar?formato=ndjson&gzip=1&estado=enviado')
+    
+    assert respuesta.mimetype == 'application/gzip'
+    registros = [json.loads(linea) for linea in
+                 gzip.decompress(respuesta.get_data()).decode('utf-8').splitlines()]
+    assert {r['estado'] for r in registros} == {'enviado'}
+    assert len(registros) == 6 * 3
+
+
+def test_exportacion_solo_pedidos_propios(client, vendedor, pedidos_con_items):
+    otro = User(username='otro', email='otro@sistema.com', nombre='Otro',
+                rol=Rol.VENDEDOR, password_hash='-')
+    db.session.add(otro)
+    db.session.commit()
+    iniciar_sesion(client, otro)
+    
+    respuesta = client.get('/pedidos/exportar?formato=csv')
+    assert respuesta.get_data(as_text=True).strip().count('\n') == 0
@@ -0,0 +1,50 @@
+from flask import render_template_string
+
+from conftest import iniciar_sesion
+from fragmentos import AlmacenArchivos, AlmacenLRU
+from models import db, Distribuidora
+
+PLANTILLA = "{% cache 'prueba', 60, 'distribuidoras' %}<b>{{ renderizar() }}</b>{% endcache %}"
+
+
+def test_fragmento_se_renderiza_una_vez_por_cambio_de_datos(app):
+    llamadas = []
+    
+    def renderizar():
+        llamadas.append(1)
+        return len(llamadas)
+    
+    assert render_template_string(PLANTILLA, renderizar=renderizar) == '<b>1</b>'
+    assert render_template_string(PLANTILLA, renderizar=renderizar) == '<b>1</b>'
+    
+    db.session.add(Distribuidora(nombre='Nueva', codigo='NV01', contacto='Ana',
+                                 telefono='555-0101', email='nueva@example.com'))
+    db.session.commit()
+    
+    assert render_template_string(PLANTILLA, renderizar=renderizar) == '<b>2</b>'
+
+
+def test_dashboard_no_consulta_pedidos_recientes_en_cache(client, vendedor, pedidos_con_items, contar_consultas):
+    iniciar_sesion(client, vendedor)
+    client.get('/dashboard')
+    with contar_consultas() as consultas:
+        html = client.get('/dashboard').get_data(as_text=True)
+    assert 'PED-0024' in html
+    assert not any('FROM pedidos' in s for s in consultas.sentencias), consultas.sentencias
+
+
+def test_almacenes_respetan_ttl(tmp_path):
+    ahora = [0.0]
+    for almacen in (AlmacenLRU(maximo=1, reloj=lambda: ahora[0]),
+                    AlmacenArchivos(str(tmp_path), reloj=lambda: ahora[0])):
+        ahora[0] = 0.0
+        almacen.guardar('a', 'uno', 10)
+        assert almacen.obtener('a') == 'uno'
+        ahora[0] = 11
+        assert almacen.obtener('a') is None
+    
+    lru = AlmacenLRU(maximo=1)
+    lru.guardar('a', 'uno', 10)
+    lru.guardar('b', 'dos', 10)
+    assert lru.obtener('a') is None
+    assert lru.obtener('b') == 'dos'
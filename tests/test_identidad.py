@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+from conftest import iniciar_sesion
+from identidad import CacheIdentidades, VersionesCompartidas
+from models import db, User
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_peticiones_autenticadas_no_consultan_users(client, vendedor, contar_consultas):
+    iniciar_sesion(client, vendedor)
+    client.get('/dashboard')
+    with contar_consultas() as consultas:
+        client.get('/productos')
+    assert not any('FROM users' in s for s in consultas.sentencias), consultas.sentencias
+
+
+def test_desactivar_usuario_invalida_su_identidad(app, client, admin, vendedor):
+    cache = app.extensions['identidades']
+    iniciar_sesion(client, vendedor)
+    client.get('/productos')
+    assert cache.obtener(vendedor.id, lambda _: None).activo
+    
+    iniciar_sesion(client, admin)
+    client.post(f'/admin/usuarios/{vendedor.id}/toggle-activo')
+    
+    assert cache.obtener(vendedor.id, lambda _: 'recargado') == 'recargado'
+
+
+def test_cambio_de_password_invalida_identidad(app, vendedor):
+    cache = app.extensions['identidades']
+    cache.obtener(vendedor.id, lambda _: 'antigua')
+    
+    db.session.get(User, vendedor.id).set_password('nueva-clave')
+    db.session.commit()
+    
+    assert cache.obtener(vendedor.id, lambda _: 'nueva') == 'nueva'
+
+
+def test_cache_acotada_y_con_ttl():
+    ahora = [0.0]
+    cache = CacheIdentidades(maximo=2, ttl=10, versiones=VersionesCompartidas(), reloj=lambda: ahora[0])
+    for user_id in (1, 2, 3):
+        cache.obtener(user_id, lambda i: f'u{i}')
+    assert cache.obtener(1, lambda i: 'recargado') == 'recargado'
+    assert cache.obtener(3, lambda i: 'recargado') == 'u3'
+    
+    ahora[0] = 11
+    assert cache.obtener(3, lambda i: 'expirado') == 'expirado'
+
+
+def test_invalidacion_entre_procesos(tmp_path):
+    ruta = str(tmp_path / 'identidades.versiones')
+    cache = CacheIdentidades(maximo=10, ttl=300, versiones=VersionesCompartidas(ruta))
+    cache.obtener(7, lambda i: 'copia local')
+    
+    subprocess.run([sys.executable, '-c',
+                    f'from identidad import VersionesCompartidas; VersionesCompartidas({ruta!r}).cambiar(7)'],
+                   check=True, cwd=RAIZ, env=dict(os.environ, PYTHONPATH=RAIZ))
+    
+    assert cache.obtener(7, lambda i: 'recargado') == 'recargado'
@@ -0,0 +1,59 @@
+import logging
+import os
+
+from flask import Flask
+
+import instrumentacion
+from conftest import iniciar_sesion
+from config import TestingConfig
+from models import db
+
+
+def test_cabecera_server_timing(client, vendedor, pedidos_con_items):
+    iniciar_sesion(client, vendedor)
+    respuesta = client.get('/pedidos')
+    
+    cabecera = respuesta.headers['Server-Timing']
+    assert cabecera.startswith('db;dur=')
+    assert 'consultas"' in cabecera
+
+
+def test_pagina_sistema_muestra_peticiones(client, admin, vendedor, pedidos_con_items):
+    iniciar_sesion(client, vendedor)
+    client.get('/pedidos')
+    
+    iniciar_sesion(client, admin)
+    html = client.get('/admin/sistema').get_data(as_text=True)
+    assert 'main.pedidos' in html
+    assert instrumentacion.solicitudes_recientes()[0]['endpoint'] == 'admin.sistema'
+
+
+def test_log_de_consultas_lentas_incluye_plan(app, client, vendedor, pedidos_con_items, caplog):
+    app.config['SQL_LENTO_UMBRAL_MS'] = 0
+    iniciar_sesion(client, vendedor)
+    
+    with caplog.at_level(logging.WARNING, logger='sistema_pedidos.sql_lento'):
+        client.get('/pedidos')
+    
+    mensajes = [r.getMessage() for r in caplog.records if r.name == 'sistema_pedidos.sql_lento']
+    assert any('main.pedidos' in m and 'FROM pedidos' in m and 'plan: ' in m and 'SEARCH' in m
+               for m in mensajes)
+
+
+def test_log_de_consultas_lentas_relativo_a_instance(tmp_path):
+    app = Flask(__name__, instance_path=str(tmp_path))
+    app.config.from_object(TestingConfig)
+    app.config['SQL_LENTO_LOG'] = os.path.join('logs', 'lento.log')
+    db.init_app(app)
+    
+    instrumentacion.init_app(app)
+    
+    ruta = str(tmp_path / 'logs' / 'lento.log')
+    manejadores = [h for h in instrumentacion.logger_sql_lento.handlers if getattr(h, 'baseFilename', None) == ruta]
+    try:
+        assert len(manejadores) == 1
+        assert os.path.isdir(tmp_path / 'logs')
+    finally:
+        for manejador in manejadores:
+            instrumentacion.logger_sql_lento.removeHandler(manejador)
+            manejador.close()
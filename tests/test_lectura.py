@@ -0,0 +1,117 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+
+from app import create_app
+from config import config, TestingConfig
+from lectura import refrescar_replica_sqlite
+import metricas
+from models import db, User, Rol, Distribuidora
+
+
+@pytest.fixture
+def app_replica(tmp_path, monkeypatch):
+    class ConfigReplica(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "principal.db"}'
+        SQLALCHEMY_BINDS = {'lectura': f'sqlite:///{tmp_path / "replica.db"}'}
+        WTF_CSRF_ENABLED = False
+    monkeypatch.setitem(config, 'replica', ConfigReplica)
+    
+    app = create_app('replica')
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    # db es global: el bind solo existe en esta aplicación
+    db.metadatas.pop('lectura', None)
+
+
+def _distribuidora(nombre, codigo):
+    return Distribuidora(nombre=nombre, codigo=codigo, contacto='Contacto',
+                         telefono='555000', email=f'{codigo.lower()}@ejemplo.com', activa=True)
+
+
+def test_listados_leen_de_la_replica_salvo_tras_escribir(app_replica):
+    with app_replica.app_context():
+        db.create_all()
+        vendedor = User(username='vendedor', email='vendedor@sistema.com',
+                        nombre='Vendedor', rol=Rol.VENDEDOR, password_hash='sin-password')
+        db.session.add_all([vendedor, _distribuidora('Distribuidora Replicada', 'REP1')])
+        db.session.commit()
+        vendedor_id = vendedor.id
+        refrescar_replica_sqlite(db.engine, db.engines['lectura'])
+        
+        db.session.add(_distribuidora('Distribuidora Reciente', 'REC1'))
+        db.session.commit()
+    
+    client = app_replica.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(vendedor_id)
+        sess['_fresh'] = True
+    
+    html = client.get('/distribuidoras').get_data(as_text=True)
+    assert 'Distribuidora Replicada' in html
+    assert 'Distribuidora Reciente' not in html
+    
+    client.post('/distribuidoras/nueva', data={'nombre': 'Distribuidora Propia', 'codigo': 'PRO1',
+                                               'contacto': 'Contacto', 'telefono': '555000',
+                                               'email': 'pro1@ejemplo.com', 'activa': 'y'})
+    html = client.get('/distribuidoras').get_data(as_text=True)
+    assert 'Distribuidora Propia' in html
+    assert 'Distribuidora Reciente' in html
+
+
+def test_consultas_de_la_replica_se_instrumentan(app_replica, caplog):
+    app_replica.config['SQL_LENTO_UMBRAL_MS'] = 0
+    with app_replica.app_context():
+        db.create_all()
+        vendedor = User(username='vendedor', email='vendedor@sistema.com',
+                        nombre='Vendedor', rol=Rol.VENDEDOR, password_hash='sin-password')
+        db.session.add(vendedor)
+        db.session.commit()
+        vendedor_id = vendedor.id
+        refrescar_replica_sqlite(db.engine, db.engines['lectura'])
+        with db.engines['lectura'].connect() as conn:
+            assert conn.execute(text('PRAGMA foreign_keys')).scalar() == 1
+    
+    client = app_replica.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(vendedor_id)
+        sess['_fresh'] = True
+    checkouts = metricas.CHECKOUTS_POOL.labels('lectura')._value.get()
+    
+    with caplog.at_level(logging.WARNING, logger='sistema_pedidos.sql_lento'):
+        respuesta = client.get('/distribuidoras')
+    
+    # Usuario desde la principal y el listado desde la réplica
+    lentas = [r.getMessage() for r in caplog.records if r.name == 'sistema_pedidos.sql_lento']
+    assert any('FROM distribuidoras' in m for m in lentas)
+    assert 'desc="2 consultas"' in respuesta.headers['Server-Timing']
+    assert metricas.CHECKOUTS_POOL.labels('lectura')._value.get() > checkouts
+
+
+def test_sin_etag_cuando_la_respuesta_sale_de_la_replica(app_replica):
+    with app_replica.app_context():
+        db.create_all()
+        vendedor = User(username='vendedor', email='vendedor@sistema.com',
+                        nombre='Vendedor', rol=Rol.VENDEDOR, password_hash='sin-password')
+        db.session.add(vendedor)
+        db.session.commit()
+        vendedor_id = vendedor.id
+        refrescar_replica_sqlite(db.engine, db.engines['lectura'])
+    
+    client = app_replica.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(vendedor_id)
+        sess['_fresh'] = True
+    
+    # La réplica puede ir por detrás de las versiones de la principal
+    assert 'ETag' not in client.get('/productos').headers
+    
+    client.post('/distribuidoras/nueva', data={'nombre': 'Distribuidora Propia', 'codigo': 'PRO1',
+                                               'contacto': 'Contacto', 'telefono': '555000',
+                                               'email': 'pro1@ejemplo.com', 'activa': 'y'},
+                                               follow_redirects=True)
+    # Dentro de la ventana de escritura se lee de la principal y hay GET condicional
+    assert 'ETag' in client.get('/productos').headers
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+from conftest import iniciar_sesion
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_metrics_solo_administradores(client, admin, vendedor):
+    assert client.get('/admin/metrics').status_code == 401
+    
+    iniciar_sesion(client, vendedor)
+    assert client.get('/admin/metrics').status_code == 401
+    
+    iniciar_sesion(client, admin)
+    respuesta = client.get('/admin/metrics')
+    assert respuesta.status_code == 200
+    assert respuesta.content_type.startswith('text/plain')
+
+
+def test_metrics_con_token(app, client):
+    app.config['METRICAS_TOKEN'] = 'secreto'
+    assert client.get('/admin/metrics', headers={'Authorization': 'Bearer otro'}).status_code == 401
+    assert client.get('/admin/metrics', headers={'Authorization': 'Bearer secreto'}).status_code == 200
+
+
+def test_metrics_con_cabecera_no_ascii(app, client):
+    app.config['METRICAS_TOKEN'] = 'secreto'
+    assert client.get('/admin/metrics', headers={'Authorization': 'Bearer señal'}).status_code == 401
+
+
+def test_metrics_por_endpoint_y_cache(client, admin, vendedor, pedidos_con_items):
+    iniciar_sesion(client, vendedor)
+    client.get('/pedidos')
+    client.get('/dashboard')
+    client.get('/dashboard')
+    
+    iniciar_sesion(client, admin)
+    texto = client.get('/admin/metrics').get_data(as_text=True)
+    assert 'sistema_pedidos_http_request_duration_seconds_count{endpoint="main.pedidos",status="200"}' in texto
+    assert 'sistema_pedidos_http_requests_in_flight' in texto
+    assert 'sistema_pedidos_db_pool_checkouts_total' in texto
+    assert 'sistema_pedidos_cache_requests_total{cache="estadisticas",resultado="acierto"}' in texto
+    assert 'sistema_pedidos_cache_requests_total{cache="identidades",resultado="acierto"}' in texto
+
+
+def test_metrics_agrega_varios_procesos(tmp_path):
+    entorno = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path), PYTHONPATH=RAIZ)
+    observar = ("import metricas; "
+                "metricas.DURACION_PETICION.labels('main.pedidos', 200).observe(0.02)")
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', observar], env=entorno, check=True, cwd=RAIZ)
+    
+    salida = subprocess.run([sys.executable, '-c', 'import metricas; print(metricas.exponer()[0].decode())'],
+                            env=entorno, check=True, cwd=RAIZ, capture_output=True, text=True).stdout
+    assert 'sistema_pedidos_http_request_duration_seconds_count{endpoint="main.pedidos",status="200"} 2.0' in salida
@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+from migraciones import aplicar_migraciones
+
+
+@pytest.fixture
+def base_antigua(tmp_path):
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    ruta = tmp_path / 'antigua.db'
+    shutil.copy(os.path.join(raiz, 'instance', 'sistema_pedidos.db'), ruta)
+    engine = create_engine(f'sqlite:///{ruta}')
+    yield engine
+    engine.dispose()
+
+
+def test_migracion_agrega_columnas_a_base_existente(base_antigua):
+    assert '0001_totales_pedido' in aplicar_migraciones(base_antigua)
+    assert aplicar_migraciones(base_antigua) == []
+    columnas = {c['name'] for c in inspect(base_antigua).get_columns('pedidos')}
+    assert {'total', 'total_items'} <= columnas
+
+
+def test_migracion_crea_indices_de_consulta(base_antigua):
+    aplicar_migraciones(base_antigua)
+    indices = {i['name'] for i in inspect(base_antigua).get_indexes('pedidos')}
+    assert {'ix_pedidos_usuario_fecha', 'ix_pedidos_estado_fecha',
+            'ix_pedidos_distribuidora_fecha', 'ix_pedidos_fecha_creacion'} <= indices
+    
+    with base_antigua.connect() as conn:
+        plan = ' '.join(fila[-1] for fila in conn.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM productos WHERE activo = 1 "
+            "ORDER BY fecha_creacion DESC, id DESC LIMIT 11")))
+    assert 'ix_productos_activos_fecha' in plan
+
+
+def test_migracion_borra_en_cascada_con_claves_foraneas_activas(base_antigua):
+    @event.listens_for(base_antigua, 'connect')
+    def claves_foraneas(dbapi_connection, connection_record):
+        dbapi_connection.execute('PRAGMA foreign_keys=ON')
+    
+    with base_antigua.begin() as conn:
+        conn.execute(text("INSERT INTO distribuidoras (id, nombre, codigo, contacto, telefono, email) "
+                          "VALUES (1, 'Norte', 'DN01', 'Ana', '555-0101', 'norte@ejemplo.com')"))
+        usuario = conn.execute(text("SELECT id FROM users")).scalar()
+        producto = conn.execute(text("SELECT id FROM productos")).scalar()
+        conn.execute(text("INSERT INTO pedidos (id, id_pedido, distribuidora_id, usuario_id, estado) "
+                          "VALUES (1, 'PED-1', :d, :u, 'PENDIENTE')"), {'d': 1, 'u': usuario})
+        conn.execute(text("INSERT INTO items_pedido (pedido_id, producto_id, cantidad, precio_unitario) "
+                          "VALUES (1, :p, 2, 3.5), (1, :p, 1, 4)"), {'p': producto})
+    assert '0004_borrado_en_cascada' in aplicar_migraciones(base_antigua)
+    
+    for tabla in ('pedidos', 'items_pedido'):
+        assert [fk['options'].get('ondelete') for fk in inspect(base_antigua).get_foreign_keys(tabla)
+                if fk['referred_table'] in ('distribuidoras', 'pedidos')] == ['CASCADE']
+    with base_antigua.begin() as conn:
+        assert conn.execute(text("SELECT total, total_items FROM pedidos")).one() == (11, 3)
+        assert conn.execute(text("SELECT COUNT(*) FROM items_pedido")).scalar() == 2
+        assert conn.execute(text("PRAGMA foreign_key_check")).all() == []
+        conn.execute(text("DELETE FROM distribuidoras"))
+        assert conn.execute(text("SELECT COUNT(*) FROM items_pedido")).scalar() == 0
+
+
+def test_migracion_evita_reutilizar_ids_archivados(base_antigua):
+    aplicar_migraciones(base_antigua)
+    with base_antigua.begin() as conn:
+        for tabla in ('pedidos', 'items_pedido'):
+            assert 'AUTOINCREMENT' in conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE name = :tabla"), {'tabla': tabla}).scalar()
+        
+        # Un archivo con ids mayores que la tabla caliente, como tras archivar los pedidos más recientes
+        conn.execute(text("INSERT INTO distribuidoras (id, nombre, codigo, contacto, telefono, email) "
+                          "VALUES (1, 'Norte', 'DN01', 'Ana', '555-0101', 'norte@ejemplo.com')"))
+        usuario = conn.execute(text("SELECT id FROM users")).scalar()
+        conn.execute(text("INSERT INTO pedidos_archivo (id, id_pedido, distribuidora_id, usuario_id, estado) "
+                          "VALUES (500, 'PED-500', 1, :u, 'RECIBIDO')"), {'u': usuario})
+        conn.execute(text("DELETE FROM schema_migraciones WHERE nombre = '0007_ids_sin_reutilizar'"))
+    assert aplicar_migraciones(base_antigua) == ['0007_ids_sin_reutilizar']
+    
+    with base_antigua.begin() as conn:
+        usuario = conn.execute(text("SELECT id FROM users")).scalar()
+        conn.execute(text("INSERT INTO pedidos (id_pedido, distribuidora_id, usuario_id, estado) "
+                          "VALUES ('PED-NUEVO', 1, :u, 'PENDIENTE')"), {'u': usuario})
+        assert conn.execute(text("SELECT id FROM pedidos WHERE id_pedido = 'PED-NUEVO'")).scalar() == 501
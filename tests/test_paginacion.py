@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import iniciar_sesion
+from models import db, Pedido
+from paginacion import paginar_por_cursor, decodificar_cursor
+
+
+@pytest.fixture
+def pedidos_con_empates(pedidos_con_items):
+    # Varias filas comparten fecha_creacion para comprobar el desempate por id
+    base = datetime(2024, 1, 1)
+    for i, pedido in enumerate(pedidos_con_items):
+        pedido.fecha_creacion = base + timedelta(minutes=i // 3)
+    db.session.commit()
+    return pedidos_con_items
+
+
+def _recorrer(query, por_pagina):
+    paginas = [paginar_por_cursor(query, Pedido.fecha_creacion, Pedido.id, None, por_pagina)]
+    while paginas[-1].has_next:
+        paginas.append(paginar_por_cursor(query, Pedido.fecha_creacion, Pedido.id,
+                                          paginas[-1].next_cursor, por_pagina))
+    return paginas
+
+
+def test_recorre_todas_las_filas_sin_repetir(pedidos_con_empates):
+    paginas = _recorrer(Pedido.query, 4)
+    ids = [p.id for pagina in paginas for p in pagina.items]
+    
+    esperado = [p.id for p in Pedido.query.order_by(Pedido.fecha_creacion.desc(), Pedido.id.desc())]
+    assert ids == esperado
+    assert len(paginas) == 7
+    assert not paginas[0].has_prev and paginas[1].has_prev
+
+
+def test_cursor_anterior_devuelve_la_pagina_previa(pedidos_con_empates):
+    paginas = _recorrer(Pedido.query, 4)
+    for anterior, actual in zip(paginas, paginas[1:]):
+        previa = paginar_por_cursor(Pedido.query, Pedido.fecha_creacion, Pedido.id,
+                                    actual.prev_cursor, 4)
+        assert [p.id for p in previa.items] == [p.id for p in anterior.items]
+        assert previa.has_next
+        assert previa.has_prev == anterior.has_prev
+
+
+def test_cursor_invalido_vuelve_a_la_primera_pagina(pedidos_con_empates):
+    assert decodificar_cursor('no-es-un-cursor') is None
+    pagina = paginar_por_cursor(Pedido.query, Pedido.fecha_creacion, Pedido.id, 'no-es-un-cursor', 4)
+    assert not pagina.has_prev
+    assert len(pagina.items) == 4
+
+
+def test_listas_con_paginacion_por_cursor(client, admin, vendedor, pedidos_con_items):
+    iniciar_sesion(client, vendedor)
+    for url in ('/productos', '/distribuidoras', '/pedidos?estado=pendiente'):
+        assert client.get(url).status_code == 200
+    
+    iniciar_sesion(client, admin)
+    assert client.get('/admin/usuarios?search=a').status_code == 200
@@ -0,0 +1,35 @@
+import html
+import re
+
+from conftest import iniciar_sesion
+
+
+def test_lista_pedidos_muestra_totales(client, vendedor, pedidos_con_items):
+    iniciar_sesion(client, vendedor)
+    respuesta = client.get('/pedidos')
+    assert respuesta.status_code == 200
+    html = respuesta.get_data(as_text=True)
+    # 1*2.25 + 2*2.25 + 3*2.25
+    assert '$13.50' in html
+    assert 'Distribuidora Norte' in html
+    assert 'Vendedor de Prueba' in html
+
+
+def test_lista_pedidos_presupuesto_consultas(client, vendedor, pedidos_con_items, contar_consultas):
+    iniciar_sesion(client, vendedor)
+    primera = client.get('/pedidos').get_data(as_text=True)
+    siguiente = re.search(r'href="(/pedidos\?cursor=[^"]+)"', primera).group(1)
+    with contar_consultas() as consultas:
+        respuesta = client.get(html.unescape(siguiente))
+    assert respuesta.status_code == 200
+    # solo la página con relaciones: sin COUNT(*) y el usuario sale de la cache
+    assert consultas.total <= 1, consultas.sentencias
+
+
+def test_lista_pedidos_filtros_presupuesto_consultas(client, vendedor, pedidos_con_items, contar_consultas):
+    iniciar_sesion(client, vendedor)
+    client.get('/pedidos?distribuidora=Norte')
+    with contar_consultas() as consultas:
+        respuesta = client.get('/pedidos?estado=pendiente&distribuidora=Norte')
+    assert respuesta.status_code == 200
+    assert consultas.total <= 2, consultas.sentencias
@@ -0,0 +1,144 @@
+"""Presupuesto de consultas SQL y de tiempo para cada ruta de main, admin y auth.
+
+Cada caso se ejecuta con caches vacías sobre el conjunto de datos de
+``datos_volumen``. Si una plantilla o vista empieza a consultar por fila, el
+número de consultas crece y el caso falla.
+
+Los presupuestos de tiempo dependen de la máquina y no se ejecutan por defecto:
+``pytest -m presupuesto_tiempo``. Son holgados: incluyen la compilación de la
+plantilla en la primera petición.
+"""
+import pytest
+from sqlalchemy.pool import StaticPool
+
+from conftest import iniciar_sesion
+from models import db, Distribuidora, Producto
+
+# (endpoint, método, ruta, datos, usuario, consultas, ms)
+PRESUPUESTOS = [
+    ('main.index', 'GET', '/', None, 'vendedor', 1, 100),
+    ('main.dashboard', 'GET', '/dashboard', None, 'vendedor', 6, 300),
+    ('main.distribuidoras', 'GET', '/distribuidoras', None, 'vendedor', 2, 300),
+    ('main.distribuidoras', 'GET', '/distribuidoras?search=Distribuidora', None, 'vendedor', 3, 300),
+    ('main.nueva_distribuidora', 'GET', '/distribuidoras/nueva', None, 'vendedor', 1, 300),
+    ('main.nueva_distribuidora', 'POST', '/distribuidoras/nueva',
+     {'nombre': 'Nueva', 'codigo': 'NUEVA1', 'contacto': 'Ana', 'telefono': '555-0000',
+      'email': 'nueva@ejemplo.com', 'activa': 'y'}, 'vendedor', 3, 200),
+    ('main.editar_distribuidora', 'GET', '/distribuidoras/{distribuidora}/editar', None, 'vendedor', 2, 300),
+    ('main.editar_distribuidora', 'POST', '/distribuidoras/{distribuidora}/editar',
+     {'nombre': 'Editada', 'codigo': 'EDIT01', 'contacto': 'Ana', 'telefono': '555-0000',
+      'email': 'editada@ejemplo.com'}, 'vendedor', 4, 200),
+    ('main.productos', 'GET', '/productos', None, 'vendedor', 2, 300),
+    ('main.productos', 'GET', '/productos?search=Producto', None, 'vendedor', 3, 300),
+    ('main.nuevo_producto', 'GET', '/productos/nuevo', None, 'vendedor', 1, 300),
+    ('main.nuevo_producto', 'POST', '/productos/nuevo',
+     {'nombre': 'Nuevo', 'codigo': 'NUEVO1', 'precio': '9.99', 'stock': 5, 'activo': 'y'}, 'vendedor', 3, 200),
+    ('main.editar_producto', 'GET', '/productos/{producto}/editar', None, 'vendedor', 2, 300),
+    ('main.editar_producto', 'POST', '/productos/{producto}/editar',
+     {'nombre': 'Editado', 'codigo': 'EDIT01', 'precio': '9.99', 'stock': 5}, 'vendedor', 4, 200),
+    ('main.pedidos', 'GET', '/pedidos', None, 'vendedor', 2, 300),
+    ('main.pedidos', 'GET', '/pedidos?estado=recibido&distribuidora=Distribuidora', None, 'vendedor', 3, 300),
+    ('main.pedidos', 'GET', '/pedidos?historico=1', None, 'vendedor', 2, 300),
+    ('main.exportar_pedidos', 'GET', '/pedidos/exportar', None, 'vendedor', 2, 300),
+    ('main.exportar_pedidos', 'GET', '/pedidos/exportar?formato=ndjson&gzip=1', None, 'vendedor', 2, 300),
+    ('main.nuevo_pedido', 'GET', '/pedidos/nuevo', None, 'vendedor', 2, 300),
+    ('main.nuevo_pedido', 'POST', '/pedidos/nuevo',
+     {'distribuidora_id': '{distribuidora}', 'observaciones': 'Presupuesto'}, 'vendedor', 4, 200),
+    ('main.detalle_pedido', 'GET', '/pedidos/{pedido}', None, 'vendedor', 3, 300),
+    ('main.agregar_item_pedido', 'POST', '/pedidos/{pedido}/agregar-item',
+     {'producto_id': '{producto}', 'cantidad': 2, 'precio_unitario': '3.50'}, 'vendedor', 5, 200),
+    ('main.cambiar_estado_pedido', 'POST', '/pedidos/{pedido}/cambiar-estado',
+     {'estado': 'enviado'}, 'vendedor', 3, 200),
+    ('main.eliminar_item_pedido', 'POST', '/pedidos/{pedido}/eliminar-item/{item}', None, 'vendedor', 5, 200),
+    ('main.api_productos', 'GET', '/api/productos?q=Producto', None, 'vendedor', 3, 200),
+    ('main.api_agregar_items_pedido', 'POST', '/api/pedidos/{pedido}/items',
+     {'items': [{'producto_id': '{producto}', 'cantidad': 1}, {'producto_id': '{producto}', 'cantidad': 3}]},
+     'vendedor', 6, 200),
+    ('auth.login', 'GET', '/auth/login', None, None, 0, 300),
+    ('auth.login', 'POST', '/auth/login', {'username': '{username}', 'password': 'vendedor123'}, None, 3, 300),
+    ('auth.logout', 'GET', '/auth/logout', None, 'vendedor', 1, 100),
+    ('auth.registro', 'GET', '/auth/registro', None, 'admin', 1, 300),
+    ('auth.registro', 'POST', '/auth/registro',
+     {'username': 'nuevo1', 'email': 'nuevo1@ejemplo.com', 'nombre': 'Nuevo Vendedor', 'rol': 'vendedor',
+      'password': 'secreto1', 'password2': 'secreto1'}, 'admin', 4, 300),
+    ('admin.dashboard', 'GET', '/admin/dashboard', None, 'admin', 7, 300),
+    ('admin.usuarios', 'GET', '/admin/usuarios', None, 'admin', 2, 300),
+    ('admin.usuarios', 'GET', '/admin/usuarios?search=vendedor', None, 'admin', 3, 300),
+    ('admin.toggle_usuario_activo', 'POST', '/admin/usuarios/{usuario}/toggle-activo', None, 'admin', 4, 200),
+    ('admin.sistema', 'GET', '/admin/sistema', None, 'admin', 1, 300),
+    ('admin.metrics', 'GET', '/admin/metrics', None, 'admin', 1, 300),
+]
+
+
+def _sustituir(valor, ids):
+    if isinstance(valor, str):
+        return valor.format(**ids)
+    if isinstance(valor, dict):
+        return {clave: _sustituir(v, ids) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_sustituir(v, ids) for v in valor]
+    return valor
+
+
+def _entero(valor):
+    return int(valor) if isinstance(valor, str) and valor.isdigit() else valor
+
+
+def test_base_en_memoria_con_una_sola_conexion(app):
+    # Flask-SQLAlchemy usa StaticPool con sqlite:///:memory: de TestingConfig;
+    # sin ella cada conexión vería una base vacía distinta
+    assert isinstance(db.engine.pool, StaticPool)
+
+
+def test_todas_las_rutas_tienen_presupuesto(app):
+    rutas = {(regla.endpoint, metodo)
+             for regla in app.url_map.iter_rules()
+             if regla.endpoint.split('.')[0] in ('main', 'admin', 'auth')
+             for metodo in regla.methods - {'HEAD', 'OPTIONS'}}
+    cubiertas = {(endpoint, metodo) for endpoint, metodo, *_ in PRESUPUESTOS}
+    assert rutas - cubiertas == set()
+
+
+def _medir(client, admin, datos_volumen, presupuesto, endpoint, metodo, ruta, datos, usuario,
+           consultas, ms=None):
+    vendedor, pedido = datos_volumen['vendedor'], datos_volumen['pedido']
+    ids = {
+        'username': vendedor.username,
+        'pedido': pedido.id,
+        'item': pedido.items[0].id,
+        'producto': db.session.query(Producto.id).filter_by(activo=True).order_by(Producto.id).limit(1).scalar(),
+        'distribuidora': db.session.query(Distribuidora.id).filter_by(activa=True).order_by(Distribuidora.id).limit(1).scalar(),
+        'usuario': vendedor.id,
+    }
+    if usuario:
+        iniciar_sesion(client, admin if usuario == 'admin' else vendedor)
+    ruta, datos = _sustituir(ruta, ids), _sustituir(datos, ids)
+    
+    if endpoint == 'main.api_agregar_items_pedido':
+        datos = {'items': [{clave: _entero(v) for clave, v in linea.items()} for linea in datos['items']]}
+        peticion = {'json': datos}
+    else:
+        peticion = {'data': datos}
+    
+    with presupuesto(consultas, ms, f'{metodo} {ruta}'):
+        respuesta = client.open(ruta, method=metodo, **peticion)
+        respuesta.get_data()
+    
+    # Los POST válidos redirigen (o devuelven 201 en la API); un 200 sería un formulario rechazado
+    assert respuesta.status_code in ((302, 201) if metodo == 'POST' else (200, 302)), respuesta.status_code
+
+
+IDS = [f'{p[1]} {p[2]}' for p in PRESUPUESTOS]
+
+
+@pytest.mark.parametrize('endpoint, metodo, ruta, datos, usuario, consultas, ms', PRESUPUESTOS, ids=IDS)
+def test_consultas_por_ruta(app, client, admin, datos_volumen, presupuesto,
+                            endpoint, metodo, ruta, datos, usuario, consultas, ms):
+    _medir(client, admin, datos_volumen, presupuesto, endpoint, metodo, ruta, datos, usuario, consultas)
+
+
+@pytest.mark.presupuesto_tiempo
+@pytest.mark.parametrize('endpoint, metodo, ruta, datos, usuario, consultas, ms', PRESUPUESTOS, ids=IDS)
+def test_tiempo_por_ruta(app, client, admin, datos_volumen, presupuesto,
+                         endpoint, metodo, ruta, datos, usuario, consultas, ms):
+    _medir(client, admin, datos_volumen, presupuesto, endpoint, metodo, ruta, datos, usuario, consultas, ms)
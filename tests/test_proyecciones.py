@@ -0,0 +1,30 @@
+from conftest import iniciar_sesion
+from models import db
+
+
+def test_listados_no_leen_columnas_que_no_muestran(client, vendedor, pedidos_con_items, contar_consultas):
+    iniciar_sesion(client, vendedor)
+    for ruta, columna in (('/pedidos', 'observaciones'), ('/productos', 'descripcion'),
+                          ('/distribuidoras', 'direccion')):
+        with contar_consultas() as consultas:
+            assert client.get(ruta).status_code == 200
+        assert not any(columna in s for s in consultas.sentencias), ruta
+
+
+def test_listado_de_usuarios_no_lee_el_hash(client, admin, contar_consultas):
+    iniciar_sesion(client, admin)
+    with contar_consultas() as consultas:
+        assert client.get('/admin/usuarios').status_code == 200
+    # La primera consulta es la del user_loader
+    assert not any('password_hash' in s for s in consultas.sentencias[1:])
+
+
+def test_listado_de_pedidos_no_carga_entidades(client, vendedor, pedidos_con_items, contar_consultas):
+    iniciar_sesion(client, vendedor)
+    with contar_consultas():
+        respuesta = client.get('/pedidos')
+    
+    assert 'PED-0024' in respuesta.get_data(as_text=True)
+    assert 'Distribuidora Norte' in respuesta.get_data(as_text=True)
+    # Solo la identidad del usuario pasa por la sesión
+    assert {type(objeto).__name__ for objeto in db.session} <= {'User'}
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from models import db, User
+from seguridad import HasherContrasenas, SistemaSaturado
+
+
+def test_login_regenera_hash_con_parametros_antiguos(app, client, vendedor):
+    vendedor.password_hash = generate_password_hash('clave-vieja', 'pbkdf2:sha256:500')
+    db.session.commit()
+    
+    respuesta = client.post('/auth/login', data={'username': vendedor.username, 'password': 'clave-vieja'})
+    
+    assert respuesta.status_code == 302
+    usuario = db.session.get(User, vendedor.id)
+    assert usuario.password_hash.startswith(app.config['PASSWORD_HASH_METODO'] + '$')
+    assert usuario.check_password('clave-vieja')
+
+
+def test_login_rechazado_si_el_pool_esta_saturado(app, client, vendedor, monkeypatch):
+    vendedor.set_password('clave')
+    db.session.commit()
+    
+    def saturado(*args):
+        raise SistemaSaturado()
+    monkeypatch.setattr(app.extensions['contrasenas'], 'verificar', saturado)
+    
+    respuesta = client.post('/auth/login', data={'username': vendedor.username, 'password': 'clave'})
+    assert respuesta.status_code == 503
+
+
+def test_admision_acotada():
+    hasher = HasherContrasenas('pbkdf2:sha256:1000', hilos=1, en_espera=1)
+    liberar = threading.Event()
+    hasher._ejecutor.submit(liberar.wait)
+    hasher._admision.acquire()
+    hasher._admision.acquire()
+    try:
+        with pytest.raises(SistemaSaturado):
+            hasher.generar('clave')
+    finally:
+        hasher._admision.release()
+        hasher._admision.release()
+        liberar.set()
+    assert hasher.verificar(hasher.generar('clave'), 'clave')
+    hasher.cerrar()
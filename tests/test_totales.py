@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from conftest import iniciar_sesion
+from models import db, Pedido
+
+
+def test_agregar_item_actualiza_totales(client, vendedor, pedidos_con_items):
+    pedido = pedidos_con_items[0]
+    producto_id = pedido.items[0].producto_id
+    iniciar_sesion(client, vendedor)
+    
+    respuesta = client.post(f'/pedidos/{pedido.id}/agregar-item', data={
+        'producto_id': producto_id, 'cantidad': 3, 'precio_unitario': '0.10'})
+    assert respuesta.status_code == 302
+    
+    db.session.expire_all()
+    pedido = db.session.get(Pedido, pedido.id)
+    assert pedido.total == Decimal('13.80')
+    assert pedido.total_items == 9
+
+
+def test_eliminar_item_actualiza_totales(client, vendedor, pedidos_con_items):
+    pedido = pedidos_con_items[0]
+    item = pedido.items[2]
+    iniciar_sesion(client, vendedor)
+    
+    respuesta = client.post(f'/pedidos/{pedido.id}/eliminar-item/{item.id}')
+    assert respuesta.status_code == 302
+    
+    db.session.expire_all()
+    pedido = db.session.get(Pedido, pedido.id)
+    assert pedido.total == Decimal('6.75')
+    assert pedido.total_items == 3
+
+
+def test_recalcular_totales_repara_datos(app, pedidos_con_items):
+    db.session.execute(text("UPDATE pedidos SET total = 0, total_items = 0"))
+    db.session.commit()
+    
+    resultado = app.test_cli_runner().invoke(args=['recalcular-totales', '--lote', '7'])
+    
+    assert f'{len(pedidos_con_items)} pedidos recalculados' in resultado.output
+    db.session.expire_all()
+    assert {(p.total, p.total_items) for p in Pedido.query} == {(Decimal('13.50'), 6)}
+
@@ -0,0 +1,65 @@
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from conftest import iniciar_sesion
+from models import db, User, Rol, Pedido, ItemPedido
+
+
+def test_pedidos_devuelve_304_sin_consultas(client, vendedor, pedidos_con_items, contar_consultas):
+    iniciar_sesion(client, vendedor)
+    respuesta = client.get('/pedidos')
+    assert respuesta.status_code == 200
+    assert respuesta.headers['Last-Modified']
+    etag = respuesta.headers['ETag']
+    
+    with contar_consultas() as consultas:
+        respuesta = client.get('/pedidos', headers={'If-None-Match': etag})
+    assert respuesta.status_code == 304
+    assert respuesta.headers['ETag'] == etag
+    assert consultas.total == 0, consultas.sentencias
+
+
+def test_escritura_cambia_el_etag_del_detalle(client, vendedor, pedidos_con_items):
+    pedido, producto = pedidos_con_items[0], pedidos_con_items[0].items[0].producto
+    iniciar_sesion(client, vendedor)
+    etag = client.get(f'/pedidos/{pedido.id}').headers['ETag']
+    
+    client.post(f'/pedidos/{pedido.id}/agregar-item',
+                data={'producto_id': producto.id, 'cantidad': 1, 'precio_unitario': '1.00'})
+    client.get('/dashboard')  # consume el mensaje flash
+    
+    respuesta = client.get(f'/pedidos/{pedido.id}', headers={'If-None-Match': etag})
+    assert respuesta.status_code == 200
+    assert respuesta.headers['ETag'] != etag
+
+
+def test_actualizacion_masiva_cambia_la_version(app, pedidos_con_items):
+    versiones = app.extensions['versiones_tablas']
+    antes = versiones.version('pedidos')
+    pedidos_con_items[0].ajustar_totales(Decimal('1'), 1)
+    db.session.commit()
+    assert versiones.version('pedidos') != antes
+
+
+def test_insercion_masiva_cambia_la_version(app, pedidos_con_items):
+    versiones = app.extensions['versiones_tablas']
+    antes = versiones.version('items_pedido')
+    item = pedidos_con_items[0].items[0]
+    db.session.execute(insert(ItemPedido), [{'pedido_id': item.pedido_id, 'producto_id': item.producto_id,
+                                             'cantidad': 1, 'precio_unitario': Decimal('1.00')}])
+    db.session.commit()
+    assert versiones.version('items_pedido') != antes
+
+
+def test_etag_depende_del_usuario(client, vendedor):
+    otro = User(username='otro', email='otro@sistema.com', nombre='Otro',
+                rol=Rol.VENDEDOR, password_hash='sin-password')
+    db.session.add(otro)
+    db.session.commit()
+    
+    iniciar_sesion(client, vendedor)
+    etag = client.get('/pedidos').headers['ETag']
+    iniciar_sesion(client, otro)
+    respuesta = client.get('/pedidos', headers={'If-None-Match': etag})
+    assert respuesta.status_code == 200
@@ -0,0 +1,132 @@
+"""GET condicional con ETag a partir de versiones por tabla.
+
+Los commits que modifican pedidos, items, productos, distribuidoras o usuarios
+cambian la versión de su tabla en un archivo mmap compartido. Las vistas
+decoradas con ``con_etag`` calculan el ETag con esas versiones, el usuario y la
+URL, y responden 304 sin consultar la base de datos ni renderizar la plantilla.
+
+Las versiones son las de la base principal: si la petición lee de la réplica,
+que puede ir retrasada, no se envía ETag para no asociar HTML antiguo a una
+versión nueva.
+"""
+import hashlib
+import os
+import time
+from email.utils import formatdate
+from functools import wraps
+from flask import current_app, has_app_context, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from identidad import VersionesCompartidas
+from lectura import lee_de_replica
+from models import db, User, Distribuidora, Producto, Pedido, ItemPedido, PedidoArchivado, ItemPedidoArchivado
+
+# Las nuevas tablas van al final: el índice en esta lista es la ranura del archivo compartido
+TABLAS = [modelo.__tablename__ for modelo in (Pedido, ItemPedido, Producto, Distribuidora, User,
+                                              PedidoArchivado, ItemPedidoArchivado)]
+
+
+def _en_cascada(tabla):
+    """La tabla y las que la base de datos borra con ella (ON DELETE CASCADE)."""
+    tablas = {tabla}
+    for hija in db.metadata.tables.values():
+        if any(fk.ondelete == 'CASCADE' and fk.column.table.name == tabla for fk in hija.foreign_keys):
+            tablas |= _en_cascada(hija.name)
+    return tablas
+
+
+class VersionesTablas:
+    def __init__(self, ruta=None, semilla=None):
+        self._versiones = VersionesCompartidas(ruta, ranuras=len(TABLAS))
+        # Sin semilla fija (p. ej. la versión desplegada) cada proceso usa la suya, así
+        # que un cambio de plantillas al reiniciar nunca devuelve un 304 obsoleto
+        self.semilla = semilla or str(time.time_ns())
+    
+    def version(self, tabla):
+        return self._versiones.version(TABLAS.index(tabla))
+    
+    def cambiar(self, tabla):
+        self._versiones.cambiar(TABLAS.index(tabla))
+    
+    def etag(self, tablas, *partes):
+        datos = [self.semilla, *(str(self.version(t)) for t in tablas), *map(str, partes)]
+        return hashlib.sha1('\x1f'.join(datos).encode()).hexdigest()[:32]
+    
+    def ultima_modificacion(self, tablas):
+        return max(self.version(t) for t in tablas) / 1e9
+
+
+def con_etag(*modelos):
+    tablas = [modelo.__tablename__ for modelo in modelos]
+    
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Los mensajes flash pendientes se muestran una sola vez
+            if request.method != 'GET' or '_flashes' in session or lee_de_replica():
+                return f(*args, **kwargs)
+            
+            versiones = current_app.extensions['versiones_tablas']
+            # El token CSRF de los formularios caduca; la página cacheada también
+            limite_csrf = current_app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+            periodo_csrf = int(time.time() // (limite_csrf / 2)) if limite_csrf else 0
+            etag = versiones.etag(tablas, current_user.get_id(), request.full_path,
+                                  session.get('csrf_token', ''), periodo_csrf)
+            
+            if etag in request.if_none_match:
+                respuesta = current_app.response_class(status=304)
+            else:
+                respuesta = make_response(f(*args, **kwargs))
+                if respuesta.status_code != 200:
+                    return respuesta
+                modificacion = versiones.ultima_modificacion(tablas)
+                if modificacion:
+                    respuesta.headers['Last-Modified'] = formatdate(modificacion, usegmt=True)
+            respuesta.set_etag(etag)
+            respuesta.headers['Cache-Control'] = 'private, no-cache'
+            respuesta.vary.add('Cookie')
+            return respuesta
+        return decorated_function
+    return decorator
+
+
+@event.listens_for(Session, 'after_flush')
+def _anotar_tablas_modificadas(session, contexto):
+    tablas = session.info.setdefault('tablas_modificadas', set())
+    for objeto in (*session.new, *session.dirty):
+        tabla = getattr(objeto, '__tablename__', None)
+        if tabla in TABLAS:
+            tablas.add(tabla)
+    for objeto in session.deleted:
+        tablas.update(t for t in _en_cascada(objeto.__tablename__) if t in TABLAS)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _anotar_tabla_masiva(estado):
+    # INSERT/UPDATE/DELETE ejecutados directamente, como la carga masiva de items
+    # o Pedido.ajustar_totales
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        tabla = estado.statement.table.name
+        afectadas = _en_cascada(tabla) if estado.is_delete else {tabla}
+        estado.session.info.setdefault('tablas_modificadas', set()).update(t for t in afectadas if t in TABLAS)
+
+
+@event.listens_for(Session, 'after_commit')
+def _cambiar_versiones(session):
+    tablas = session.info.pop('tablas_modificadas', None)
+    if tablas and has_app_context() and 'versiones_tablas' in current_app.extensions:
+        for tabla in tablas:
+            current_app.extensions['versiones_tablas'].cambiar(tabla)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_tablas_modificadas(session):
+    session.info.pop('tablas_modificadas', None)
+
+
+def init_app(app):
+    ruta = app.config['TABLAS_VERSIONES_ARCHIVO']
+    if ruta and not os.path.isabs(ruta):
+        ruta = os.path.join(app.instance_path, ruta)
+    app.extensions['versiones_tablas'] = VersionesTablas(ruta, app.config['ETAG_SEMILLA'])
@@ -1,6 +1,8 @@
-from flask import Flask, render_template_string, request, redirect, url_for, flash
+from flask import Flask, Response, render_template, stream_template, request, redirect, url_for, flash
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from flask_sqlalchemy import SQLAlchemy
+from jinja2 import DictLoader
+from sqlalchemy import select
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from enum import Enum
@@ -9,9 +11,15 @@ import os
 # Configuración
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'sistema-pedidos-2024'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///sistema_pedidos.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sistema_pedidos.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Filas que se leen de la base de datos por lote en los listados (solo las columnas
+# que se muestran, sin crear objetos del ORM) y fragmentos de plantilla que se
+# agrupan en cada envío del streaming
+LOTE_FILAS = 500
+FRAGMENTOS_POR_ENVIO = 500
+
 # Inicialización
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
@@ -91,7 +99,7 @@ class Pedido(db.Model):
 # Login Manager
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id)
+    return User.query.get(int(user_id))
 
 # Plantillas base
 BASE_TEMPLATE = '''
@@ -184,6 +192,228 @@ BASE_TEMPLATE = '''
 </html>
 '''
 
+# Plantillas de cada página. Se cargan una vez con DictLoader y Jinja reutiliza
+# la versión compilada en cada petición
+PLANTILLAS = {
+    'base.html': BASE_TEMPLATE,
+    
+    'dashboard.html': '''
+{% extends "base.html" %}
+{% block title %}Dashboard{% endblock %}
+{% block content %}
+<div class="row g-4">
+    {% for icono, valor, etiqueta in [
+        ('fa-truck', stats.distribuidoras, 'Distribuidoras'),
+        ('fa-boxes', stats.productos, 'Productos'),
+        ('fa-shopping-cart', stats.pedidos, 'Pedidos'),
+        ('fa-clock', stats.pedidos_pendientes, 'Pendientes')] %}
+    <div class="col-md-3">
+        <div class="card stats-card">
+            <div class="card-body text-center">
+                <i class="fas {{ icono }} fa-2x mb-3"></i>
+                <h3>{{ valor }}</h3>
+                <p>{{ etiqueta }}</p>
+            </div>
+        </div>
+    </div>
+    {% endfor %}
+</div>
+
+<div class="row mt-4">
+    <div class="col-12">
+        <div class="card">
+            <div class="card-header">
+                <h5><i class="fas fa-bolt"></i> Acciones Rápidas</h5>
+            </div>
+            <div class="card-body">
+                <div class="row">
+                    <div class="col-md-3 mb-2">
+                        <a href="/distribuidoras/nueva" class="btn btn-primary w-100">
+                            <i class="fas fa-plus"></i> Nueva Distribuidora
+                        </a>
+                    </div>
+                    <div class="col-md-3 mb-2">
+                        <a href="/productos/nuevo" class="btn btn-primary w-100">
+                            <i class="fas fa-plus"></i> Nuevo Producto
+                        </a>
+                    </div>
+                    <div class="col-md-3 mb-2">
+                        <a href="/pedidos/nuevo" class="btn btn-primary w-100">
+                            <i class="fas fa-plus"></i> Nuevo Pedido
+                        </a>
+                    </div>
+                    {% if current_user.is_administrador() %}
+                    <div class="col-md-3 mb-2">
+                        <a href="/usuarios/nuevo" class="btn btn-success w-100">
+                            <i class="fas fa-user-plus"></i> Nuevo Usuario
+                        </a>
+                    </div>
+                    {% endif %}
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+''',
+    
+    'login.html': '''
+{% extends "base.html" %}
+{% block title %}Login{% endblock %}
+{% block content %}
+<div class="row justify-content-center">
+    <div class="col-md-6">
+        <div class="card">
+            <div class="card-header text-center">
+                <h3><i class="fas fa-sign-in-alt"></i> Iniciar Sesión</h3>
+            </div>
+            <div class="card-body">
+                <form method="POST">
+                    <div class="mb-3">
+                        <label class="form-label">Usuario</label>
+                        <input type="text" name="username" class="form-control" required>
+                    </div>
+                    <div class="mb-3">
+                        <label class="form-label">Contraseña</label>
+                        <input type="password" name="password" class="form-control" required>
+                    </div>
+                    <button type="submit" class="btn btn-primary w-100">
+                        <i class="fas fa-sign-in-alt"></i> Iniciar Sesión
+                    </button>
+                </form>
+                
+                <div class="mt-3 text-center">
+                    <small class="text-muted">
+                        <strong>Admin:</strong> admin / admin123<br>
+                        <strong>Vendedor:</strong> vendedor / vendedor123
+                    </small>
+                </div>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+''',
+    
+    'lista.html': '''
+{% extends "base.html" %}
+{% block title %}{{ titulo }}{% endblock %}
+{% block content %}
+<div class="d-flex justify-content-between align-items-center mb-4">
+    <h2><i class="fas {{ icono }}"></i> {{ titulo }}</h2>
+    <a href="{{ nuevo_url }}" class="btn {{ nuevo_clase|default('btn-primary') }}">
+        <i class="fas {{ nuevo_icono|default('fa-plus') }}"></i> {{ nuevo_texto }}
+    </a>
+</div>
+
+<div class="card">
+    <div class="card-body">
+        <div class="table-responsive">
+            <table class="table table-hover">
+                <thead>
+                    <tr>
+                        {% for columna in columnas %}<th>{{ columna }}</th>{% endfor %}
+                    </tr>
+                </thead>
+                <tbody>
+                    {% block filas %}{% endblock %}
+                </tbody>
+            </table>
+        </div>
+    </div>
+</div>
+{% endblock %}
+''',
+    
+    'distribuidoras.html': '''
+{% extends "lista.html" %}
+{% block filas %}
+{% for d in distribuidoras %}
+<tr>
+    <td><strong>{{ d.codigo }}</strong></td>
+    <td>{{ d.nombre }}</td>
+    <td>{{ d.contacto }}</td>
+    <td>{{ d.telefono }}</td>
+    <td>{{ d.email }}</td>
+    <td><span class="badge bg-{{ 'success' if d.activa else 'secondary' }}">{{ 'Activa' if d.activa else 'Inactiva' }}</span></td>
+</tr>
+{% endfor %}
+{% endblock %}
+''',
+    
+    'productos.html': '''
+{% extends "lista.html" %}
+{% block filas %}
+{% for p in productos %}
+<tr>
+    <td><strong>{{ p.codigo }}</strong></td>
+    <td>{{ p.nombre }}</td>
+    <td>${{ "%.2f"|format(p.precio) }}</td>
+    <td><span class="badge bg-{{ 'success' if p.stock > 10 else 'warning' if p.stock > 0 else 'danger' }}">{{ p.stock }} unidades</span></td>
+    <td><span class="badge bg-{{ 'success' if p.activo else 'secondary' }}">{{ 'Activo' if p.activo else 'Inactivo' }}</span></td>
+</tr>
+{% endfor %}
+{% endblock %}
+''',
+    
+    'pedidos.html': '''
+{% extends "lista.html" %}
+{% set colores = {'pendiente': 'warning', 'enviado': 'info', 'recibido': 'success', 'cancelado': 'danger'} %}
+{% block filas %}
+{% for p in pedidos %}
+<tr>
+    <td><strong>{{ p.id_pedido }}</strong></td>
+    <td>{{ p.distribuidora or 'N/A' }}</td>
+    <td><span class="badge bg-{{ colores.get(p.estado.value, 'secondary') }}">{{ p.estado.value.title() }}</span></td>
+    <td>{{ p.fecha_creacion.strftime('%d/%m/%Y %H:%M') }}</td>
+    <td>{{ p.usuario or 'N/A' }}</td>
+</tr>
+{% endfor %}
+{% endblock %}
+''',
+    
+    'usuarios.html': '''
+{% extends "lista.html" %}
+{% block filas %}
+{% for u in usuarios %}
+<tr>
+    <td><strong>{{ u.username }}</strong></td>
+    <td>{{ u.nombre }}</td>
+    <td>{{ u.email }}</td>
+    <td><span class="badge bg-{{ 'primary' if u.rol.value == 'administrador' else 'info' }}">{{ u.rol.value.title() }}</span></td>
+    <td><span class="badge bg-{{ 'success' if u.activo else 'secondary' }}">{{ 'Activo' if u.activo else 'Inactivo' }}</span></td>
+</tr>
+{% endfor %}
+{% endblock %}
+''',
+    
+    'en_desarrollo.html': '''
+{% extends "base.html" %}
+{% block title %}{{ titulo }}{% endblock %}
+{% block content %}
+<div class="row justify-content-center">
+    <div class="col-md-8">
+        <div class="card">
+            <div class="card-header">
+                <h4><i class="fas {{ icono }}"></i> {{ titulo }}</h4>
+            </div>
+            <div class="card-body">
+                <div class="alert alert-info">
+                    <i class="fas fa-info-circle"></i> 
+                    Formulario de {{ descripcion }} en desarrollo.
+                </div>
+                <a href="{{ volver }}" class="btn btn-secondary">
+                    <i class="fas fa-arrow-left"></i> Volver
+                </a>
+            </div>
+        </div>
+    </div>
+</div>
+{% endblock %}
+''',
+}
+app.jinja_loader = DictLoader(PLANTILLAS)
+
 # Rutas
 @app.route('/')
 def dashboard():
@@ -197,85 +427,7 @@ def dashboard():
         'pedidos_pendientes': Pedido.query.filter_by(estado=EstadoPedido.PENDIENTE).count()
     }
     
-    return render_template_string(BASE_TEMPLATE, 
-        title='Dashboard',
-        content='''
-        <div class="row g-4">
-            <div class="col-md-3">
-                <div class="card stats-card">
-                    <div class="card-body text-center">
-                        <i class="fas fa-truck fa-2x mb-3"></i>
-                        <h3>''' + str(stats['distribuidoras']) + '''</h3>
-                        <p>Distribuidoras</p>
-                    </div>
-                </div>
-            </div>
-            <div class="col-md-3">
-                <div class="card stats-card">
-                    <div class="card-body text-center">
-                        <i class="fas fa-boxes fa-2x mb-3"></i>
-                        <h3>''' + str(stats['productos']) + '''</h3>
-                        <p>Productos</p>
-                    </div>
-                </div>
-            </div>
-            <div class="col-md-3">
-                <div class="card stats-card">
-                    <div class="card-body text-center">
-                        <i class="fas fa-shopping-cart fa-2x mb-3"></i>
-                        <h3>''' + str(stats['pedidos']) + '''</h3>
-                        <p>Pedidos</p>
-                    </div>
-                </div>
-            </div>
-            <div class="col-md-3">
-                <div class="card stats-card">
-                    <div class="card-body text-center">
-                        <i class="fas fa-clock fa-2x mb-3"></i>
-                        <h3>''' + str(stats['pedidos_pendientes']) + '''</h3>
-                        <p>Pendientes</p>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="row mt-4">
-            <div class="col-12">
-                <div class="card">
-                    <div class="card-header">
-                        <h5><i class="fas fa-bolt"></i> Acciones Rápidas</h5>
-                    </div>
-                    <div class="card-body">
-                        <div class="row">
-                            <div class="col-md-3 mb-2">
-                                <a href="/distribuidoras/nueva" class="btn btn-primary w-100">
-                                    <i class="fas fa-plus"></i> Nueva Distribuidora
-                                </a>
-                            </div>
-                            <div class="col-md-3 mb-2">
-                                <a href="/productos/nuevo" class="btn btn-primary w-100">
-                                    <i class="fas fa-plus"></i> Nuevo Producto
-                                </a>
-                            </div>
-                            <div class="col-md-3 mb-2">
-                                <a href="/pedidos/nuevo" class="btn btn-primary w-100">
-                                    <i class="fas fa-plus"></i> Nuevo Pedido
-                                </a>
-                            </div>
-                            {% if current_user.is_administrador() %}
-                            <div class="col-md-3 mb-2">
-                                <a href="/usuarios/nuevo" class="btn btn-success w-100">
-                                    <i class="fas fa-user-plus"></i> Nuevo Usuario
-                                </a>
-                            </div>
-                            {% endif %}
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        '''
-    )
+    return render_template('dashboard.html', stats=stats)
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -290,42 +442,7 @@ def login():
         else:
             flash('Usuario o contraseña incorrectos', 'danger')
     
-    return render_template_string(BASE_TEMPLATE,
-        title='Login',
-        content='''
-        <div class="row justify-content-center">
-            <div class="col-md-6">
-                <div class="card">
-                    <div class="card-header text-center">
-                        <h3><i class="fas fa-sign-in-alt"></i> Iniciar Sesión</h3>
-                    </div>
-                    <div class="card-body">
-                        <form method="POST">
-                            <div class="mb-3">
-                                <label class="form-label">Usuario</label>
-                                <input type="text" name="username" class="form-control" required>
-                            </div>
-                            <div class="mb-3">
-                                <label class="form-label">Contraseña</label>
-                                <input type="password" name="password" class="form-control" required>
-                            </div>
-                            <button type="submit" class="btn btn-primary w-100">
-                                <i class="fas fa-sign-in-alt"></i> Iniciar Sesión
-                            </button>
-                        </form>
-                        
-                        <div class="mt-3 text-center">
-                            <small class="text-muted">
-                                <strong>Admin:</strong> admin / admin123<br>
-                                <strong>Vendedor:</strong> vendedor / vendedor123
-                            </small>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        '''
-    )
+    return render_template('login.html')
 
 @app.route('/logout')
 @login_required
@@ -333,182 +450,57 @@ def logout():
     logout_user()
     return redirect('/login')
 
+def filas(consulta):
+    return db.session.execute(consulta.execution_options(yield_per=LOTE_FILAS))
+
+def transmitir(plantilla, **contexto):
+    # Los listados se envían por partes mientras se recorren las filas
+    partes = stream_template(plantilla, **contexto)
+    
+    def agrupar():
+        bloque = []
+        for parte in partes:
+            bloque.append(parte)
+            if len(bloque) >= FRAGMENTOS_POR_ENVIO:
+                yield ''.join(bloque)
+                bloque.clear()
+        yield ''.join(bloque)
+    
+    return Response(agrupar(), mimetype='text/html')
+
 @app.route('/distribuidoras')
 @login_required
 def distribuidoras():
-    distribuidoras = Distribuidora.query.all()
-    
-    content = '''
-    <div class="d-flex justify-content-between align-items-center mb-4">
-        <h2><i class="fas fa-truck"></i> Distribuidoras</h2>
-        <a href="/distribuidoras/nueva" class="btn btn-primary">
-            <i class="fas fa-plus"></i> Nueva Distribuidora
-        </a>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="table-responsive">
-                <table class="table table-hover">
-                    <thead>
-                        <tr>
-                            <th>Código</th>
-                            <th>Nombre</th>
-                            <th>Contacto</th>
-                            <th>Teléfono</th>
-                            <th>Email</th>
-                            <th>Estado</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    '''
-    
-    for d in distribuidoras:
-        content += f'''
-            <tr>
-                <td><strong>{d.codigo}</strong></td>
-                <td>{d.nombre}</td>
-                <td>{d.contacto}</td>
-                <td>{d.telefono}</td>
-                <td>{d.email}</td>
-                <td>
-                    <span class="badge bg-{'success' if d.activa else 'secondary'}">
-                        {'Activa' if d.activa else 'Inactiva'}
-                    </span>
-                </td>
-            </tr>
-        '''
-    
-    content += '''
-                    </tbody>
-                </table>
-            </div>
-        </div>
-    </div>
-    '''
-    
-    return render_template_string(BASE_TEMPLATE, title='Distribuidoras', content=content)
+    return transmitir('distribuidoras.html',
+        titulo='Distribuidoras', icono='fa-truck',
+        nuevo_url='/distribuidoras/nueva', nuevo_texto='Nueva Distribuidora',
+        columnas=['Código', 'Nombre', 'Contacto', 'Teléfono', 'Email', 'Estado'],
+        distribuidoras=filas(select(Distribuidora.codigo, Distribuidora.nombre, Distribuidora.contacto,
+                                    Distribuidora.telefono, Distribuidora.email, Distribuidora.activa)))
 
 @app.route('/productos')
 @login_required
 def productos():
-    productos = Producto.query.all()
-    
-    content = '''
-    <div class="d-flex justify-content-between align-items-center mb-4">
-        <h2><i class="fas fa-boxes"></i> Productos</h2>
-        <a href="/productos/nuevo" class="btn btn-primary">
-            <i class="fas fa-plus"></i> Nuevo Producto
-        </a>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="table-responsive">
-                <table class="table table-hover">
-                    <thead>
-                        <tr>
-                            <th>Código</th>
-                            <th>Nombre</th>
-                            <th>Precio</th>
-                            <th>Stock</th>
-                            <th>Estado</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    '''
-    
-    for p in productos:
-        stock_color = 'success' if p.stock > 10 else 'warning' if p.stock > 0 else 'danger'
-        content += f'''
-            <tr>
-                <td><strong>{p.codigo}</strong></td>
-                <td>{p.nombre}</td>
-                <td>${float(p.precio):.2f}</td>
-                <td>
-                    <span class="badge bg-{stock_color}">
-                        {p.stock} unidades
-                    </span>
-                </td>
-                <td>
-                    <span class="badge bg-{'success' if p.activo else 'secondary'}">
-                        {'Activo' if p.activo else 'Inactivo'}
-                    </span>
-                </td>
-            </tr>
-        '''
-    
-    content += '''
-                    </tbody>
-                </table>
-            </div>
-        </div>
-    </div>
-    '''
-    
-    return render_template_string(BASE_TEMPLATE, title='Productos', content=content)
+    return transmitir('productos.html',
+        titulo='Productos', icono='fa-boxes',
+        nuevo_url='/productos/nuevo', nuevo_texto='Nuevo Producto',
+        columnas=['Código', 'Nombre', 'Precio', 'Stock', 'Estado'],
+        productos=filas(select(Producto.codigo, Producto.nombre, Producto.precio,
+                               Producto.stock, Producto.activo)))
 
 @app.route('/pedidos')
 @login_required
 def pedidos():
-    pedidos = Pedido.query.order_by(Pedido.fecha_creacion.desc()).all()
-    
-    content = '''
-    <div class="d-flex justify-content-between align-items-center mb-4">
-        <h2><i class="fas fa-shopping-cart"></i> Pedidos</h2>
-        <a href="/pedidos/nuevo" class="btn btn-primary">
-            <i class="fas fa-plus"></i> Nuevo Pedido
-        </a>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="table-responsive">
-                <table class="table table-hover">
-                    <thead>
-                        <tr>
-                            <th>ID Pedido</th>
-                            <th>Distribuidora</th>
-                            <th>Estado</th>
-                            <th>Fecha</th>
-                            <th>Usuario</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    '''
-    
-    for p in pedidos:
-        estado_colors = {
-            'pendiente': 'warning',
-            'enviado': 'info',
-            'recibido': 'success',
-            'cancelado': 'danger'
-        }
-        color = estado_colors.get(p.estado.value, 'secondary')
-        
-        content += f'''
-            <tr>
-                <td><strong>{p.id_pedido}</strong></td>
-                <td>{p.distribuidora.nombre if p.distribuidora else 'N/A'}</td>
-                <td>
-                    <span class="badge bg-{color}">
-                        {p.estado.value.title()}
-                    </span>
-                </td>
-                <td>{p.fecha_creacion.strftime('%d/%m/%Y %H:%M')}</td>
-                <td>{p.usuario.nombre if p.usuario else 'N/A'}</td>
-            </tr>
-        '''
-    
-    content += '''
-                    </tbody>
-                </table>
-            </div>
-        </div>
-    </div>
-    '''
-    
-    return render_template_string(BASE_TEMPLATE, title='Pedidos', content=content)
+    pedidos = filas(select(Pedido.id_pedido, Pedido.estado, Pedido.fecha_creacion,
+                           Distribuidora.nombre.label('distribuidora'), User.nombre.label('usuario'))
+                    .outerjoin(Distribuidora, Pedido.distribuidora_id == Distribuidora.id)
+                    .outerjoin(User, Pedido.usuario_id == User.id)
+                    .order_by(Pedido.fecha_creacion.desc()))
+    return transmitir('pedidos.html',
+        titulo='Pedidos', icono='fa-shopping-cart',
+        nuevo_url='/pedidos/nuevo', nuevo_texto='Nuevo Pedido',
+        columnas=['ID Pedido', 'Distribuidora', 'Estado', 'Fecha', 'Usuario'],
+        pedidos=pedidos)
 
 @app.route('/usuarios')
 @login_required
@@ -516,143 +508,31 @@ def usuarios():
     if not current_user.is_administrador():
         return redirect('/')
     
-    usuarios = User.query.all()
-    
-    content = '''
-    <div class="d-flex justify-content-between align-items-center mb-4">
-        <h2><i class="fas fa-users"></i> Usuarios</h2>
-        <a href="/usuarios/nuevo" class="btn btn-success">
-            <i class="fas fa-user-plus"></i> Nuevo Usuario
-        </a>
-    </div>
-    
-    <div class="card">
-        <div class="card-body">
-            <div class="table-responsive">
-                <table class="table table-hover">
-                    <thead>
-                        <tr>
-                            <th>Usuario</th>
-                            <th>Nombre</th>
-                            <th>Email</th>
-                            <th>Rol</th>
-                            <th>Estado</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-    '''
-    
-    for u in usuarios:
-        rol_color = 'primary' if u.is_administrador() else 'info'
-        content += f'''
-            <tr>
-                <td><strong>{u.username}</strong></td>
-                <td>{u.nombre}</td>
-                <td>{u.email}</td>
-                <td>
-                    <span class="badge bg-{rol_color}">
-                        {u.rol.value.title()}
-                    </span>
-                </td>
-                <td>
-                    <span class="badge bg-{'success' if u.activo else 'secondary'}">
-                        {'Activo' if u.activo else 'Inactivo'}
-                    </span>
-                </td>
-            </tr>
-        '''
-    
-    content += '''
-                    </tbody>
-                </table>
-            </div>
-        </div>
-    </div>
-    '''
-    
-    return render_template_string(BASE_TEMPLATE, title='Usuarios', content=content)
+    return transmitir('usuarios.html',
+        titulo='Usuarios', icono='fa-users',
+        nuevo_url='/usuarios/nuevo', nuevo_texto='Nuevo Usuario',
+        nuevo_clase='btn-success', nuevo_icono='fa-user-plus',
+        columnas=['Usuario', 'Nombre', 'Email', 'Rol', 'Estado'],
+        usuarios=filas(select(User.username, User.nombre, User.email, User.rol, User.activo)))
 
 # Rutas de formularios (placeholders para desarrollo)
 @app.route('/distribuidoras/nueva')
 @login_required
 def nueva_distribuidora():
-    return render_template_string(BASE_TEMPLATE,
-        title='Nueva Distribuidora',
-        content='''
-        <div class="row justify-content-center">
-            <div class="col-md-8">
-                <div class="card">
-                    <div class="card-header">
-                        <h4><i class="fas fa-truck"></i> Nueva Distribuidora</h4>
-                    </div>
-                    <div class="card-body">
-                        <div class="alert alert-info">
-                            <i class="fas fa-info-circle"></i> 
-                            Formulario de registro de distribuidora en desarrollo.
-                        </div>
-                        <a href="/distribuidoras" class="btn btn-secondary">
-                            <i class="fas fa-arrow-left"></i> Volver
-                        </a>
-                    </div>
-                </div>
-            </div>
-        </div>
-        '''
-    )
+    return render_template('en_desarrollo.html', titulo='Nueva Distribuidora', icono='fa-truck',
+                           descripcion='registro de distribuidora', volver='/distribuidoras')
 
 @app.route('/productos/nuevo')
 @login_required
 def nuevo_producto():
-    return render_template_string(BASE_TEMPLATE,
-        title='Nuevo Producto',
-        content='''
-        <div class="row justify-content-center">
-            <div class="col-md-8">
-                <div class="card">
-                    <div class="card-header">
-                        <h4><i class="fas fa-box"></i> Nuevo Producto</h4>
-                    </div>
-                    <div class="card-body">
-                        <div class="alert alert-info">
-                            <i class="fas fa-info-circle"></i> 
-                            Formulario de registro de producto en desarrollo.
-                        </div>
-                        <a href="/productos" class="btn btn-secondary">
-                            <i class="fas fa-arrow-left"></i> Volver
-                        </a>
-                    </div>
-                </div>
-            </div>
-        </div>
-        '''
-    )
+    return render_template('en_desarrollo.html', titulo='Nuevo Producto', icono='fa-box',
+                           descripcion='registro de producto', volver='/productos')
 
 @app.route('/pedidos/nuevo')
 @login_required
 def nuevo_pedido():
-    return render_template_string(BASE_TEMPLATE,
-        title='Nuevo Pedido',
-        content='''
-        <div class="row justify-content-center">
-            <div class="col-md-8">
-                <div class="card">
-                    <div class="card-header">
-                        <h4><i class="fas fa-shopping-cart"></i> Nuevo Pedido</h4>
-                    </div>
-                    <div class="card-body">
-                        <div class="alert alert-info">
-                            <i class="fas fa-info-circle"></i> 
-                            Formulario de creación de pedido en desarrollo.
-                        </div>
-                        <a href="/pedidos" class="btn btn-secondary">
-                            <i class="fas fa-arrow-left"></i> Volver
-                        </a>
-                    </div>
-                </div>
-            </div>
-        </div>
-        '''
-    )
+    return render_template('en_desarrollo.html', titulo='Nuevo Pedido', icono='fa-shopping-cart',
+                           descripcion='creación de pedido', volver='/pedidos')
 
 @app.route('/usuarios/nuevo')
 @login_required
@@ -660,90 +540,70 @@ def nuevo_usuario():
     if not current_user.is_administrador():
         return redirect('/')
     
-    return render_template_string(BASE_TEMPLATE,
-        title='Nuevo Usuario',
-        content='''
-        <div class="row justify-content-center">
-            <div class="col-md-8">
-                <div class="card">
-                    <div class="card-header">
-                        <h4><i class="fas fa-user-plus"></i> Nuevo Usuario</h4>
-                    </div>
-                    <div class="card-body">
-                        <div class="alert alert-info">
-                            <i class="fas fa-info-circle"></i> 
-                            Formulario de registro de usuario en desarrollo.
-                        </div>
-                        <a href="/usuarios" class="btn btn-secondary">
-                            <i class="fas fa-arrow-left"></i> Volver
-                        </a>
-                    </div>
-                </div>
-            </div>
-        </div>
-        '''
-    )
+    return render_template('en_desarrollo.html', titulo='Nuevo Usuario', icono='fa-user-plus',
+                           descripcion='registro de usuario', volver='/usuarios')
+
+# Tablas y datos iniciales: flask --app vscode_app seed
+@app.cli.command('seed')
+def seed():
+    db.create_all()
+    
+    # Crear usuarios por defecto
+    admin = User.query.filter_by(username='admin').first()
+    if not admin:
+        admin = User(
+            username='admin',
+            email='admin@sistema.com',
+            nombre='Administrador del Sistema',
+            rol=Rol.ADMINISTRADOR
+        )
+        admin.set_password('admin123')
+        db.session.add(admin)
+    
+    vendedor = User.query.filter_by(username='vendedor').first()
+    if not vendedor:
+        vendedor = User(
+            username='vendedor',
+            email='vendedor@sistema.com',
+            nombre='Vendedor Ejemplo',
+            rol=Rol.VENDEDOR
+        )
+        vendedor.set_password('vendedor123')
+        db.session.add(vendedor)
+    
+    # Crear datos de ejemplo
+    if Distribuidora.query.count() == 0:
+        dist1 = Distribuidora(
+            nombre='Distribuidora Central',
+            codigo='DIST001',
+            contacto='Juan Pérez',
+            telefono='555-0123',
+            email='juan@distcentral.com'
+        )
+        dist2 = Distribuidora(
+            nombre='Productos del Norte',
+            codigo='DIST002',
+            contacto='María García',
+            telefono='555-0456',
+            email='maria@prodnorte.com'
+        )
+        db.session.add(dist1)
+        db.session.add(dist2)
+    
+    if Producto.query.count() == 0:
+        prod1 = Producto(nombre='Laptop Pro 15"', codigo='LP001', precio=999.99, stock=25)
+        prod2 = Producto(nombre='Mouse Wireless', codigo='MS001', precio=29.99, stock=150)
+        prod3 = Producto(nombre='Teclado Mecánico', codigo='KB001', precio=79.99, stock=75)
+        db.session.add(prod1)
+        db.session.add(prod2)
+        db.session.add(prod3)
+    
+    db.session.commit()
+    print("✅ Base de datos inicializada")
+    print("👤 Admin: admin / admin123")
+    print("👤 Vendedor: vendedor / vendedor123")
 
-# Inicialización
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-        
-        # Crear usuarios por defecto
-        admin = User.query.filter_by(username='admin').first()
-        if not admin:
-            admin = User(
-                username='admin',
-                email='admin@sistema.com',
-                nombre='Administrador del Sistema',
-                rol=Rol.ADMINISTRADOR
-            )
-            admin.set_password('admin123')
-            db.session.add(admin)
-        
-        vendedor = User.query.filter_by(username='vendedor').first()
-        if not vendedor:
-            vendedor = User(
-                username='vendedor',
-                email='vendedor@sistema.com',
-                nombre='Vendedor Ejemplo',
-                rol=Rol.VENDEDOR
-            )
-            vendedor.set_password('vendedor123')
-            db.session.add(vendedor)
-        
-        # Crear datos de ejemplo
-        if Distribuidora.query.count() == 0:
-            dist1 = Distribuidora(
-                nombre='Distribuidora Central',
-                codigo='DIST001',
-                contacto='Juan Pérez',
-                telefono='555-0123',
-                email='juan@distcentral.com'
-            )
-            dist2 = Distribuidora(
-                nombre='Productos del Norte',
-                codigo='DIST002',
-                contacto='María García',
-                telefono='555-0456',
-                email='maria@prodnorte.com'
-            )
-            db.session.add(dist1)
-            db.session.add(dist2)
-        
-        if Producto.query.count() == 0:
-            prod1 = Producto(nombre='Laptop Pro 15"', codigo='LP001', precio=999.99, stock=25)
-            prod2 = Producto(nombre='Mouse Wireless', codigo='MS001', precio=29.99, stock=150)
-            prod3 = Producto(nombre='Teclado Mecánico', codigo='KB001', precio=79.99, stock=75)
-            db.session.add(prod1)
-            db.session.add(prod2)
-            db.session.add(prod3)
-        
-        db.session.commit()
-        print("✅ Base de datos inicializada")
-        print("👤 Admin: admin / admin123")
-        print("👤 Vendedor: vendedor / vendedor123")
-    
     print("🚀 Iniciando servidor web...")
     print("📡 URL: http://localhost:5000")
     print("="*50)
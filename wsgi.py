@@ -0,0 +1,8 @@
+"""Punto de entrada WSGI: gunicorn 'wsgi:app'.
+
+create_app no toca la base de datos; el esquema y los datos iniciales se crean con
+`flask --app app migrar` y `flask --app app seed` antes de desplegar.
+"""
+from app import create_app
+
+app = create_app()